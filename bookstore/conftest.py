@@ -1,23 +1,30 @@
+import os
 from collections.abc import Iterator
 from pathlib import Path
 
 import pytest
 from filelock import FileLock
-from playwright.sync_api import Browser
+from playwright.sync_api import Browser, Playwright
 
-from bookstore.pages.login_page import LoginPage
+from bookstore.helpers.auth import login_via_form, login_via_ui
 from bookstore.pages.profile_page import ProfilePage
 from shared.helpers.ad_blocker import block_ads_on_context
 
 BOOKSTORE_AUTH_DIR = Path(".auth/bookstore")
 BOOKSTORE_AUTH_DIR.mkdir(parents=True, exist_ok=True)
+# How the auth state is made: "ui" drives the sign-in page, "api" POSTs the
+# form through Playwright's request context without rendering anything
+BOOKSTORE_AUTH = os.getenv("BOOKSTORE_AUTH", "ui")
 
 
 @pytest.fixture(scope="session")
-def auth_file(browser: Browser, test_users: dict, profile_name: str) -> Path:
+def auth_file(
+    browser: Browser, playwright: Playwright, test_users: dict, profile_name: str
+) -> Path:
     """
     Session-scoped fixture to log in once and save the bookstore auth state.
     Reuses existing state if available. Safe for parallel execution.
+    `BOOKSTORE_AUTH` picks how it logs in.
     """
     auth_path = BOOKSTORE_AUTH_DIR / f"storage_state_{profile_name}.json"
     lock_path = auth_path.with_suffix(".lock")
@@ -26,14 +33,11 @@ def auth_file(browser: Browser, test_users: dict, profile_name: str) -> Path:
         if auth_path.is_file():
             return auth_path
 
-        page = browser.new_page()
         user = test_users[profile_name]
-        login_page = LoginPage(page)
-        login_page.load()
-        login_page.login(user["email"], user["password"])
-        page.wait_for_url("**/profile", timeout=15_000)
-        page.context.storage_state(path=auth_path)
-        page.close()
+        if BOOKSTORE_AUTH == "api":
+            login_via_form(playwright, auth_path, user["email"], user["password"])
+        else:
+            login_via_ui(browser, auth_path, user["email"], user["password"])
 
     return auth_path
 
@@ -0,0 +1,48 @@
+# bookstore/helpers/auth.py
+import re
+from pathlib import Path
+
+from playwright.sync_api import Browser, Playwright
+
+from bookstore.pages.login_page import LoginPage
+from bookstore.pages.profile_page import ProfilePage
+from config import BASE_URL
+
+# Hidden CSRF field of the sign-in form, if the server renders one
+_CSRF_FIELD = re.compile(r'name="_csrf"\s+value="([^"]+)"')
+
+
+def login_via_ui(browser: Browser, auth_path: Path, email: str, password: str) -> None:
+    """Sign in through the rendered form and save the storage state."""
+    page = browser.new_page()
+    login_page = LoginPage(page)
+    login_page.load()
+    login_page.login(email, password)
+    page.wait_for_url("**/profile", timeout=15_000)
+    page.context.storage_state(path=auth_path)
+    page.close()
+
+
+def login_via_form(
+    playwright: Playwright, auth_path: Path, email: str, password: str
+) -> None:
+    """POST the sign-in form through a request context and save its cookies.
+
+    One GET for the session cookie (and CSRF field), one POST that follows
+    the redirect to the profile; nothing is rendered.
+    """
+    context = playwright.request.new_context(base_url=BASE_URL)
+    try:
+        signin = context.get(LoginPage.URL)
+        form: dict[str, str | float | bool] = {"email": email, "password": password}
+        if csrf := _CSRF_FIELD.search(signin.text()):
+            form["_csrf"] = csrf.group(1)
+        response = context.post(LoginPage.URL, form=form)
+        if not response.url.endswith(ProfilePage.URL):
+            raise RuntimeError(
+                f"Bookstore sign-in did not reach the profile: {response.status} "
+                f"{response.url}"
+            )
+        context.storage_state(path=auth_path)
+    finally:
+        context.dispose()
@@ -4,12 +4,32 @@ import os
 import time
 from pathlib import Path
 from typing import Any, Dict, Generator
+from uuid import uuid4
 
 import pytest
 
 from playwright.sync_api import Page
 from shared.helpers.ad_blocker import handle_route
-from shared.helpers.db_logger import log_test_run, init_db
+from shared.helpers.db_logger import (
+    close_writers,
+    finish_run,
+    forward_rows,
+    git_sha,
+    init_db,
+    is_forwarding,
+    log_test_run,
+    resume_run,
+    start_run,
+    writer_for,
+)
+from shared.helpers.redaction import is_sensitive_key, mask_value
+
+pytest_plugins = [
+    "shared.plugins.xdist_schedule",
+    "shared.plugins.sharding",
+    "shared.plugins.resume",
+    "shared.plugins.time_budget",
+]
 
 
 @pytest.fixture
@@ -30,6 +50,54 @@ def pytest_addoption(parser: pytest.Parser) -> None:
         default="profile1",
         help="Name of the test user profile to use (default: profile1).",
     )
+    parser.addoption(
+        "--db-writer",
+        action="store",
+        choices=("process", "controller"),
+        default=os.getenv("TEST_DB_WRITER", "process"),
+        help=(
+            "Who writes the results DB under xdist: every process through its "
+            "own buffered connection, or only the controller, with workers "
+            "handing their rows over when they finish (env TEST_DB_WRITER)."
+        ),
+    )
+    parser.addoption(
+        "--notes-mock-profile",
+        action="store",
+        default=os.getenv("NOTES_MOCK_PROFILE", "instant"),
+        help=(
+            "Latency/fault profile of the offline Notes mock: instant, lan, "
+            "production, long-tail, flaky or slow-body (env NOTES_MOCK_PROFILE)."
+        ),
+    )
+    parser.addoption(
+        "--notes-mock-seed",
+        action="store",
+        type=int,
+        default=int(os.getenv("NOTES_MOCK_SEED", "0")),
+        help="Seed for the offline Notes mock fault profile (env NOTES_MOCK_SEED).",
+    )
+    parser.addoption(
+        "--notes-mock-notes",
+        action="store",
+        type=int,
+        default=int(os.getenv("NOTES_MOCK_NOTES", "0")),
+        help=(
+            "Seed the offline Notes mock account with this many notes, restored "
+            "before every test, e.g. 10000-100000 (env NOTES_MOCK_NOTES)."
+        ),
+    )
+    parser.addoption(
+        "--notes-mock-cross-logout",
+        action="store",
+        type=float,
+        default=float(os.getenv("NOTES_MOCK_CROSS_LOGOUT", "0")),
+        help=(
+            "Probability that a logout on the offline Notes mock also ends every "
+            "other session of the account, as the live app sometimes does "
+            "(env NOTES_MOCK_CROSS_LOGOUT)."
+        ),
+    )
 
 
 @pytest.fixture(scope="session")
@@ -58,37 +126,6 @@ class _MaskedStr(str):
         return repr(masked)
 
 
-def _mask_email(value: str) -> str:
-    try:
-        name, domain = value.split("@", 1)
-    except ValueError:
-        return "***"
-    visible = name[:1] if name else ""
-    return f"{visible}***@{domain}"
-
-
-def _mask_card(value: str) -> str:
-    digits = "".join(ch for ch in value if ch.isdigit())
-    tail = digits[-4:] if len(digits) >= 4 else "****"
-    return f"**** **** **** {tail}"
-
-
-_SENSITIVE_KEYS = {
-    "password",
-    "email",
-    "token",
-    "auth_token",
-    "x-auth-token",
-    "authorization",
-    "card_number",
-    "cvc",
-    "api_key",
-    "apikey",
-    "client_secret",
-    "secret",
-}
-
-
 def _redact_in_repr(data: Any, parent_key: str | None = None) -> Any:
     """Recursively wrap sensitive string values so their repr is masked.
 
@@ -103,18 +140,8 @@ def _redact_in_repr(data: Any, parent_key: str | None = None) -> Any:
     if isinstance(data, list):
         return [_redact_in_repr(v, parent_key) for v in data]
     if isinstance(data, str):
-        key = (parent_key or "").lower().replace("-", "_")
-        if key in _SENSITIVE_KEYS:
-            masked: str
-            if "email" in key:
-                masked = _mask_email(data)
-            elif "card" in key:
-                masked = _mask_card(data)
-            elif key in {"cvc"}:
-                masked = "***"
-            else:
-                masked = "***"
-            return _MaskedStr(data, masked)
+        if is_sensitive_key(parent_key):
+            return _MaskedStr(data, mask_value(parent_key or "", data))
         return data
     return data
 
@@ -149,41 +176,117 @@ def test_users() -> dict:
 # --- DB-logging -------------------------------------------------
 
 
+# Shared by the controller and its xdist workers; rows of one session carry it
+_RUN_ID = pytest.StashKey[str]()
+# Reports of the phases a test has been through so far
+_PHASES = pytest.StashKey[dict[str, pytest.TestReport]]()
+
+
+def _browser_name(config: pytest.Config) -> str:
+    browser_option = config.getoption("browser", default="unknown")
+    if isinstance(browser_option, (list, tuple)):
+        return browser_option[0] if browser_option else "unknown"
+    if isinstance(browser_option, str) and browser_option:
+        return browser_option
+    return "unknown"
+
+
+def _is_xdist_worker(config: pytest.Config) -> bool:
+    return hasattr(config, "workerinput")
+
+
 @pytest.hookimpl(tryfirst=True)
 def pytest_sessionstart(session: pytest.Session) -> None:
     init_db()
+    config = session.config
+    if _is_xdist_worker(config):
+        config.stash[_RUN_ID] = config.workerinput["db_run_id"]  # type: ignore[attr-defined]
+        if config.getoption("db_writer") == "controller":
+            forward_rows()
+        return
+    resumed = config.getoption("resume")
+    if resumed:
+        # A continuation: new rows join the interrupted run's
+        config.stash[_RUN_ID] = resumed
+        resume_run(resumed)
+        return
+    run_id = os.getenv("TEST_RUN_ID") or (
+        f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid4().hex[:6]}"
+    )
+    config.stash[_RUN_ID] = run_id
+    start_run(
+        run_id,
+        git_sha=git_sha(),
+        profile=config.getoption("profile"),
+        browser=_browser_name(config),
+        workers=getattr(config.option, "numprocesses", None) or 1,
+    )
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node: Any) -> None:
+    """On the xdist controller: hand the run id to a worker being started."""
+    node.workerinput["db_run_id"] = node.config.stash[_RUN_ID]
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:
+    """Write what is still buffered, or hand it to the xdist controller."""
+    config = session.config
+    if is_forwarding():
+        config.workeroutput["db_rows"] = forward_rows().drain()  # type: ignore[attr-defined]
+    close_writers()
+    if not _is_xdist_worker(config) and _RUN_ID in config.stash:
+        finish_run(config.stash[_RUN_ID], int(exitstatus))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node: Any, error: Any) -> None:
+    """On the xdist controller: write the rows a finished worker forwarded."""
+    rows = getattr(node, "workeroutput", {}).get("db_rows") or {}
+    writer = writer_for()
+    for table, table_rows in rows.items():
+        writer.add_many(table, [tuple(row) for row in table_rows])
 
 
 @pytest.hookimpl(hookwrapper=True)
 def pytest_runtest_makereport(
     item: pytest.Item, call: pytest.CallInfo
 ) -> Generator[None, Any, None]:
-    """Capture test outcome and log to database."""
+    """Capture test outcome and per-phase timings and log them to the database.
+
+    The row is written after teardown so it carries all three phases; tests
+    that never reached the call phase (setup failed or skipped) are not logged.
+    """
     outcome: Any = yield
     report = outcome.get_result()
-    if call.when != "call":
+    phases = item.stash.setdefault(_PHASES, {})
+    phases[call.when] = report
+    if call.when != "teardown":
+        return
+    del item.stash[_PHASES]
+    call_report = phases.get("call")
+    if call_report is None:
         return
 
-    browser_option = item.config.getoption("browser", default="unknown")
-    if isinstance(browser_option, (list, tuple)):
-        browser = browser_option[0] if browser_option else "unknown"
-    elif isinstance(browser_option, str) and browser_option:
-        browser = browser_option
-    else:
-        browser = "unknown"
-
-    start_ts = int(time.time())
-    failure_message = str(report.longrepr) if report.failed else None
+    def phase_ms(when: str) -> int | None:
+        phase = phases.get(when)
+        return int(phase.duration * 1000) if phase and phase.duration else None
+
+    failure_message = str(call_report.longrepr) if call_report.failed else None
     if failure_message and len(failure_message) > 512:
         failure_message = failure_message[:512]
-    duration_ms = int(report.duration * 1000) if report.duration else None
 
     log_test_run(
         nodeid=item.nodeid,
-        outcome=report.outcome,
-        browser=browser,
+        outcome=call_report.outcome,
+        browser=_browser_name(item.config),
         failure_message=failure_message,
         test_name=item.name,
-        start_ts=start_ts,
-        duration_ms=duration_ms,
+        start_ts=int(phases.get("setup", call_report).start),
+        duration_ms=phase_ms("call"),
+        run_id=item.config.stash[_RUN_ID],
+        worker_id=os.getenv("PYTEST_XDIST_WORKER", "main"),
+        setup_ms=phase_ms("setup"),
+        teardown_ms=phase_ms("teardown"),
     )
@@ -1,37 +1,91 @@
 # notes/conftest.py
-from collections.abc import Callable, Iterator
+from collections.abc import AsyncIterator, Callable, Iterator
 from typing import Any
 from uuid import uuid4
 import os
-import json
-import re
-from datetime import datetime, timezone
-from urllib.parse import parse_qsl
+import tempfile
+import time
 from playwright.sync_api import Browser, TimeoutError as PlaywrightTimeoutError, Page
 from pathlib import Path
 from filelock import FileLock
 import pytest
 import requests
-import responses  # type: ignore
-
-from notes.helpers.api_client import ApiClient
+from requests.adapters import BaseAdapter
+
+from notes.helpers.api_client import (
+    ApiClient,
+    build_session,
+    register_transport,
+    unregister_transport,
+)
+from notes.helpers.async_api_client import AsyncApiClient
+from notes.helpers.cassette import RecordingAdapter, ReplayAdapter
+from notes.helpers.mock_backend import NotesMockBackend
+from notes.helpers.mock_faults import get_profile, injector_for
+from notes.helpers.mock_server import SharedMockServer
+from notes.helpers.mock_sessions import MockSessions
+from notes.helpers.mock_transport import NotesMockAdapter
+from notes.helpers.response_cache import ResponseCache
+from notes.helpers.retry import set_circuit_state_dir
+from notes.helpers.storage_state import (
+    AuthGeneration,
+    StorageStateCheck,
+    storage_state_for_token,
+    write_storage_state,
+)
+from notes.helpers.token_cache import TokenCache
 from notes.pages.home_page import HomePage
 from notes.pages.login_page import LoginPage
-from config import BASE_URL_API
+from config import BASE_URL, BASE_URL_API
 from shared.helpers.ad_blocker import block_ads_on_context
+from shared.helpers.db_logger import ApiCallRecorder
 
 NOTES_AUTH_DIR = Path(".auth/notes")
 NOTES_AUTH_DIR.mkdir(parents=True, exist_ok=True)
 NOTES_HOME_URL = HomePage.URL
 
+# "record" saves live Notes API traffic to cassettes, "replay" answers from them
+NOTES_CASSETTES = os.getenv("NOTES_CASSETTES", "")
+NOTES_CASSETTE_DIR = Path(os.getenv("NOTES_CASSETTE_DIR", "notes/cassettes"))
+# Offline and live tokens must never be mixed up on disk
+NOTES_OFFLINE = os.getenv("NOTES_OFFLINE", "0") == "1" or NOTES_CASSETTES == "replay"
+# Which backend answers: tokens and circuit breakers are kept per transport
+if NOTES_CASSETTES == "replay":
+    NOTES_TRANSPORT = "replay"  # Replayed tokens are masked placeholders
+else:
+    NOTES_TRANSPORT = "offline" if NOTES_OFFLINE else "live"
+# Offline transport for sync ApiClient tests: "adapter" answers in-process,
+# "server" sends real HTTP to the shared loopback mock server
+NOTES_MOCK_MODE = os.getenv("NOTES_MOCK_MODE", "adapter")
+# How UI tests get their storage state: "ui" drives the login form, "api" logs
+# in through ApiClient and writes the state without rendering a page
+NOTES_AUTH = os.getenv("NOTES_AUTH", "ui")
+
 # Global registry to track all notes created during test session
 _test_note_ids: set[str] = set()
+# Auth generation each storage state was last validated at in this worker
+_validated_generation: dict[Path, int] = {}
+# Auth revalidation cost (ms) per logged-in page test, None where it was skipped
+_auth_checks: list[int | None] = []
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    # Let an open Notes API circuit short-circuit every xdist worker of this
+    # run, not just one; a later run starts closed. Without xdist the
+    # process's own breakers are enough
+    cache = getattr(config, "cache", None)
+    workerinput = getattr(config, "workerinput", None)
+    state_dir = None
+    if cache is not None and workerinput is not None:
+        state_dir = cache.mkdir("notes_api_circuit") / workerinput["testrunuid"]
+    set_circuit_state_dir(state_dir, scope=NOTES_TRANSPORT)
 
 
 # --- pytest-playwright plugin fixtures ---
 @pytest.fixture(scope="function")
 def browser_context_args(
     browser_context_args,
+    ensure_valid_notes_auth: None,
     notes_auth_state: Path,
     request: pytest.FixtureRequest,
     browser: Browser,
@@ -40,8 +94,10 @@ def browser_context_args(
 ):
     """Inject storage_state into plugin-managed browser context for UI tests only.
 
-    If the storage state file doesn't exist (e.g., deleted by cleanup), recreate it
-    before Playwright tries to use it.
+    Depends on `ensure_valid_notes_auth`, so the state is revalidated before
+    any context loads it, even when an autouse fixture asks for `context`
+    first. If the storage state file doesn't exist (e.g., deleted by cleanup),
+    recreate it before Playwright tries to use it.
     """
     # Only apply to tests marked with @pytest.mark.ui
     if "ui" not in request.keywords and "hybrid" not in request.keywords:
@@ -83,13 +139,17 @@ def _purge_all_notes_auth_states() -> None:
     """Delete all cached Notes storage_state files and their locks."""
     for state_file in NOTES_AUTH_DIR.glob("storage_state_*.json"):
         state_file.unlink(missing_ok=True)
+        _storage_state_check.forget(state_file)
         state_file.with_suffix(".lock").unlink(missing_ok=True)
 
 
 def _create_storage_state(
     browser: Browser, storage_path: Path, user: dict[str, str]
 ) -> None:
-    """Log in via the UI and persist the storage state to disk."""
+    """Log in and persist the storage state to disk, as `NOTES_AUTH` says."""
+    if NOTES_AUTH == "api":
+        _mint_storage_state(storage_path, user)
+        return
     page = browser.new_page()
     login_page = LoginPage(page)
 
@@ -101,8 +161,53 @@ def _create_storage_state(
     page.close()
 
 
+def _mint_storage_state(storage_path: Path, user: dict[str, str]) -> None:
+    """Log in through the API and write the token where the web app keeps it."""
+    with ApiClient(BASE_URL_API) as api_client:
+        api_client.login_user(email=user["email"], password=user["password"])
+        state = storage_state_for_token(
+            BASE_URL, api_client.token or "", api_client.session.cookies
+        )
+    write_storage_state(storage_path, state)
+
+
+def _probe_notes_token(token: str) -> bool | None:
+    """One authenticated API call: is the UI's token still accepted?
+
+    Goes through `ApiClient`, so it uses the registered transport (mock,
+    cassettes) and the host's circuit breaker like every other API call.
+    """
+    with ApiClient(BASE_URL_API, timeout=5) as api_client:
+        api_client.token = token
+        try:
+            api_client.get_user_profile()
+        except requests.HTTPError as exc:
+            status = exc.response.status_code if exc.response is not None else None
+            return False if status in (401, 403) else None
+        except requests.RequestException:
+            return None
+    return True
+
+
+_storage_state_check = StorageStateCheck(BASE_URL, _probe_notes_token)
+
+
 def _storage_state_is_valid(browser: Browser, storage_path: Path) -> bool:
-    """Return True if the cached storage state still represents a logged-in session."""
+    """Return True if the cached storage state still represents a logged-in session.
+
+    Reads the file and probes its token first (see `StorageStateCheck`), and
+    loads the app in a browser only when that cannot tell.
+    """
+    verdict = _storage_state_check.check(storage_path)
+    if verdict is not None:
+        return verdict
+    if not _browser_storage_state_is_valid(browser, storage_path):
+        return False
+    _storage_state_check.remember(storage_path)
+    return True
+
+
+def _browser_storage_state_is_valid(browser: Browser, storage_path: Path) -> bool:
     context = browser.new_context(storage_state=storage_path)
     block_ads_on_context(context)
     page = context.new_page()
@@ -123,53 +228,139 @@ def _storage_state_is_valid(browser: Browser, storage_path: Path) -> bool:
 @pytest.fixture(scope="session")
 def notes_auth_state(browser: Browser, test_users: dict, profile_name: str) -> Path:
     """Create a logged-in state for Notes UI tests."""
-    storage_path = NOTES_AUTH_DIR / f"storage_state_{profile_name}.json"
+    storage_path = _storage_path(profile_name)
     lock = FileLock(storage_path.with_suffix(".lock"))
+    generation = _auth_generation(profile_name).current()
 
     with lock:
         if storage_path.exists():
             if _storage_state_is_valid(browser, storage_path):
+                _validated_generation[storage_path] = generation
                 return storage_path
             storage_path.unlink(missing_ok=True)
 
         user = test_users[profile_name]
         _create_storage_state(browser, storage_path, user)
 
+    _validated_generation[storage_path] = generation
     return storage_path
 
 
+def _storage_path(profile_name: str) -> Path:
+    return NOTES_AUTH_DIR / f"storage_state_{profile_name}.json"
+
+
+def _auth_generation(profile_name: str) -> AuthGeneration:
+    return AuthGeneration(NOTES_AUTH_DIR / f"auth_generation_{profile_name}.txt")
+
+
+def _mark_notes_auth_stale(profile_name: str) -> None:
+    """Make every worker revalidate the profile's cached login before reuse."""
+    _auth_generation(profile_name).bump()
+    _storage_state_check.forget(_storage_path(profile_name))
+
+
+@pytest.fixture(autouse=True)
+def _notes_logout_watch(request: pytest.FixtureRequest) -> Iterator[None]:
+    """Mark the profile's cached login stale after a test that may have ended it.
+
+    `seq_only` tests log out by design; a UI test counts once its page sends
+    the logout request. A logout can end the account's other sessions too.
+    """
+    watch_ui = "ui" in request.keywords
+    if not watch_ui and "seq_only" not in request.keywords:
+        yield
+        return
+    profile_name = request.getfixturevalue("profile_name")
+    logouts: list[str] = []
+    if watch_ui:
+        context = request.getfixturevalue("context")
+        context.on(
+            "request",
+            lambda req: logouts.append(req.url) if "/users/logout" in req.url else None,
+        )
+    yield
+    if logouts or "seq_only" in request.keywords:
+        _mark_notes_auth_stale(profile_name)
+
+
 @pytest.fixture()
 def ensure_valid_notes_auth(
-    browser: Browser, notes_auth_state: Path, test_users: dict, profile_name: str
+    request: pytest.FixtureRequest,
+    browser: Browser,
+    notes_auth_state: Path,
+    test_users: dict,
+    profile_name: str,
 ) -> None:
-    """Ensure cached storage_state is still valid; recreate if logout invalidated it.
+    """Revalidate the cached storage_state once its auth generation has moved.
 
-    This guards against tests (e.g., an E2E flow) that explicitly log out and
-    thereby invalidate the session cached in `notes_auth_state`.
+    Tests that may log out (see `_notes_logout_watch`) bump the generation;
+    until then the state this worker validated is reused without a check.
+    The cost of each check lands in the `notes_auth_check` user property.
     """
+    if "no_auth" in request.keywords:
+        return
+    generation = _auth_generation(profile_name).current()
+    if _validated_generation.get(notes_auth_state) == generation:
+        request.node.user_properties.append(("notes_auth_check", None))
+        return
+    started = time.perf_counter()
     try:
-        if not _storage_state_is_valid(browser, notes_auth_state):
-            user = test_users[profile_name]
-            _create_storage_state(browser, notes_auth_state, user)
-    except Exception:
-        # Defensive: never block tests due to validation; they'll still attempt login flows
+        with FileLock(notes_auth_state.with_suffix(".lock")):
+            if not _storage_state_is_valid(browser, notes_auth_state):
+                user = test_users[profile_name]
+                _create_storage_state(browser, notes_auth_state, user)
+        _validated_generation[notes_auth_state] = generation
+    except (requests.RequestException, PlaywrightTimeoutError):
+        # The site is slow or unreachable: leave the generation unvalidated so
+        # the next test retries, and let this one attempt its own login flows
         pass
+    except Exception as exc:
+        pytest.fail(
+            f"Could not revalidate the Notes login of {profile_name!r}: "
+            f"{type(exc).__name__}: {exc}",
+            pytrace=False,
+        )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    request.node.user_properties.append(("notes_auth_check", round(elapsed_ms)))
 
 
 @pytest.fixture()
 def notes_logged_in_page(
-    page: Page, ensure_valid_notes_auth: None
+    ensure_valid_notes_auth: None,
+    page: Page,
+    notes_auth_state: Path,
+    test_users: dict,
+    profile_name: str,
 ) -> Iterator[HomePage]:
     """Yield a HomePage using plugin-managed page with storage_state injected.
 
-    Re-validates auth state before navigation to avoid stale sessions.
+    Auth is revalidated first (so the context loads a fresh state) only when
+    it may have gone stale. If the page still lands logged out, the login is
+    marked stale for every worker, redone in this page and saved.
     """
     home_page = HomePage(page)
+    login_page = LoginPage(page)
     home_page.load()
 
     # Wait for page to be ready
     page.wait_for_url(f"**{NOTES_HOME_URL}**", timeout=10_000)
-    home_page.logout_button.wait_for(state="attached", timeout=10_000)
+    home_page.logout_button.or_(login_page.logged_out_marker).first.wait_for(
+        state="attached", timeout=10_000
+    )
+    if not home_page.logout_button.count():
+        _mark_notes_auth_stale(profile_name)
+        user = test_users[profile_name]
+        with FileLock(notes_auth_state.with_suffix(".lock")):
+            login_page.load()
+            login_page.login(user["email"], user["password"])
+            page.wait_for_url(f"**{NOTES_HOME_URL}**", timeout=10_000)
+            page.context.storage_state(path=notes_auth_state)
+        _validated_generation[notes_auth_state] = _auth_generation(
+            profile_name
+        ).current()
+        home_page.load()
+        home_page.logout_button.wait_for(state="attached", timeout=10_000)
 
     try:
         yield home_page
@@ -178,10 +369,40 @@ def notes_logged_in_page(
         pass
 
 
+def pytest_runtest_logreport(report: pytest.TestReport) -> None:
+    if report.when != "setup":
+        return
+    _auth_checks.extend(
+        value if isinstance(value, int) else None
+        for name, value in report.user_properties
+        if name == "notes_auth_check"
+    )
+
+
+def pytest_terminal_summary(terminalreporter) -> None:
+    if not _auth_checks:
+        return
+    costs = [ms for ms in _auth_checks if ms is not None]
+    skipped = len(_auth_checks) - len(costs)
+    terminalreporter.write_sep("-", "notes auth")
+    line = (
+        f"revalidated before {len(costs)} of {len(_auth_checks)} logged-in page tests"
+    )
+    if costs:
+        average_ms = sum(costs) / len(costs)
+        line += (
+            f" ({average_ms:.0f} ms each); skipped for {skipped}, "
+            f"about {skipped * average_ms / 1000:.1f}s of setup saved"
+        )
+    terminalreporter.write_line(line)
+
+
 # --- session-scoped cleanup fixture ---
 @pytest.fixture(scope="session", autouse=True)
 def cleanup_all_test_notes(
     request: pytest.FixtureRequest,
+    notes_api_session: requests.Session,
+    notes_api_base_url: str,
 ) -> Iterator[None]:
     """
     Session-scoped fixture that runs AFTER all tests and deletes ALL notes created.
@@ -201,9 +422,14 @@ def cleanup_all_test_notes(
     except Exception:
         return  # Can't get test users, skip cleanup
 
-    cleanup_client = ApiClient(BASE_URL_API)
+    cleanup_client = ApiClient(notes_api_base_url, session=notes_api_session)
     try:
-        cleanup_client.login_user(user["email"], user["password"])
+        _authenticate_from_cache(
+            cleanup_client,
+            request.getfixturevalue("notes_token_cache"),
+            profile_name,
+            user,
+        )
     except Exception:
         return  # Can't authenticate, skip cleanup
 
@@ -361,15 +587,118 @@ def notes_session_invalidator_cleanup() -> Iterator[None]:
 
 
 # --- api testing fixtures -------------------------------------------------
-@pytest.fixture(
-    scope="function"
-)  # isolate auth/token per test; switch to session for speed if safe
-def api_client_auth(test_users: dict, profile_name: str) -> ApiClient:
-    """Create an API client for the notes API."""
-    api_client = ApiClient(BASE_URL_API)
+@pytest.fixture(scope="session")
+def notes_api_session(
+    notes_mock_transport: BaseAdapter | None,
+) -> Iterator[requests.Session]:
+    """Keep-alive connection pool shared by every Notes API client in this worker."""
+    session = build_session()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def api_call_recorder() -> Iterator[ApiCallRecorder]:
+    """Batch per-request timings into the `api_calls` table of the results DB."""
+    recorder = ApiCallRecorder()
+    try:
+        yield recorder
+    finally:
+        recorder.flush()
+
+
+@pytest.fixture(scope="session")
+def notes_token_cache() -> TokenCache:
+    """Login tokens shared by all xdist workers through `.auth/notes`."""
+    return TokenCache(NOTES_AUTH_DIR, namespace=NOTES_TRANSPORT)
+
+
+def _authenticate_from_cache(
+    api_client: ApiClient, token_cache: TokenCache, profile_name: str, user: dict
+) -> None:
+    """Reuse the cached token for `profile_name` and re-login on 401."""
+
+    def login() -> str:
+        api_client.login_user(email=user["email"], password=user["password"])
+        return api_client.token or ""
+
+    def probe(token: str) -> bool:
+        api_client.token = token
+        try:
+            api_client.get_user_profile()
+        except requests.exceptions.HTTPError:
+            return False
+        return True
+
+    api_client.token = token_cache.get(profile_name, login=login, probe=probe)
+    api_client.on_unauthorized = lambda stale_token: token_cache.refresh(
+        profile_name, stale_token, login=login
+    )
+
+
+@pytest.fixture(scope="function")
+def api_client_auth(
+    request: pytest.FixtureRequest,
+    test_users: dict,
+    profile_name: str,
+    notes_api_session: requests.Session,
+    notes_token_cache: TokenCache,
+    api_call_recorder: ApiCallRecorder,
+    notes_api_base_url: str,
+) -> Iterator[ApiClient]:
+    """Create an API client for the notes API.
+
+    The token comes from the cross-worker cache; mark a test with
+    `@pytest.mark.isolated_auth` to give it a fresh login of its own.
+    `@pytest.mark.api_cache` attaches a ResponseCache and records its counters
+    as the `api_cache` user property of the test report. Every request is timed
+    into the `api_calls` table.
+    """
+    cache = ResponseCache() if "api_cache" in request.keywords else None
+    api_client = ApiClient(
+        notes_api_base_url,
+        session=notes_api_session,
+        cache=cache,
+        call_hooks=[api_call_recorder.record],
+    )
+    user = test_users[profile_name]
+    if "isolated_auth" in request.keywords:
+        api_client.login_user(email=user["email"], password=user["password"])
+    else:
+        _authenticate_from_cache(api_client, notes_token_cache, profile_name, user)
+    yield api_client
+    if cache is not None:
+        request.node.user_properties.append(("api_cache", cache.stats()))
+
+
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    """Run `@pytest.mark.anyio` tests on asyncio only (AsyncApiClient needs it)."""
+    return "asyncio"
+
+
+@pytest.fixture
+async def async_api_client_auth(
+    request: pytest.FixtureRequest, test_users: dict, profile_name: str
+) -> AsyncIterator[AsyncApiClient]:
+    """Logged-in AsyncApiClient; offline it talks to the loopback mock server.
+
+    AsyncApiClient does not retry, so offline its tests are skipped under a
+    `--notes-mock-profile` that answers some requests with errors.
+    """
+    if NOTES_OFFLINE:
+        profile = get_profile(request.config.getoption("notes_mock_profile"))
+        if profile.fails and not NOTES_CASSETTES:
+            pytest.skip(f"AsyncApiClient has no retries for {profile.name!r} faults")
+        base_url = request.getfixturevalue("notes_mock_server").base_url
+    else:
+        base_url = BASE_URL_API
     user = test_users[profile_name]
-    api_client.login_user(email=user["email"], password=user["password"])
-    return api_client
+    async with AsyncApiClient(base_url) as client:
+        await client.login_user(email=user["email"], password=user["password"])
+        yield client
 
 
 @pytest.fixture
@@ -416,197 +745,112 @@ def note_factory(
 
 # --- Offline Notes API mock -------------------------------------------------
 # Enables running the Notes API tests without hitting the real external site.
-# Activate by setting environment variable: NOTES_OFFLINE=1
+# Activate by setting environment variable: NOTES_OFFLINE=1 (read at the top).
+
 
-NOTES_OFFLINE = os.getenv("NOTES_OFFLINE", "0") == "1"
+@pytest.fixture(scope="session")
+def notes_mock_server(request: pytest.FixtureRequest) -> Iterator[SharedMockServer]:
+    """Offline mock over loopback HTTP, one server process for all xdist workers.
+
+    `base_url` is namespaced per worker process, so parallel workers (and
+    concurrent runs) never see each other's notes. Serves clients the in-process
+    adapter can't reach (AsyncApiClient, subprocesses) and `NOTES_MOCK_MODE=server`.
+    """
+    profile = request.config.getoption("notes_mock_profile")
+    seed = request.config.getoption("notes_mock_seed")
+    notes = request.config.getoption("notes_mock_notes")
+    cross_logout = request.config.getoption("notes_mock_cross_logout")
+    # Shared by the workers, so a machine-wide temp dir without the cache plugin
+    cache = getattr(request.config, "cache", None)
+    state_dir = (
+        cache.mkdir("notes_mock_server")
+        if cache is not None
+        else Path(tempfile.gettempdir()) / "notes_mock_server"
+    )
+    worker = os.getenv("PYTEST_XDIST_WORKER", "main")
+    server = SharedMockServer.acquire(
+        # One server per mock setup; runs with different profiles don't mix
+        state_dir / f"{profile}-{seed}-{notes}-{cross_logout}",
+        namespace=f"{worker}-{os.getpid()}",
+        profile=profile,
+        seed=seed,
+        notes=notes,
+        cross_logout=cross_logout,
+    )
+    try:
+        yield server
+    finally:
+        server.release()
+
+
+@pytest.fixture(scope="session")
+def notes_api_base_url(request: pytest.FixtureRequest) -> str:
+    """Notes API root for sync clients: live site, or the shared mock server."""
+    if NOTES_OFFLINE and not NOTES_CASSETTES and NOTES_MOCK_MODE == "server":
+        return request.getfixturevalue("notes_mock_server").base_url
+    return BASE_URL_API
+
+
+@pytest.fixture(scope="session")
+def notes_mock_transport(
+    pytestconfig: pytest.Config,
+) -> Iterator[BaseAdapter | None]:
+    """Transport for `BASE_URL_API` in every session built from here on.
+
+    Offline it answers in-process: from cassettes with `NOTES_CASSETTES=replay`,
+    otherwise from the mock backend, whose routing table is compiled at import
+    so the per-test cost is only the store reset in `notes_api_mock`. Latency
+    and faults follow `--notes-mock-profile` / `--notes-mock-seed`, account size
+    `--notes-mock-notes`, logout semantics `--notes-mock-cross-logout`. With
+    `NOTES_CASSETTES=record` live traffic passes through and is saved to
+    `NOTES_CASSETTE_DIR`.
+    """
+    adapter: BaseAdapter
+    if NOTES_CASSETTES == "record":
+        adapter = RecordingAdapter(NOTES_CASSETTE_DIR)
+    elif NOTES_CASSETTES == "replay":
+        adapter = ReplayAdapter(NOTES_CASSETTE_DIR)
+    elif NOTES_OFFLINE and NOTES_MOCK_MODE != "server":
+        seed = pytestconfig.getoption("notes_mock_seed")
+        faults = injector_for(pytestconfig.getoption("notes_mock_profile"), seed)
+        sessions = MockSessions(pytestconfig.getoption("notes_mock_cross_logout"), seed)
+        backend = NotesMockBackend.seeded(
+            pytestconfig.getoption("notes_mock_notes"),
+            seed=seed,
+            faults=faults,
+            sessions=sessions,
+        )
+        adapter = NotesMockAdapter(backend)
+    else:
+        yield None
+        return
+    register_transport(BASE_URL_API, adapter)
+    try:
+        yield adapter
+    finally:
+        unregister_transport(BASE_URL_API)
+        adapter.close()
 
 
 @pytest.fixture(autouse=True)
 def notes_api_mock(request: pytest.FixtureRequest) -> Iterator[None]:
-    """Mock Notes API when NOTES_OFFLINE=1 for API tests only.
+    """Give each offline Notes API test an empty note store (or its cassette).
 
     Scope: tests marked with both `@pytest.mark.notes` and `@pytest.mark.api`.
-    Always yields once even when mock is disabled to satisfy generator contract.
     """
     # Only affect Notes API tests (avoid touching UI tests entirely)
     if not ("notes" in request.keywords and "api" in request.keywords):
         yield
         return
 
-    # If offline is disabled, do nothing but still yield once
-    if not NOTES_OFFLINE:
-        yield
+    transport = request.getfixturevalue("notes_mock_transport")
+    if isinstance(transport, RecordingAdapter | ReplayAdapter):
+        transport.begin_test(request.node.nodeid)
+        try:
+            yield
+        finally:
+            transport.end_test()
         return
-
-    store: dict[str, dict] = {}
-
-    def now_iso() -> str:
-        return datetime.now(timezone.utc).isoformat()
-
-    def parse_body(req) -> dict:
-        if not req.body:
-            return {}
-        if isinstance(req.body, (bytes, bytearray)):
-            return dict(parse_qsl(req.body.decode()))
-        if isinstance(req.body, str):
-            return dict(parse_qsl(req.body))
-        if isinstance(req.body, dict):
-            return req.body
-        return {}
-
-    def is_authorized(req) -> bool:
-        token = req.headers.get("x-auth-token") if req.headers else None
-        return token == "fake-token"
-
-    allowed_categories = {"Home", "Work"}
-
-    def get_note_id_from_url(url: str) -> str:
-        """Extract note ID from URL path."""
-        match = re.search(r"/notes/([A-Za-z0-9\-]+)$", url)
-        if not match:
-            raise ValueError(f"Could not extract note ID from URL: {url}")
-        return match.group(1)
-
-    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
-        # POST /users/login
-        def login_cb(req):
-            data = parse_body(req)
-            if data.get("password") == "wrong-password":
-                return (
-                    401,
-                    {},
-                    json.dumps({"success": False, "message": "Unauthorized"}),
-                )
-            return (
-                200,
-                {},
-                json.dumps({"success": True, "data": {"token": "fake-token"}}),
-            )
-
-        rsps.add_callback(
-            responses.POST,
-            re.compile(r".*/notes/api/users/login$"),
-            callback=lambda req, **kw: login_cb(req),
-            content_type="application/json",
-        )
-
-        # Notes endpoints must be authorized
-        def require_auth(handler):
-            def wrapped(req, *args, **kwargs):
-                if not is_authorized(req):
-                    return (
-                        401,
-                        {},
-                        json.dumps({"success": False, "message": "Unauthorized"}),
-                    )
-                return handler(req, *args, **kwargs)
-
-            return wrapped
-
-        # POST /notes (create)
-        @require_auth
-        def create_note_cb(req):
-            data = parse_body(req)
-            category = data.get("category", "Home")
-            if category not in allowed_categories:
-                return (
-                    422,
-                    {},
-                    json.dumps({"success": False, "message": "Invalid category"}),
-                )
-            note_id = uuid4().hex[:12]
-            note = {
-                "id": note_id,
-                "title": data.get("title", ""),
-                "description": data.get("description", ""),
-                "category": category,
-                "completed": False,
-                "created_at": now_iso(),
-            }
-            store[note_id] = note
-            return (200, {}, json.dumps({"success": True, "data": note}))
-
-        rsps.add_callback(
-            responses.POST,
-            re.compile(r".*/notes/api/notes$"),
-            callback=lambda req, **kw: create_note_cb(req),
-            content_type="application/json",
-        )
-
-        # GET /notes (list)
-        @require_auth
-        def list_notes_cb(_req):
-            return (
-                200,
-                {},
-                json.dumps({"success": True, "data": list(store.values())}),
-            )
-
-        rsps.add_callback(
-            responses.GET,
-            re.compile(r".*/notes/api/notes$"),
-            callback=lambda req, **kw: list_notes_cb(req),
-            content_type="application/json",
-        )
-
-        # GET /notes/{id}
-        @require_auth
-        def get_note_cb(_req, id_: str):
-            note = store.get(id_)
-            if not note:
-                return (404, {}, json.dumps({"success": False, "message": "Not Found"}))
-            return (200, {}, json.dumps({"success": True, "data": note}))
-
-        rsps.add_callback(
-            responses.GET,
-            re.compile(r".*/notes/api/notes/([A-Za-z0-9\-]+)$"),
-            callback=lambda req, **kw: get_note_cb(req, get_note_id_from_url(req.url)),
-            content_type="application/json",
-        )
-
-        # PUT /notes/{id}
-        @require_auth
-        def update_note_cb(req, id_: str):
-            if id_ not in store:
-                return (404, {}, json.dumps({"success": False, "message": "Not Found"}))
-            payload = parse_body(req)
-            note = store[id_]
-            note.update(
-                {
-                    "title": payload.get("title", note["title"]),
-                    "description": payload.get("description", note["description"]),
-                    "category": payload.get("category", note["category"]),
-                    "completed": str(payload.get("completed", "false")).strip().lower()
-                    == "true",
-                }
-            )
-            return (200, {}, json.dumps({"success": True, "data": note}))
-
-        rsps.add_callback(
-            responses.PUT,
-            re.compile(r".*/notes/api/notes/([A-Za-z0-9\-]+)$"),
-            callback=lambda req, **kw: update_note_cb(
-                req, get_note_id_from_url(req.url)
-            ),
-            content_type="application/json",
-        )
-
-        # DELETE /notes/{id}
-        @require_auth
-        def delete_note_cb(_req, id_: str):
-            if id_ not in store:
-                return (404, {}, json.dumps({"success": False, "message": "Not Found"}))
-            del store[id_]
-            return (200, {}, json.dumps({"success": True, "data": {}}))
-
-        rsps.add_callback(
-            responses.DELETE,
-            re.compile(r".*/notes/api/notes/([A-Za-z0-9\-]+)$"),
-            callback=lambda req, **kw: delete_note_cb(
-                req, get_note_id_from_url(req.url)
-            ),
-            content_type="application/json",
-        )
-
-        # Keep the mock active for the duration of the test
-        yield
+    if isinstance(transport, NotesMockAdapter):
+        transport.backend.reset()
+    yield
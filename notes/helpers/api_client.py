@@ -1,5 +1,29 @@
 # notes/helpers/api_client.py
+import time
+from collections.abc import Callable, Iterable, Iterator
+from types import TracebackType
+from typing import Any
+
 import requests
+from requests.adapters import BaseAdapter
+
+from notes.helpers.api_timing import (
+    TimedHTTPAdapter,
+    endpoint_template,
+    take_connect_time,
+)
+from notes.helpers.lazy_payload import STREAM_CHUNK_SIZE, LazyNoteList, iter_notes
+from notes.helpers.models import Note, NoteList
+from notes.helpers.response_cache import ResponseCache
+from notes.helpers.retry import (
+    FAILURE_STATUSES,
+    NEUTRAL_STATUSES,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    circuit_breaker_for,
+)
+from shared.helpers.db_logger import ApiCall, log_api_event
 
 
 GET = "GET"
@@ -8,14 +32,63 @@ PUT = "PUT"
 PATCH = "PATCH"
 DELETE = "DELETE"
 
+# Number of distinct hosts to keep pools for, and sockets kept per host
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 16
 
-class ApiClient:
-    def __init__(
-        self, BASE_URL_API: str, *, timeout: float | tuple[float, float] = 20.0
-    ) -> None:
-        self.base_url = BASE_URL_API
-        self.token: str | None = None
-        self.timeout = timeout
+# URL prefix -> adapter mounted by every new build_session (e.g. offline mocks)
+_transports: dict[str, BaseAdapter] = {}
+
+
+def register_transport(prefix: str, adapter: BaseAdapter) -> None:
+    """Route requests under ``prefix`` through ``adapter`` in new sessions."""
+    _transports[prefix] = adapter
+
+
+def unregister_transport(prefix: str) -> None:
+    _transports.pop(prefix, None)
+
+
+def build_session(
+    *,
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+    pool_block: bool = False,
+    keep_alive: bool = True,
+) -> requests.Session:
+    """Return a ``requests.Session`` backed by a sized keep-alive connection pool.
+
+    ``pool_maxsize`` caps the sockets kept open per host; with ``pool_block`` the
+    caller waits for a free socket instead of opening a throwaway one. New
+    sockets report their connect time for the ``api_calls`` timings.
+    """
+    session = requests.Session()
+    adapter = TimedHTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    for prefix, transport in _transports.items():
+        session.mount(prefix, transport)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+class PayloadNormalizer:
+    """Coerce Notes API payloads into consistent Python types.
+
+    Shared by the blocking and asyncio clients so both return identical shapes.
+    Payloads are freshly parsed and owned by the client, so notes are coerced in
+    place; with ``lazy_lists`` a ``data`` list is wrapped in a ``LazyNoteList``
+    that coerces each note only when it is read. With ``as_models`` notes become
+    ``Note`` records and lists an indexed ``NoteList`` (this wins over laziness).
+    """
+
+    lazy_lists = False
+    as_models = False
 
     def _coerce_completed(self, value: object) -> bool:
         if isinstance(value, bool):
@@ -26,49 +99,264 @@ class ApiClient:
 
     def _normalize_resource(self, resource: object) -> object:
         if isinstance(resource, dict) and "completed" in resource:
-            normalized = dict(resource)
-            normalized["completed"] = self._coerce_completed(normalized["completed"])
-            return normalized
+            completed = resource["completed"]
+            if not isinstance(completed, bool):
+                resource["completed"] = self._coerce_completed(completed)
         return resource
 
+    def _to_model(self, resource: dict) -> Note:
+        self._normalize_resource(resource)
+        return Note.from_dict(resource)
+
     def _normalize_payload(self, payload: dict) -> dict:
         if "data" not in payload:
             return payload
         data = payload["data"]
         if isinstance(data, dict):
-            payload["data"] = self._normalize_resource(data)
+            if self.as_models and "id" in data:
+                payload["data"] = self._to_model(data)
+            else:
+                payload["data"] = self._normalize_resource(data)
         elif isinstance(data, list):
-            payload["data"] = [self._normalize_resource(item) for item in data]
+            if self.as_models:
+                payload["data"] = NoteList(self._to_model(item) for item in data)
+            elif self.lazy_lists:
+                payload["data"] = LazyNoteList(data, self._normalize_resource)
+            else:
+                for item in data:
+                    self._normalize_resource(item)
         return payload
 
-    def _request(
+
+class ApiClient(PayloadNormalizer):
+    def __init__(
+        self,
+        BASE_URL_API: str,
+        *,
+        timeout: float | tuple[float, float] = 20.0,
+        session: requests.Session | None = None,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        keep_alive: bool = True,
+        on_unauthorized: Callable[[str], str | None] | None = None,
+        cache: ResponseCache | None = None,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        lazy_lists: bool = False,
+        as_models: bool = False,
+        call_hooks: Iterable[Callable[[ApiCall], None]] = (),
+    ) -> None:
+        self.base_url = BASE_URL_API
+        self.token: str | None = None
+        self.timeout = timeout
+        # Called with the rejected token on a 401; may return a fresh one to retry with
+        self.on_unauthorized = on_unauthorized
+        # Optional GET cache kept coherent by this client's own note writes
+        self.cache = cache
+        self.lazy_lists = lazy_lists
+        self.as_models = as_models
+        # Each receives an ApiCall timing after every request that hit the network
+        self.call_hooks = list(call_hooks)
+        self.retry_policy = retry_policy or RetryPolicy()
+        # Breakers are per host and shared by every client in the process
+        self.circuit_breaker = circuit_breaker or circuit_breaker_for(BASE_URL_API)
+        # A caller-provided session is shared (e.g. by fixtures) and not closed here
+        self._owns_session = session is None
+        self.session = session or build_session(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            keep_alive=keep_alive,
+        )
+
+    def close(self) -> None:
+        """Release pooled connections if this client owns its session."""
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self) -> "ApiClient":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _send(
         self,
         method: str,
-        path: str,
+        url: str,
         *,
-        data: dict | None = None,
-        json: dict | None = None,
-        params: dict | None = None,
-        timeout: float | tuple[float, float] | None = None,
-    ) -> dict:
-        url = f"{self.base_url}{path}"
-        headers = {}
+        data: dict | None,
+        json: dict | None,
+        params: dict | None,
+        timeout: float | tuple[float, float],
+        headers: dict[str, str] | None = None,
+        stream: bool = False,
+    ) -> requests.Response:
+        headers = dict(headers or {})
         if self.token:
             headers["x-auth-token"] = self.token
-        response = requests.request(
+        return self.session.request(
             method,
             url,
             params=params,
             data=data,
             json=json,
             headers=headers,
-            timeout=timeout or self.timeout,
+            timeout=timeout,
+            stream=stream,
+        )
+
+    def _send_with_retry(
+        self, method: str, url: str, send: Callable[[], requests.Response]
+    ) -> requests.Response:
+        """Run ``send`` under the retry policy and the host's circuit breaker."""
+        breaker = self.circuit_breaker
+        attempt = 0
+        while True:
+            attempt += 1
+            if not breaker.allow():
+                log_api_event("circuit_rejected", method, url, attempt)
+                raise CircuitOpenError(
+                    f"Circuit for {breaker.name} is open; failing fast"
+                )
+            try:
+                response = send()
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+            ) as exc:
+                if breaker.record_failure():
+                    log_api_event("circuit_opened", method, url, attempt)
+                if not self.retry_policy.should_retry(method, attempt, error=exc):
+                    raise
+                delay = self.retry_policy.delay(attempt)
+                log_api_event(
+                    "retry",
+                    method,
+                    url,
+                    attempt,
+                    detail=f"{type(exc).__name__}; {delay:.2f}s",
+                )
+                time.sleep(delay)
+                continue
+
+            status = response.status_code
+            if status in FAILURE_STATUSES:
+                if breaker.record_failure():
+                    log_api_event("circuit_opened", method, url, attempt, status)
+            elif status in NEUTRAL_STATUSES:
+                breaker.record_neutral()
+            elif breaker.record_success():
+                log_api_event("circuit_closed", method, url, attempt, status)
+            if not self.retry_policy.should_retry(method, attempt, status=status):
+                return response
+            delay = self.retry_policy.delay(
+                attempt, response.headers.get("Retry-After")
+            )
+            log_api_event("retry", method, url, attempt, status, detail=f"{delay:.2f}s")
+            response.close()
+            time.sleep(delay)
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        data: dict | None = None,
+        json: dict | None = None,
+        params: dict | None = None,
+        timeout: float | tuple[float, float] | None = None,
+    ) -> dict:
+        url = f"{self.base_url}{path}"
+        # Only note reads are cached; auth probes must always reach the server
+        cacheable = method == GET and not params and path.startswith("/notes")
+        cache = self.cache if cacheable else None
+        entry = cache.get(path) if cache is not None else None
+        conditional: dict[str, str] = {}
+        if cache is not None and entry is not None:
+            if entry.etag is None:
+                cache.hits += 1
+                return cache.read(entry)
+            conditional["If-None-Match"] = entry.etag
+
+        attempts = 0
+
+        def send_once() -> requests.Response:
+            nonlocal attempts
+            attempts += 1
+            return self._send(
+                method,
+                url,
+                data=data,
+                json=json,
+                params=params,
+                timeout=timeout or self.timeout,
+                headers=conditional,
+            )
+
+        def send() -> requests.Response:
+            return self._send_with_retry(method, url, send_once)
+
+        started = time.perf_counter()
+        take_connect_time()
+        response: requests.Response | None = None
+        try:
+            response = send()
+            if response.status_code == 401 and self.token and self.on_unauthorized:
+                stale_token = self.token
+                fresh_token = self.on_unauthorized(stale_token)
+                if fresh_token and fresh_token != stale_token:
+                    self.token = fresh_token
+                    response = send()
+            if cache is not None and entry is not None and response.status_code == 304:
+                cache.revalidated += 1
+                entry.etag = response.headers.get("ETag", entry.etag)
+                return cache.read(entry)
+            response.raise_for_status()
+            if not response.content:
+                return {}
+            payload = self._normalize_payload(response.json())
+            if cache is not None:
+                cache.misses += 1
+                cache.put(path, payload, etag=response.headers.get("ETag"))
+            return payload
+        finally:
+            if self.call_hooks:
+                self._emit_call(method, path, response, attempts, started)
+
+    def _emit_call(
+        self,
+        method: str,
+        path: str,
+        response: requests.Response | None,
+        attempts: int,
+        started: float,
+    ) -> None:
+        """Pass the timing of a finished ``_request`` to every call hook.
+
+        ``ttfb_ms`` is the final attempt's time to response headers; ``total_ms``
+        spans all attempts, backoff sleeps, body download and normalization.
+        """
+        call = ApiCall(
+            method=method,
+            endpoint=endpoint_template(path),
+            status=response.status_code if response is not None else None,
+            bytes=len(response.content) if response is not None else 0,
+            connect_ms=take_connect_time() * 1000,
+            ttfb_ms=(
+                response.elapsed.total_seconds() * 1000
+                if response is not None
+                else None
+            ),
+            total_ms=(time.perf_counter() - started) * 1000,
+            retries=max(attempts - 1, 0),
         )
-        response.raise_for_status()
-        if not response.content:
-            return {}
-        payload = response.json()
-        return self._normalize_payload(payload)
+        for hook in self.call_hooks:
+            hook(call)
 
     def login_user(self, email: str, password: str) -> dict:
         path = "/users/login"
@@ -76,25 +364,77 @@ class ApiClient:
 
         result = self._request(POST, path, data=data)
         self.token = result["data"]["token"]
+        if self.cache is not None:
+            # Cached payloads belong to whichever account was logged in before
+            self.cache.clear()
+        return result
+
+    def logout_user(self) -> dict:
+        """End this client's session. The live app may end the account's other
+        sessions too (see docs/decisions/notes-app-session-behavior.md).
+        """
+        path = "/users/logout"
+
+        result = self._request(DELETE, path)
+        self.token = None
+        if self.cache is not None:
+            self.cache.clear()
         return result
 
+    def get_user_profile(self) -> dict:
+        path = "/users/profile"
+
+        return self._request(GET, path)
+
     def create_note(self, title: str, description: str, category: str = "Home") -> dict:
         path = "/notes"
 
         data = {"title": title, "description": description, "category": category}
 
-        return self._request(POST, path, data=data)
+        result = self._request(POST, path, data=data)
+        if self.cache is not None:
+            self.cache.invalidate(path)
+        return result
 
     def delete_note(self, note_id: str) -> dict:
         path = f"/notes/{note_id}"
 
-        return self._request(DELETE, path)
+        try:
+            return self._request(DELETE, path)
+        finally:
+            # Whether it was deleted now or was already gone, drop what we knew
+            if self.cache is not None:
+                self.cache.invalidate(path, "/notes")
 
     def get_all_notes(self) -> dict:
         path = "/notes"
 
         return self._request(GET, path)
 
+    def iter_all_notes(self, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Any]:
+        """Stream ``GET /notes`` and yield normalized notes one at a time.
+
+        Bypasses the response cache; peak memory is one chunk plus one note.
+        """
+        url = f"{self.base_url}/notes"
+        response = self._send_with_retry(
+            GET,
+            url,
+            lambda: self._send(
+                GET,
+                url,
+                data=None,
+                json=None,
+                params=None,
+                timeout=self.timeout,
+                stream=True,
+            ),
+        )
+        with response:
+            response.raise_for_status()
+            normalize = self._to_model if self.as_models else self._normalize_resource
+            yield from iter_notes(response.iter_content(chunk_size), normalize)
+
     def get_note_by_id(self, note_id: str) -> dict:
         path = f"/notes/{note_id}"
 
@@ -117,4 +457,8 @@ class ApiClient:
             "category": category,
         }
 
-        return self._request(PUT, path, data=data)
+        result = self._request(PUT, path, data=data)
+        if self.cache is not None:
+            # The next read must come from the server, not echo what was sent
+            self.cache.invalidate(path, "/notes")
+        return result
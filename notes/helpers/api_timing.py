@@ -0,0 +1,75 @@
+# notes/helpers/api_timing.py
+import re
+import threading
+import time
+from typing import Any
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Note ids are hex (24 chars live, 12 offline), possibly behind a prefix such
+# as ``missing-<hex>`` in negative tests; plain numeric ids collapse as well
+_ID_SEGMENT = re.compile(r"^(?:[\w-]*[0-9a-f]{12,}|\d+)$", re.IGNORECASE)
+
+_local = threading.local()
+
+
+def endpoint_template(path: str) -> str:
+    """Collapse id segments so ``/notes/<id>`` calls aggregate as one endpoint."""
+    path = path.split("?", 1)[0]
+    return "/".join(
+        "{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/")
+    )
+
+
+def take_connect_time() -> float:
+    """Return and reset seconds this thread spent opening sockets (incl. TLS)."""
+    spent = getattr(_local, "connect_s", 0.0)
+    _local.connect_s = 0.0
+    return spent
+
+
+def _add_connect_time(started: float) -> None:
+    _local.connect_s = getattr(_local, "connect_s", 0.0) + time.perf_counter() - started
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self) -> None:
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(started)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self) -> None:
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(started)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """``HTTPAdapter`` whose new sockets report their connect time.
+
+    Reused keep-alive sockets cost nothing, so a call's connect time is zero
+    unless the pool had to open (and handshake) a fresh connection for it.
+    """
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
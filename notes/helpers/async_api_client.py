@@ -0,0 +1,211 @@
+# notes/helpers/async_api_client.py
+import asyncio
+from collections.abc import Awaitable, Iterable
+from types import TracebackType
+from typing import Any, TypeVar
+
+import httpx
+
+from notes.helpers.api_client import (
+    DEFAULT_POOL_MAXSIZE,
+    DELETE,
+    GET,
+    POST,
+    PUT,
+    PayloadNormalizer,
+)
+
+T = TypeVar("T")
+
+# Upper bound on in-flight requests issued by the bulk helpers
+DEFAULT_CONCURRENCY = 10
+
+
+def _to_httpx_timeout(timeout: float | tuple[float, float]) -> httpx.Timeout:
+    """Translate a requests-style ``(connect, read)`` timeout for httpx."""
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+class AsyncApiClient(PayloadNormalizer):
+    """Asyncio counterpart of ``ApiClient`` for concurrent Notes API calls.
+
+    Methods mirror ``ApiClient`` and return the same normalized payloads; HTTP
+    errors surface as ``httpx.HTTPStatusError`` (``exc.response.status_code``).
+    """
+
+    def __init__(
+        self,
+        BASE_URL_API: str,
+        *,
+        timeout: float | tuple[float, float] = 20.0,
+        client: httpx.AsyncClient | None = None,
+        max_connections: int = DEFAULT_POOL_MAXSIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        lazy_lists: bool = False,
+        as_models: bool = False,
+    ) -> None:
+        self.base_url = BASE_URL_API
+        self.token: str | None = None
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.lazy_lists = lazy_lists
+        self.as_models = as_models
+        # A caller-provided client is shared and not closed here
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=_to_httpx_timeout(timeout),
+        )
+
+    async def aclose(self) -> None:
+        """Release pooled connections if this client owns its transport."""
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def __aenter__(self) -> "AsyncApiClient":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        data: dict | None = None,
+        json: dict | None = None,
+        params: dict | None = None,
+        timeout: float | tuple[float, float] | None = None,
+    ) -> dict:
+        url = f"{self.base_url}{path}"
+        headers = {}
+        if self.token:
+            headers["x-auth-token"] = self.token
+        response = await self.client.request(
+            method,
+            url,
+            params=params,
+            data=data,
+            json=json,
+            headers=headers,
+            timeout=_to_httpx_timeout(timeout or self.timeout),
+        )
+        response.raise_for_status()
+        if not response.content:
+            return {}
+        payload = response.json()
+        return self._normalize_payload(payload)
+
+    async def login_user(self, email: str, password: str) -> dict:
+        path = "/users/login"
+        data = {"email": email, "password": password}
+
+        result = await self._request(POST, path, data=data)
+        self.token = result["data"]["token"]
+        return result
+
+    async def create_note(
+        self, title: str, description: str, category: str = "Home"
+    ) -> dict:
+        path = "/notes"
+
+        data = {"title": title, "description": description, "category": category}
+
+        return await self._request(POST, path, data=data)
+
+    async def delete_note(self, note_id: str) -> dict:
+        path = f"/notes/{note_id}"
+
+        return await self._request(DELETE, path)
+
+    async def get_all_notes(self) -> dict:
+        path = "/notes"
+
+        return await self._request(GET, path)
+
+    async def get_note_by_id(self, note_id: str) -> dict:
+        path = f"/notes/{note_id}"
+
+        return await self._request(GET, path)
+
+    async def update_note(
+        self,
+        note_id: str,
+        title: str,
+        description: str,
+        completed: bool,
+        category: str = "Home",
+    ) -> dict:
+        path = f"/notes/{note_id}"
+
+        data = {
+            "title": title,
+            "description": description,
+            "completed": "true" if completed else "false",
+            "category": category,
+        }
+
+        return await self._request(PUT, path, data=data)
+
+    # --- bulk helpers ---------------------------------------------------------
+    async def gather(
+        self,
+        aws: Iterable[Awaitable[T]],
+        *,
+        limit: int | None = None,
+        return_exceptions: bool = False,
+    ) -> list[Any]:
+        """``asyncio.gather`` that keeps at most ``limit`` awaitables in flight.
+
+        Results keep input order. Defaults to the client's ``concurrency``.
+        """
+        semaphore = asyncio.Semaphore(limit or self.concurrency)
+
+        async def bounded(aw: Awaitable[T]) -> T:
+            async with semaphore:
+                return await aw
+
+        return await asyncio.gather(
+            *(bounded(aw) for aw in aws), return_exceptions=return_exceptions
+        )
+
+    async def create_notes(
+        self, notes: Iterable[dict[str, str]], *, limit: int | None = None
+    ) -> list[dict]:
+        """Create notes from ``{"title", "description"[, "category"]}`` specs."""
+        return await self.gather(
+            (self.create_note(**note) for note in notes), limit=limit
+        )
+
+    async def get_notes_by_ids(
+        self, note_ids: Iterable[str], *, limit: int | None = None
+    ) -> list[dict]:
+        return await self.gather(
+            (self.get_note_by_id(note_id) for note_id in note_ids), limit=limit
+        )
+
+    async def delete_notes(
+        self,
+        note_ids: Iterable[str],
+        *,
+        limit: int | None = None,
+        return_exceptions: bool = False,
+    ) -> list[Any]:
+        """Delete notes concurrently; pass ``return_exceptions`` for best effort."""
+        return await self.gather(
+            (self.delete_note(note_id) for note_id in note_ids),
+            limit=limit,
+            return_exceptions=return_exceptions,
+        )
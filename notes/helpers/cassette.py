@@ -0,0 +1,386 @@
+# notes/helpers/cassette.py
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl
+from uuid import uuid4
+
+import requests
+from filelock import FileLock
+from requests.adapters import BaseAdapter
+
+from notes.helpers.api_timing import TimedHTTPAdapter, endpoint_template
+from notes.helpers.mock_transport import api_path, make_response
+from shared.helpers.redaction import is_sensitive_key, mask_value
+
+# Auth traffic made by fixtures (token cache login, profile probe) lands here,
+# since which test triggers it depends on ordering and xdist distribution
+SESSION_CASSETTE = "_session"
+# ETag is kept so conditional GETs replay as recorded (200, then 304)
+_KEPT_HEADERS = ("content-type", "etag", "retry-after")
+_ALIAS = re.compile(r"^<<id:\d+>>$")
+_UNSAFE_CHARS = re.compile(r"[^\w.\[\]-]+")
+
+
+class CassetteMissError(requests.exceptions.RequestException):
+    """Replay found no recorded response for a request."""
+
+
+def cassette_stem(root: Path, nodeid: str) -> Path:
+    """``notes/tests/x.py::test_y[a]`` -> ``<root>/notes/tests/x/test_y[a]``."""
+    module, _, name = nodeid.partition("::")
+    return root / Path(module).with_suffix("") / _UNSAFE_CHARS.sub("_", name)
+
+
+def _test_phase() -> str:
+    current = os.getenv("PYTEST_CURRENT_TEST", "")
+    return current.rsplit(" (", 1)[-1].rstrip(")") if " (" in current else ""
+
+
+class _Aliases:
+    """Two-way map between real ids and stable ``<<id:N>>`` placeholders.
+
+    Recording turns every id a response reveals into a placeholder, numbered in
+    order of appearance. Replay hands out a fresh id per placeholder and maps it
+    back when the client sends it in a later path.
+    """
+
+    def __init__(self) -> None:
+        self.to_alias: dict[str, str] = {}
+        self.to_value: dict[str, str] = {}
+
+    def alias(self, value: str) -> str:
+        alias = self.to_alias.get(value)
+        if alias is None:
+            alias = f"<<id:{len(self.to_alias) + 1}>>"
+            self.to_alias[value] = alias
+            self.to_value[alias] = value
+        return alias
+
+    def known_alias(self, value: str) -> str:
+        return self.to_alias.get(value, value)
+
+    def value(self, alias: str) -> str:
+        value = self.to_value.get(alias)
+        if value is None:
+            value = uuid4().hex[:24]
+            self.to_value[alias] = value
+            self.to_alias[value] = alias
+        return value
+
+    def path(self, path: str) -> str:
+        return "/".join(self.known_alias(segment) for segment in path.split("/"))
+
+
+def _scrub(data: Any, on_id: Callable[[str], str], key: str | None = None) -> Any:
+    """Mask secrets and pass id values through ``on_id``, recursively."""
+    if isinstance(data, dict):
+        return {k: _scrub(v, on_id, str(k)) for k, v in data.items()}
+    if isinstance(data, list):
+        return [_scrub(item, on_id, key) for item in data]
+    if isinstance(data, str) and key:
+        if is_sensitive_key(key):
+            return mask_value(key, data)
+        if key == "id" or key.endswith("_id"):
+            return on_id(data)
+    return data
+
+
+def _restore(data: Any, aliases: _Aliases) -> Any:
+    if isinstance(data, dict):
+        return {k: _restore(v, aliases) for k, v in data.items()}
+    if isinstance(data, list):
+        return [_restore(item, aliases) for item in data]
+    if isinstance(data, str) and _ALIAS.match(data):
+        return aliases.value(data)
+    return data
+
+
+def _body_hash(body: bytes | str | None, aliases: _Aliases) -> str:
+    if not body:
+        return "-"
+    text = body.decode(errors="replace") if isinstance(body, bytes) else body
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = dict(parse_qsl(text))
+    # Masked so recordings match whichever credentials replay runs with
+    scrubbed = _scrub(data, aliases.known_alias)
+    canonical = json.dumps(scrubbed, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode()).hexdigest()[:16]
+
+
+def _keys(
+    method: str, path: str, body: bytes | str | None, aliases: _Aliases
+) -> tuple[str, str]:
+    """Exact key (aliased path + body hash) and loose key (endpoint template).
+
+    The loose key catches requests whose body or ids are random per run, such as
+    generated titles or ``missing-<uuid>`` lookups.
+    """
+    exact = f"{method} {aliases.path(path)} {_body_hash(body, aliases)}"
+    return exact, f"{method} {endpoint_template(path)}"
+
+
+class Cassette:
+    """Read side of a cassette: the index is loaded, entries are read on demand.
+
+    ``<stem>.idx.json`` maps exact and loose keys to entry numbers and entry
+    numbers to byte ranges in ``<stem>.jsonl``, so a lookup is a dict hit and
+    one seek; entries never requested are never parsed.
+    """
+
+    def __init__(self, stem: Path) -> None:
+        self.stem = stem
+        self._index: dict | None = None
+        self._cursors: dict[tuple[str, str], int] = {}
+        self._used: set[int] = set()
+
+    def _load(self) -> dict:
+        if self._index is None:
+            try:
+                self._index = json.loads(Path(f"{self.stem}.idx.json").read_text())
+            except FileNotFoundError:
+                self._index = {"offsets": [], "exact": {}, "loose": {}}
+        return self._index
+
+    def _read(self, number: int) -> dict:
+        offset, length = self._load()["offsets"][number]
+        with open(f"{self.stem}.jsonl", "rb") as data:
+            data.seek(offset)
+            return json.loads(data.read(length))
+
+    def take(self, exact: str, loose: str, *, consume: bool = True) -> dict | None:
+        """Next unused entry for ``exact``, else for ``loose``.
+
+        With ``consume=False`` the first entry is returned every time, for
+        traffic that repeats arbitrarily (auth probes).
+        """
+        index = self._load()
+        for table, key in (("exact", exact), ("loose", loose)):
+            numbers = index[table].get(key)
+            if not numbers:
+                continue
+            if not consume:
+                return self._read(numbers[0])
+            cursor = self._cursors.get((table, key), 0)
+            while cursor < len(numbers) and numbers[cursor] in self._used:
+                cursor += 1
+            self._cursors[(table, key)] = cursor
+            if cursor < len(numbers):
+                self._used.add(numbers[cursor])
+                return self._read(numbers[cursor])
+        return None
+
+
+class CassetteWriter:
+    def __init__(self) -> None:
+        self.entries: list[tuple[str, str, bytes]] = []
+        self._lock = threading.Lock()
+
+    def add(self, exact: str, loose: str, entry: dict) -> None:
+        line = json.dumps(entry, separators=(",", ":")).encode() + b"\n"
+        with self._lock:
+            self.entries.append((exact, loose, line))
+
+    def save(self, stem: Path, *, merge: bool = False) -> None:
+        """Write the cassette.
+
+        ``merge`` keeps what is already on disk and only adds entries for exact
+        keys it lacks, so concurrent workers and repeated runs share one file
+        without it growing.
+        """
+        stem.parent.mkdir(parents=True, exist_ok=True)
+        if not merge:
+            self._write(stem, [], {}, {})
+            return
+        with FileLock(f"{stem}.lock"):
+            try:
+                index = json.loads(Path(f"{stem}.idx.json").read_text())
+                data = Path(f"{stem}.jsonl").read_bytes()
+            except FileNotFoundError:
+                self._write(stem, [], {}, {})
+                return
+            blobs = [data[off : off + size] for off, size in index["offsets"]]
+            self._write(stem, blobs, index["exact"], index["loose"])
+
+    def _write(
+        self,
+        stem: Path,
+        blobs: list[bytes],
+        exact: dict[str, list[int]],
+        loose: dict[str, list[int]],
+    ) -> None:
+        known = set(exact)
+        for exact_key, loose_key, line in self.entries:
+            if exact_key in known:
+                continue
+            exact.setdefault(exact_key, []).append(len(blobs))
+            loose.setdefault(loose_key, []).append(len(blobs))
+            blobs.append(line)
+        offsets = []
+        position = 0
+        for blob in blobs:
+            offsets.append([position, len(blob)])
+            position += len(blob)
+        index = {"offsets": offsets, "exact": exact, "loose": loose}
+        for path, payload in (
+            (Path(f"{stem}.jsonl"), b"".join(blobs)),
+            (Path(f"{stem}.idx.json"), json.dumps(index).encode()),
+        ):
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_bytes(payload)
+            os.replace(tmp, path)
+
+
+class RecordingAdapter(BaseAdapter):
+    """Send requests for real and write scrubbed responses to cassettes.
+
+    Call ``begin_test``/``end_test`` around each test; responses land in that
+    test's cassette, fixture auth traffic in the shared session cassette.
+    Secrets are masked and ids replaced by placeholders before anything is
+    written.
+    """
+
+    def __init__(self, root: Path, inner: BaseAdapter | None = None) -> None:
+        super().__init__()
+        self.root = root
+        self.inner = inner or TimedHTTPAdapter()
+        self._session = CassetteWriter()
+        self._session_aliases = _Aliases()
+        self._stem: Path | None = None
+        self._writer: CassetteWriter | None = None
+        self._aliases = _Aliases()
+
+    def begin_test(self, nodeid: str) -> None:
+        self._stem = cassette_stem(self.root, nodeid)
+        self._writer = CassetteWriter()
+        self._aliases = _Aliases()
+
+    def end_test(self) -> None:
+        if self._stem is not None and self._writer is not None:
+            self._writer.save(self._stem)
+        self._stem = self._writer = None
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: Any = True,
+        cert: Any = None,
+        proxies: Any = None,
+    ) -> requests.Response:
+        response = self.inner.send(
+            request,
+            stream=stream,
+            timeout=timeout,
+            verify=verify,
+            cert=cert,
+            proxies=proxies,
+        )
+        path = api_path(request.url or "")
+        fixture_auth = path.startswith("/users/") and _test_phase() != "call"
+        if self._writer is not None and not fixture_auth:
+            writer, aliases = self._writer, self._aliases
+        elif path.startswith("/users/"):
+            writer, aliases = self._session, self._session_aliases
+        else:
+            return response  # Outside any test, e.g. session cleanup
+        method = request.method or "GET"
+        exact, loose = _keys(method, path, request.body, aliases)
+        # Reading content buffers the body, so streaming callers still get it
+        text = response.content.decode(response.encoding or "utf-8", "replace")
+        try:
+            body = json.dumps(
+                _scrub(json.loads(text), aliases.alias), separators=(",", ":")
+            )
+        except ValueError:
+            body = text
+        headers = {
+            name: response.headers[name]
+            for name in _KEPT_HEADERS
+            if name in response.headers
+        }
+        writer.add(
+            exact,
+            loose,
+            {"status": response.status_code, "headers": headers, "body": body},
+        )
+        return response
+
+    def close(self) -> None:
+        if self._session.entries:
+            self._session.save(self.root / SESSION_CASSETTE, merge=True)
+        self.inner.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """Answer requests from cassettes written by ``RecordingAdapter``.
+
+    Ids are re-minted per test, so a replayed flow gets fresh note ids that map
+    back to the recorded ones when the client uses them. A request with no
+    recorded answer raises ``CassetteMissError`` (not retried by ``ApiClient``).
+    """
+
+    def __init__(self, root: Path) -> None:
+        super().__init__()
+        self.root = root
+        self._session = Cassette(root / SESSION_CASSETTE)
+        self._session_aliases = _Aliases()
+        self._cassette: Cassette | None = None
+        self._aliases = _Aliases()
+
+    def begin_test(self, nodeid: str) -> None:
+        self._cassette = Cassette(cassette_stem(self.root, nodeid))
+        self._aliases = _Aliases()
+
+    def end_test(self) -> None:
+        self._cassette = None
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: Any = True,
+        cert: Any = None,
+        proxies: Any = None,
+    ) -> requests.Response:
+        method = request.method or "GET"
+        path = api_path(request.url or "")
+        aliases = self._aliases
+        entry = None
+        # Same split as recording: fixture auth traffic lives in the session file
+        fixture_auth = path.startswith("/users/") and _test_phase() != "call"
+        if self._cassette is not None and not fixture_auth:
+            entry = self._cassette.take(*_keys(method, path, request.body, aliases))
+        if entry is None and path.startswith("/users/"):
+            aliases = self._session_aliases
+            keys = _keys(method, path, request.body, aliases)
+            entry = self._session.take(*keys, consume=False)
+        if entry is None:
+            where = self._cassette.stem if self._cassette else self.root
+            raise CassetteMissError(
+                f"No recorded response for {method} {path} in {where}; "
+                "re-record with NOTES_CASSETTES=record",
+                request=request,
+            )
+        body = entry["body"]
+        if body:
+            try:
+                body = json.dumps(_restore(json.loads(body), aliases))
+            except ValueError:
+                pass
+        return make_response(
+            request, entry["status"], entry["headers"], io.BytesIO(body.encode())
+        )
+
+    def close(self) -> None:
+        """Nothing to release; cassettes are opened per read."""
@@ -0,0 +1,143 @@
+# notes/helpers/lazy_payload.py
+import codecs
+import json
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import Any, overload
+
+# Bytes pulled from the response per read while streaming
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+
+class LazyNoteList(Sequence):
+    """Sequence view over a parsed ``data`` list that normalizes on access.
+
+    Items are normalized in place the first time they are read, so building the
+    view costs nothing and untouched notes are never visited.
+    """
+
+    __slots__ = ("_items", "_normalize")
+
+    def __init__(self, items: list, normalize: Callable[[Any], Any]) -> None:
+        self._items = items
+        self._normalize = normalize
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @overload
+    def __getitem__(self, index: int) -> Any: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "LazyNoteList": ...
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            return LazyNoteList(self._items[index], self._normalize)
+        return self._normalize(self._items[index])
+
+    def __iter__(self) -> Iterator[Any]:
+        normalize = self._normalize
+        for item in self._items:
+            yield normalize(item)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (LazyNoteList, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"LazyNoteList({len(self._items)} notes)"
+
+
+class _ChunkBuffer:
+    """Text buffer refilled from an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        # Incremental so multi-byte characters split across chunks decode cleanly
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self.text = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def fill(self) -> bool:
+        if self.exhausted:
+            return False
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self.exhausted = True
+            self.text = self.text[self.pos :] + self._text_decoder.decode(b"", True)
+            self.pos = 0
+            return False
+        # Drop consumed text so memory stays bounded by one chunk plus one note
+        self.text = self.text[self.pos :] + self._text_decoder.decode(chunk)
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number may be cut at the chunk edge; only trust it once followed
+            if end == len(self.text) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_notes(
+    chunks: Iterable[bytes], normalize: Callable[[Any], Any] = lambda note: note
+) -> Iterator[Any]:
+    """Yield items of the top-level ``data`` array from a streamed JSON body.
+
+    Other top-level keys are decoded and skipped; a non-list ``data`` value is
+    yielded as a single item. Only one note is materialized at a time.
+    """
+    buffer = _ChunkBuffer(chunks)
+    buffer.expect("{")
+    if buffer.peek() == "}":
+        return
+    while True:
+        key = buffer.value()
+        buffer.expect(":")
+        if key == "data" and buffer.peek() == "[":
+            buffer.expect("[")
+            if buffer.peek() == "]":
+                buffer.pos += 1
+            else:
+                while True:
+                    yield normalize(buffer.value())
+                    if buffer.peek() == "]":
+                        buffer.pos += 1
+                        break
+                    buffer.expect(",")
+        elif key == "data":
+            yield normalize(buffer.value())
+        else:
+            buffer.value()
+        if buffer.peek() == "}":
+            return
+        buffer.expect(",")
@@ -0,0 +1,370 @@
+# notes/helpers/mock_backend.py
+import hashlib
+import json
+import re
+import threading
+import time
+from itertools import islice
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl
+from uuid import uuid4
+
+from notes.helpers.mock_faults import FaultInjector
+from notes.helpers.mock_sessions import DEFAULT_ACCOUNT, MockSessions
+from notes.helpers.mock_store import NoteStore
+
+ALLOWED_CATEGORIES = {"Home", "Work"}
+API_PREFIX = "/notes/api"
+
+_NOTE_ID = re.compile(r"^[A-Za-z0-9\-]+$")
+# Placeholder segment in route keys for a note id
+_ID = "{id}"
+
+# List responses stream as byte chunks so big accounts never become one string
+MockBody = str | Iterator[bytes]
+MockResponse = tuple[int, dict[str, str], MockBody]
+# Smallest chunk the list encoder yields; per-note pieces are batched up to this
+LIST_CHUNK_BYTES = 64 * 1024
+_LIST_HEAD = b'{"success": true, "data": ['
+_LIST_BATCH = 256
+_LIST_TAIL = b"]}"
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _parse_body(body: bytes | str | dict | None) -> dict:
+    if not body:
+        return {}
+    if isinstance(body, (bytes, bytearray)):
+        return dict(parse_qsl(body.decode()))
+    if isinstance(body, str):
+        return dict(parse_qsl(body))
+    if isinstance(body, dict):
+        return body
+    return {}
+
+
+def _json(status: int, payload: dict) -> MockResponse:
+    return status, {"Content-Type": "application/json"}, json.dumps(payload)
+
+
+def _error(status: int, message: str) -> MockResponse:
+    return _json(status, {"success": False, "message": message})
+
+
+def iter_list_json(
+    notes: Iterable[dict], chunk_size: int = LIST_CHUNK_BYTES
+) -> Iterator[bytes]:
+    """Encode ``{"success": true, "data": notes}`` a chunk at a time.
+
+    Output matches ``json.dumps`` of the whole envelope, but only one chunk of
+    it exists at any moment. Notes are encoded in batches so the C encoder does
+    the work; one ``encode`` call per note costs more than the whole dump.
+    """
+    encode = json.JSONEncoder().encode
+    pieces = [_LIST_HEAD]
+    size = len(_LIST_HEAD)
+    separator = b""
+    notes = iter(notes)
+    while batch := list(islice(notes, _LIST_BATCH)):
+        # "[a, b]" -> "a, b"
+        piece = separator + encode(batch)[1:-1].encode()
+        separator = b", "
+        pieces.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield b"".join(pieces)
+            pieces = []
+            size = 0
+    pieces.append(_LIST_TAIL)
+    yield b"".join(pieces)
+
+
+def body_bytes(body: MockBody) -> bytes:
+    """Whole response body; only for callers that need it in one piece."""
+    return body.encode() if isinstance(body, str) else b"".join(body)
+
+
+def _list_filters(query: Mapping[str, str] | None) -> dict[str, object]:
+    """Filters for ``GET /notes?category=&completed=&title=``.
+
+    Unknown parameters are ignored, as the live API does.
+    """
+    if not query:
+        return {}
+    filters: dict[str, object] = {}
+    for field in ("category", "title"):
+        if field in query:
+            filters[field] = query[field]
+    completed = query.get("completed", "").strip().lower()
+    if completed in {"true", "false"}:
+        filters["completed"] = completed == "true"
+    return filters
+
+
+@dataclass(frozen=True, slots=True)
+class _Call:
+    """What a route handler gets: the caller's account and the request parts."""
+
+    account: str
+    token: str | None
+    note_id: str
+    body: bytes | str | dict | None
+    query: Mapping[str, str] | None
+
+
+class NotesMockBackend:
+    """In-memory stand-in for the Notes API shared by the offline mocks.
+
+    ``handle`` takes a path relative to the API root (e.g. ``/notes/<id>``) so the
+    same backend can sit behind the in-process mock or a loopback HTTP server.
+    With ``faults`` set, each request is delayed and may fail per its profile.
+
+    Every login email is an account with notes of its own; ``sessions`` mints
+    and revokes their tokens, including the cross-context logout of the live
+    app. ``store`` holds the default account (the static ``fake-token``) and is
+    the template new accounts start from: seed it and ``freeze`` it to give
+    every account the same big baseline (see ``seeded``).
+    """
+
+    def __init__(
+        self,
+        faults: FaultInjector | None = None,
+        store: NoteStore | None = None,
+        sessions: MockSessions | None = None,
+    ) -> None:
+        self.store = store or NoteStore()
+        self.faults = faults
+        self.sessions = sessions or MockSessions()
+        self._stores = {DEFAULT_ACCOUNT: self.store}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def seeded(
+        cls,
+        notes: int,
+        *,
+        seed: int = 0,
+        faults: FaultInjector | None = None,
+        sessions: MockSessions | None = None,
+    ) -> "NotesMockBackend":
+        """Backend whose accounts hold ``notes`` notes after every ``reset``."""
+        store = NoteStore()
+        store.seed(notes, seed)
+        store.freeze()
+        return cls(faults=faults, store=store, sessions=sessions)
+
+    def spawn(self) -> "NotesMockBackend":
+        """Backend with separate notes but the same faults, baseline and sessions."""
+        return NotesMockBackend(
+            faults=self.faults,
+            store=self.store.share_baseline(),
+            sessions=self.sessions,
+        )
+
+    @property
+    def body_bytes_per_s(self) -> int | None:
+        """Rate at which transports should trickle response bodies, if any."""
+        return self.faults.profile.body_bytes_per_s if self.faults else None
+
+    def reset(self) -> None:
+        """Restore every account's notes; sessions survive, as on the server."""
+        with self._lock:
+            for store in self._stores.values():
+                store.reset()
+
+    def _store_for(self, account: str) -> NoteStore:
+        """Notes of ``account``; call with ``_lock`` held."""
+        store = self._stores.get(account)
+        if store is None:
+            store = self._stores[account] = self.store.share_baseline()
+        return store
+
+    def handle(
+        self,
+        method: str,
+        path: str,
+        headers: Mapping[str, str] | None,
+        body: bytes | str | dict | None,
+        query: Mapping[str, str] | None = None,
+    ) -> MockResponse:
+        if self.faults is not None:
+            fault = self.faults.decide(method.upper(), path)
+            if fault.delay:
+                time.sleep(fault.delay)
+            if fault.status is not None:
+                status, response_headers, text = _error(fault.status, "Injected fault")
+                if fault.retry_after is not None:
+                    response_headers["Retry-After"] = str(fault.retry_after)
+                return status, response_headers, text
+        status, response_headers, content = self._route(
+            method.upper(), path, headers, body, query
+        )
+        if method.upper() == "GET" and status == 200:
+            # Mirror Express: weak ETags on GET, 304 when If-None-Match still matches.
+            # Streamed lists bring their own, derived from the store version.
+            etag = response_headers.get("ETag")
+            if etag is None and isinstance(content, str):
+                etag = f'W/"{hashlib.sha1(content.encode()).hexdigest()}"'
+                response_headers = {**response_headers, "ETag": etag}
+            if etag is not None and headers and headers.get("if-none-match") == etag:
+                return 304, {"ETag": etag}, ""
+        return status, response_headers, content
+
+    def _route(
+        self,
+        method: str,
+        path: str,
+        headers: Mapping[str, str] | None,
+        body: bytes | str | dict | None,
+        query: Mapping[str, str] | None,
+    ) -> MockResponse:
+        segments = tuple(path.strip("/").split("/"))
+        note_id = None
+        route = _ROUTES.get((method, segments))
+        if route is None and len(segments) == 2 and _NOTE_ID.match(segments[1]):
+            route = _ROUTES.get((method, (segments[0], _ID)))
+            note_id = segments[1]
+        if route is None:
+            return _error(404, "Not Found")
+
+        handler, needs_auth = route
+        token = headers.get("x-auth-token") if headers else None
+        account = DEFAULT_ACCOUNT
+        if needs_auth:
+            found = self.sessions.account_for(token)
+            if found is None:
+                return _error(401, "Unauthorized")
+            account = found
+        return handler(self, _Call(account, token, note_id or "", body, query))
+
+    def _login(self, data: dict) -> MockResponse:
+        if data.get("password") == "wrong-password":
+            return _error(401, "Unauthorized")
+        account = str(data.get("email") or DEFAULT_ACCOUNT).strip().lower()
+        token = self.sessions.login(account)
+        return _json(200, {"success": True, "data": {"token": token}})
+
+    def _logout(self, call: _Call) -> MockResponse:
+        self.sessions.logout(call.token or "", call.account)
+        message = "User has been successfully logged out"
+        return _json(200, {"success": True, "message": message})
+
+    def _profile(self, account: str) -> MockResponse:
+        if account == DEFAULT_ACCOUNT:
+            profile = {"id": DEFAULT_ACCOUNT, "name": "Offline User"}
+        else:
+            profile = {
+                "id": hashlib.sha1(account.encode()).hexdigest()[:24],
+                "name": account.split("@", 1)[0],
+                "email": account,
+            }
+        return _json(200, {"success": True, "data": profile})
+
+    def _create_note(self, account: str, data: dict) -> MockResponse:
+        category = data.get("category", "Home")
+        if category not in ALLOWED_CATEGORIES:
+            return _error(422, "Invalid category")
+        note_id = uuid4().hex[:12]
+        note = {
+            "id": note_id,
+            "title": data.get("title", ""),
+            "description": data.get("description", ""),
+            "category": category,
+            "completed": False,
+            "created_at": _now_iso(),
+        }
+        with self._lock:
+            self._store_for(account).add(note)
+        return _json(200, {"success": True, "data": note})
+
+    def _list_notes(
+        self, account: str, query: Mapping[str, str] | None
+    ) -> MockResponse:
+        filters = _list_filters(query)
+        with self._lock:
+            store = self._store_for(account)
+            # References only; notes are copy-on-write, so this stays consistent
+            notes = store.select(**filters)
+            version = store.version
+        key = hashlib.sha1(repr(sorted(filters.items())).encode()).hexdigest()[:8]
+        headers = {"Content-Type": "application/json", "ETag": f'W/"{version}-{key}"'}
+        return 200, headers, iter_list_json(notes)
+
+    def _get_note(self, account: str, note_id: str) -> MockResponse:
+        with self._lock:
+            note = self._store_for(account).get(note_id)
+        if not note:
+            return _error(404, "Not Found")
+        return _json(200, {"success": True, "data": note})
+
+    def _update_note(self, account: str, note_id: str, payload: dict) -> MockResponse:
+        with self._lock:
+            store = self._store_for(account)
+            note = store.get(note_id)
+            if note is None:
+                return _error(404, "Not Found")
+            note = store.update(
+                note_id,
+                {
+                    "title": payload.get("title", note["title"]),
+                    "description": payload.get("description", note["description"]),
+                    "category": payload.get("category", note["category"]),
+                    "completed": str(payload.get("completed", "false")).strip().lower()
+                    == "true",
+                },
+            )
+            return _json(200, {"success": True, "data": note})
+
+    def _delete_note(self, account: str, note_id: str) -> MockResponse:
+        with self._lock:
+            if not self._store_for(account).remove(note_id):
+                return _error(404, "Not Found")
+        return _json(200, {"success": True, "data": {}})
+
+
+_Handler = Callable[[NotesMockBackend, _Call], MockResponse]
+
+# Built once at import: (method, path segments) -> (handler, needs auth token)
+_ROUTES: dict[tuple[str, tuple[str, ...]], tuple[_Handler, bool]] = {
+    ("POST", ("users", "login")): (
+        lambda backend, call: backend._login(_parse_body(call.body)),
+        False,
+    ),
+    ("DELETE", ("users", "logout")): (
+        lambda backend, call: backend._logout(call),
+        True,
+    ),
+    ("GET", ("users", "profile")): (
+        lambda backend, call: backend._profile(call.account),
+        True,
+    ),
+    ("POST", ("notes",)): (
+        lambda backend, call: backend._create_note(
+            call.account, _parse_body(call.body)
+        ),
+        True,
+    ),
+    ("GET", ("notes",)): (
+        lambda backend, call: backend._list_notes(call.account, call.query),
+        True,
+    ),
+    ("GET", ("notes", _ID)): (
+        lambda backend, call: backend._get_note(call.account, call.note_id),
+        True,
+    ),
+    ("PUT", ("notes", _ID)): (
+        lambda backend, call: backend._update_note(
+            call.account, call.note_id, _parse_body(call.body)
+        ),
+        True,
+    ),
+    ("DELETE", ("notes", _ID)): (
+        lambda backend, call: backend._delete_note(call.account, call.note_id),
+        True,
+    ),
+}
@@ -0,0 +1,188 @@
+# notes/helpers/mock_faults.py
+import io
+import math
+import random
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+
+from notes.helpers.api_timing import endpoint_template
+
+FIXED = "fixed"
+NORMAL = "normal"
+LONG_TAIL = "long_tail"
+
+
+@dataclass(frozen=True, slots=True)
+class Latency:
+    """Per-request delay in milliseconds.
+
+    ``fixed`` waits ``ms``; ``normal`` draws from N(``ms``, ``spread``) clipped
+    at zero; ``long_tail`` is log-normal with median ``ms`` and shape ``spread``
+    (0.8 puts p99 near 6x the median).
+    """
+
+    kind: str = FIXED
+    ms: float = 0.0
+    spread: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == NORMAL:
+            return max(0.0, rng.gauss(self.ms, self.spread)) / 1000
+        if self.kind == LONG_TAIL:
+            return rng.lognormvariate(math.log(self.ms), self.spread) / 1000
+        return self.ms / 1000
+
+
+@dataclass(frozen=True, slots=True)
+class FaultProfile:
+    """Named upstream behaviour for the offline Notes mock.
+
+    ``errors`` maps ``"METHOD /endpoint"`` (ids collapsed to ``{id}``, ``*`` for
+    any other endpoint) to ``(probability, status)``. ``throttle_rate`` answers
+    that share of requests with 429 and ``Retry-After: retry_after``. Neither
+    applies to the ``/users`` endpoints, so logins only see the latency.
+    ``body_bytes_per_s`` trickles response bodies out at that rate.
+    """
+
+    name: str
+    latency: Latency = Latency()
+    errors: dict[str, tuple[float, int]] = field(default_factory=dict)
+    throttle_rate: float = 0.0
+    retry_after: int = 1
+    body_bytes_per_s: int | None = None
+
+    @property
+    def fails(self) -> bool:
+        """Whether some requests get an error status, not just a slow answer."""
+        return bool(self.errors or self.throttle_rate)
+
+
+_NOTE_READS_AND_WRITES = (
+    "GET /notes",
+    "POST /notes",
+    "GET /notes/{id}",
+    "PUT /notes/{id}",
+    "DELETE /notes/{id}",
+)
+
+# Login and logout are set-up, not the traffic under test: no faults there
+_AUTH_PREFIX = "/users"
+
+PROFILES = {
+    profile.name: profile
+    for profile in (
+        FaultProfile("instant"),
+        FaultProfile("lan", latency=Latency(FIXED, 2)),
+        FaultProfile(
+            "production",
+            latency=Latency(NORMAL, 80, 20),
+            errors={endpoint: (0.01, 503) for endpoint in _NOTE_READS_AND_WRITES},
+            throttle_rate=0.005,
+        ),
+        FaultProfile(
+            "long-tail",
+            latency=Latency(LONG_TAIL, 50, 0.8),
+            errors={endpoint: (0.01, 502) for endpoint in _NOTE_READS_AND_WRITES},
+        ),
+        FaultProfile(
+            "flaky",
+            latency=Latency(NORMAL, 30, 10),
+            errors={endpoint: (0.05, 503) for endpoint in _NOTE_READS_AND_WRITES},
+            throttle_rate=0.02,
+            retry_after=1,
+        ),
+        FaultProfile(
+            "slow-body", latency=Latency(FIXED, 20), body_bytes_per_s=64 * 1024
+        ),
+    )
+}
+DEFAULT_PROFILE = "instant"
+
+
+def get_profile(name: str) -> FaultProfile:
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown Notes mock profile {name!r}; choose from {sorted(PROFILES)}"
+        ) from None
+
+
+def injector_for(name: str, seed: int = 0) -> "FaultInjector | None":
+    """Injector for profile ``name``; None for ``instant`` so it costs nothing."""
+    profile = get_profile(name)
+    if profile.name == DEFAULT_PROFILE:
+        return None
+    return FaultInjector(profile, seed)
+
+
+@dataclass(frozen=True, slots=True)
+class Fault:
+    delay: float = 0.0
+    status: int | None = None
+    retry_after: int | None = None
+
+
+class FaultInjector:
+    """Decide delay and failure for each mock request, reproducibly.
+
+    Every decision uses its own RNG seeded from ``seed``, the endpoint and how
+    many times that endpoint was hit before, so the Nth call to an endpoint gets
+    the same fate on every run regardless of thread interleaving.
+    """
+
+    def __init__(self, profile: FaultProfile, seed: int = 0) -> None:
+        self.profile = profile
+        self.seed = seed
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def decide(self, method: str, path: str) -> Fault:
+        profile = self.profile
+        key = f"{method} {endpoint_template(path)}"
+        with self._lock:
+            count = self._counters.get(key, 0)
+            self._counters[key] = count + 1
+        rng = random.Random(f"{self.seed}:{key}:{count}")
+        delay = profile.latency.sample(rng)
+        if path.startswith(_AUTH_PREFIX):
+            return Fault(delay)
+        if profile.throttle_rate and rng.random() < profile.throttle_rate:
+            return Fault(delay, 429, profile.retry_after)
+        rate, status = profile.errors.get(key) or profile.errors.get("*", (0.0, 0))
+        if rate and rng.random() < rate:
+            return Fault(delay, status)
+        return Fault(delay)
+
+
+class ThrottledBody(io.BytesIO):
+    """Response body that releases bytes no faster than ``bytes_per_s``."""
+
+    def __init__(self, data: bytes, bytes_per_s: int) -> None:
+        super().__init__(data)
+        self._bytes_per_s = bytes_per_s
+
+    def read(self, size: int | None = -1) -> bytes:
+        chunk = super().read(size)
+        if chunk:
+            time.sleep(len(chunk) / self._bytes_per_s)
+        return chunk
+
+
+def throttle(chunks: Iterable[bytes], bytes_per_s: int) -> Iterator[bytes]:
+    """Pass ``chunks`` through, pausing so the stream averages ``bytes_per_s``."""
+    for chunk in chunks:
+        time.sleep(len(chunk) / bytes_per_s)
+        yield chunk
+
+
+def throttled_chunks(
+    data: bytes, bytes_per_s: int, chunk_size: int = 16 * 1024
+) -> Iterator[bytes]:
+    """Yield ``data`` in chunks, pausing so the stream averages ``bytes_per_s``."""
+    return throttle(
+        (data[start : start + chunk_size] for start in range(0, len(data), chunk_size)),
+        bytes_per_s,
+    )
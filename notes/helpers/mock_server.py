@@ -0,0 +1,373 @@
+# notes/helpers/mock_server.py
+import argparse
+import json
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import TracebackType
+from urllib.parse import parse_qsl
+
+from filelock import FileLock
+
+from notes.helpers.mock_backend import API_PREFIX, NotesMockBackend
+from notes.helpers.mock_sessions import MockSessions
+from notes.helpers.mock_faults import (
+    DEFAULT_PROFILE,
+    PROFILES,
+    injector_for,
+    throttle,
+    throttled_chunks,
+)
+
+# Requests under /ns/<name>/notes/api get a backend (and note store) of their own
+_NAMESPACE_PREFIX = re.compile(r"^/ns/([A-Za-z0-9_.\-]+)(?=/)")
+# How long a worker waits for a freshly spawned shared server to publish its port
+SHARED_SERVER_START_TIMEOUT = 10.0
+# Spawned servers run from here so ``-m notes.helpers.mock_server`` resolves
+_PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+class _NotesRequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections open so pooled clients can reuse them
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; avoid Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+    server: "_NotesHTTPServer"
+
+    def _dispatch(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        path, _, query_string = self.path.partition("?")
+        namespace = None
+        match = _NAMESPACE_PREFIX.match(path)
+        if match:
+            namespace = match.group(1)
+            path = path[match.end() :]
+        if path.startswith(API_PREFIX):
+            path = path[len(API_PREFIX) :]
+        headers = {key.lower(): value for key, value in self.headers.items()}
+        backend = self.server.backend_for(namespace)
+        status, response_headers, content = backend.handle(
+            self.command, path, headers, body, dict(parse_qsl(query_string))
+        )
+        self.send_response(status)
+        for key, value in response_headers.items():
+            self.send_header(key, value)
+        bytes_per_s = backend.body_bytes_per_s
+        if not isinstance(content, str):
+            # Streamed list: length unknown up front, so use chunked encoding
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            chunks = throttle(content, bytes_per_s) if bytes_per_s else content
+            for chunk in chunks:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        payload = content.encode()
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if bytes_per_s:
+            for chunk in throttled_chunks(payload, bytes_per_s):
+                self.wfile.write(chunk)
+                self.wfile.flush()
+        else:
+            self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+    def log_message(self, format: str, *args: object) -> None:
+        """Silence per-request access logs."""
+
+
+class _NotesHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], backend: NotesMockBackend) -> None:
+        super().__init__(address, _NotesRequestHandler)
+        self.backend = backend
+        self._namespaces: dict[str, NotesMockBackend] = {}
+        self._namespaces_lock = threading.Lock()
+
+    def backend_for(self, namespace: str | None) -> NotesMockBackend:
+        if namespace is None:
+            return self.backend
+        with self._namespaces_lock:
+            backend = self._namespaces.get(namespace)
+            if backend is None:
+                backend = self._namespaces[namespace] = self.backend.spawn()
+            return backend
+
+
+def namespaced_base_url(root_url: str, namespace: str | None) -> str:
+    """API base URL whose notes are isolated from every other namespace."""
+    if namespace is None:
+        return f"{root_url}{API_PREFIX}"
+    return f"{root_url}/ns/{namespace}{API_PREFIX}"
+
+
+class MockNotesServer:
+    """Serve ``NotesMockBackend`` over loopback HTTP in a background thread.
+
+    Use as a context manager; ``base_url`` is a drop-in for ``BASE_URL_API``.
+    ``base_url_for(namespace)`` gives a URL with a separate note store.
+    """
+
+    def __init__(
+        self,
+        backend: NotesMockBackend | None = None,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.backend = backend or NotesMockBackend()
+        self._host = host
+        self._server = _NotesHTTPServer((host, port), self.backend)
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="notes-mock-server", daemon=True
+        )
+
+    @property
+    def port(self) -> int:
+        return self._server.server_port
+
+    @property
+    def base_url(self) -> str:
+        return self.base_url_for(None)
+
+    def base_url_for(self, namespace: str | None) -> str:
+        return namespaced_base_url(f"http://{self._host}:{self.port}", namespace)
+
+    def start(self) -> "MockNotesServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread.is_alive():
+            self._thread.join(timeout=5)
+
+    def serve_forever(self) -> None:
+        """Serve on the calling thread until ``stop`` or SIGTERM."""
+        self._server.serve_forever()
+
+    def __enter__(self) -> "MockNotesServer":
+        return self.start()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _port_open(host: str, port: int) -> bool:
+    try:
+        with socket.create_connection((host, port), timeout=1):
+            return True
+    except OSError:
+        return False
+
+
+class SharedMockServer:
+    """One ``MockNotesServer`` process shared by every pytest worker.
+
+    The first worker to ``acquire`` spawns ``python -m notes.helpers.mock_server``
+    and records its pid and port in ``<state_dir>/server.json`` under a
+    ``FileLock``; later workers find it there. Each holder registers its own pid
+    and the last one to ``release`` (or the next ``acquire`` after every holder
+    died) stops the process. ``base_url`` is scoped to ``namespace`` so workers
+    never see each other's notes.
+    """
+
+    def __init__(self, state_dir: Path, namespace: str, host: str, port: int):
+        self.state_dir = state_dir
+        self.namespace = namespace
+        self.host = host
+        self.port = port
+
+    @property
+    def base_url(self) -> str:
+        return self.base_url_for(self.namespace)
+
+    def base_url_for(self, namespace: str | None) -> str:
+        return namespaced_base_url(f"http://{self.host}:{self.port}", namespace)
+
+    @staticmethod
+    def _state_path(state_dir: Path) -> Path:
+        return state_dir / "server.json"
+
+    @staticmethod
+    def _read_state(state_dir: Path) -> dict | None:
+        try:
+            return json.loads(SharedMockServer._state_path(state_dir).read_text())
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_state(state_dir: Path, state: dict) -> None:
+        path = SharedMockServer._state_path(state_dir)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _spawn(
+        state_dir: Path,
+        host: str,
+        profile: str,
+        seed: int,
+        notes: int,
+        cross_logout: float,
+    ) -> dict:
+        port_file = state_dir / "port"
+        port_file.unlink(missing_ok=True)
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "notes.helpers.mock_server",
+                "--host",
+                host,
+                "--port-file",
+                str(port_file),
+                "--profile",
+                profile,
+                "--seed",
+                str(seed),
+                "--notes",
+                str(notes),
+                "--cross-logout",
+                str(cross_logout),
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            cwd=_PROJECT_ROOT,
+            # Outlive the spawning worker; the last holder stops it explicitly
+            start_new_session=True,
+        )
+        deadline = time.monotonic() + SHARED_SERVER_START_TIMEOUT
+        while not port_file.exists():
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError("Shared Notes mock server failed to start")
+            time.sleep(0.02)
+        port = int(port_file.read_text())
+        return {"pid": process.pid, "host": host, "port": port, "holders": []}
+
+    @classmethod
+    def acquire(
+        cls,
+        state_dir: Path,
+        namespace: str,
+        *,
+        host: str = "127.0.0.1",
+        profile: str = DEFAULT_PROFILE,
+        seed: int = 0,
+        notes: int = 0,
+        cross_logout: float = 0.0,
+    ) -> "SharedMockServer":
+        """Attach to (or start) the server in ``state_dir``.
+
+        ``profile``, ``seed``, ``notes`` and ``cross_logout`` only apply when this
+        call starts the process, so give each combination a ``state_dir`` of its
+        own. Sessions are shared by all namespaces, so a logout in one worker's
+        namespace can end sessions another worker is using.
+        """
+        state_dir.mkdir(parents=True, exist_ok=True)
+        with FileLock(state_dir / "server.lock"):
+            state = cls._read_state(state_dir)
+            if not (
+                state
+                and _pid_alive(state["pid"])
+                and _port_open(state["host"], state["port"])
+            ):
+                state = cls._spawn(state_dir, host, profile, seed, notes, cross_logout)
+            state["holders"] = [pid for pid in state["holders"] if _pid_alive(pid)] + [
+                os.getpid()
+            ]
+            cls._write_state(state_dir, state)
+        return cls(state_dir, namespace, state["host"], state["port"])
+
+    def release(self) -> None:
+        with FileLock(self.state_dir / "server.lock"):
+            state = self._read_state(self.state_dir)
+            if not state:
+                return
+            me = os.getpid()
+            state["holders"] = [
+                pid for pid in state["holders"] if pid != me and _pid_alive(pid)
+            ]
+            if state["holders"]:
+                self._write_state(self.state_dir, state)
+                return
+            try:
+                os.kill(state["pid"], signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+            self._state_path(self.state_dir).unlink(missing_ok=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the offline Notes API mock.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument(
+        "--port-file", type=Path, help="write the bound port here once listening"
+    )
+    parser.add_argument("--profile", choices=sorted(PROFILES), default=DEFAULT_PROFILE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--notes", type=int, default=0, help="seed every namespace with N notes"
+    )
+    parser.add_argument(
+        "--cross-logout",
+        type=float,
+        default=0.0,
+        help="probability a logout ends every session of the account",
+    )
+    args = parser.parse_args()
+
+    backend = NotesMockBackend.seeded(
+        args.notes,
+        seed=args.seed,
+        faults=injector_for(args.profile, args.seed),
+        sessions=MockSessions(args.cross_logout, args.seed),
+    )
+    server = MockNotesServer(backend, host=args.host, port=args.port)
+
+    def stop(signum: int, frame: object) -> None:
+        # shutdown() blocks until serve_forever returns, so call it off-thread
+        threading.Thread(target=server.stop, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    if args.port_file:
+        tmp = args.port_file.with_suffix(".tmp")
+        tmp.write_text(str(server.port))
+        os.replace(tmp, args.port_file)
+    print(f"Serving Notes API mock at {server.base_url}", flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# notes/helpers/mock_sessions.py
+import base64
+import hashlib
+import hmac
+import random
+import threading
+import time
+
+# Static token of the default account; accepted until a logout revokes it
+FAKE_TOKEN = "fake-token"
+DEFAULT_ACCOUNT = "offline-user"
+# Tokens are signed, not stored, so every backend (xdist worker, server
+# namespace, later run) accepts a token any other one minted
+_SIGNING_KEY = b"notes-offline-mock"
+
+
+def _sign(payload: str) -> str:
+    return hmac.new(_SIGNING_KEY, payload.encode(), hashlib.sha256).hexdigest()[:16]
+
+
+class MockSessions:
+    """Login sessions for the offline Notes mock, one token namespace per account.
+
+    ``login`` mints ``fake-token.<account>.<issued-at>.<signature>``; the token
+    is valid until its own logout revokes it or the account's sessions are
+    invalidated. The live app sometimes ends *every* session of the account on
+    logout, other browser contexts included (see
+    ``docs/decisions/notes-app-session-behavior.md``); ``cross_logout_rate`` is
+    the probability a logout does that here. Decisions are seeded per logout
+    number so a run replays the same invalidations.
+
+    One instance can back several ``NotesMockBackend``s (server namespaces), so
+    a logout in one worker's namespace reaches sessions used by another, as on
+    the real server.
+    """
+
+    def __init__(self, cross_logout_rate: float = 0.0, seed: int = 0) -> None:
+        self.cross_logout_rate = cross_logout_rate
+        self.seed = seed
+        self._revoked: set[str] = set()
+        # Tokens of an account issued before this (ns) are no longer valid
+        self._not_before: dict[str, int] = {}
+        self._last_issued = 0
+        self._logouts = 0
+        self.cross_logouts = 0
+        self._lock = threading.Lock()
+
+    def login(self, account: str) -> str:
+        with self._lock:
+            # Strictly increasing, so a token minted right after an
+            # invalidation is never mistaken for one from before it
+            issued = max(time.time_ns(), self._last_issued + 1)
+            self._last_issued = issued
+        name = base64.urlsafe_b64encode(account.encode()).decode().rstrip("=")
+        payload = f"{FAKE_TOKEN}.{name}.{issued}"
+        return f"{payload}.{_sign(payload)}"
+
+    def account_for(self, token: str | None) -> str | None:
+        """Account a live ``token`` belongs to; None if unknown or ended."""
+        if not token:
+            return None
+        if token == FAKE_TOKEN:
+            account, issued = DEFAULT_ACCOUNT, 0
+        else:
+            try:
+                prefix, name, issued_text, signature = token.split(".")
+                issued = int(issued_text)
+                padded = name + "=" * (-len(name) % 4)
+                account = base64.urlsafe_b64decode(padded).decode()
+            except ValueError:
+                return None
+            payload = f"{prefix}.{name}.{issued_text}"
+            if prefix != FAKE_TOKEN or not hmac.compare_digest(
+                signature, _sign(payload)
+            ):
+                return None
+        with self._lock:
+            if token in self._revoked or issued < self._not_before.get(account, 0):
+                return None
+        return account
+
+    def logout(self, token: str, account: str) -> bool:
+        """End ``token``; returns True if every session of the account ended."""
+        with self._lock:
+            self._revoked.add(token)
+            number = self._logouts
+            self._logouts += 1
+        rng = random.Random(f"{self.seed}:logout:{number}")
+        if not (self.cross_logout_rate and rng.random() < self.cross_logout_rate):
+            return False
+        with self._lock:
+            self._not_before[account] = max(time.time_ns(), self._last_issued + 1)
+            self.cross_logouts += 1
+        return True
@@ -0,0 +1,162 @@
+# notes/helpers/mock_store.py
+import random
+from operator import itemgetter
+from datetime import datetime, timedelta, timezone
+
+# Fields with a secondary index; list filters on any other field are rejected
+INDEXED_FIELDS = ("category", "completed", "title")
+_SEED_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+_Index = dict[object, dict[str, dict]]
+
+
+def _copy_indexes(indexes: dict[str, _Index]) -> dict[str, _Index]:
+    return {
+        field: {value: dict(matches) for value, matches in index.items()}
+        for field, index in indexes.items()
+    }
+
+
+class NoteStore:
+    """Insertion-ordered notes by id with secondary indexes on ``INDEXED_FIELDS``.
+
+    Each index maps a field value to the matching notes by id, in insertion
+    order, so a filtered list costs the size of its smallest matching index
+    rather than a scan of the store (holding the notes themselves avoids a
+    random-access lookup per id, which costs as much as the scan saves).
+    Notes are never mutated in place: ``update`` swaps in a new dict, so a
+    ``select`` snapshot taken under the caller's lock stays consistent while
+    it is being serialized.
+
+    ``freeze`` marks the current contents as the baseline that ``reset``
+    restores (e.g. a seeded big account). Writes after that are journaled and
+    ``reset`` undoes them, so it costs the test's writes rather than the
+    account size; a seeded note deleted and restored moves to the end of the
+    list. ``version`` changes on every write so list ETags need no hashing.
+
+    Not thread-safe by itself; ``NotesMockBackend`` serializes access.
+    """
+
+    def __init__(self) -> None:
+        self._notes: dict[str, dict] = {}
+        self._indexes: dict[str, _Index] = {field: {} for field in INDEXED_FIELDS}
+        self._baseline: tuple[dict[str, dict], dict[str, _Index]] | None = None
+        # (note id, note before the write or None), kept once frozen
+        self._journal: list[tuple[str, dict | None]] | None = None
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._notes)
+
+    def __contains__(self, note_id: object) -> bool:
+        return note_id in self._notes
+
+    def get(self, note_id: str) -> dict | None:
+        return self._notes.get(note_id)
+
+    def add(self, note: dict) -> None:
+        self._replace(note["id"], note)
+
+    def update(self, note_id: str, changes: dict) -> dict | None:
+        old = self._notes.get(note_id)
+        if old is None:
+            return None
+        new = {**old, **changes}
+        self._replace(note_id, new)
+        return new
+
+    def remove(self, note_id: str) -> bool:
+        if note_id not in self._notes:
+            return False
+        self._replace(note_id, None)
+        return True
+
+    def select(self, **filters: object) -> list[dict]:
+        """Notes matching every ``field=value`` filter, in insertion order."""
+        if not filters:
+            return list(self._notes.values())
+        candidates = []
+        for field, value in filters.items():
+            if field not in self._indexes:
+                raise KeyError(field)
+            matches = self._indexes[field].get(value)
+            if not matches:
+                return []
+            candidates.append((len(matches), field, matches))
+        candidates.sort(key=lambda candidate: candidate[0])
+        smallest = candidates[0][2]
+        if len(candidates) == 1:
+            return list(smallest.values())
+        # Check the remaining fields on the notes themselves
+        rest = [field for _, field, _ in candidates[1:]]
+        get = itemgetter(*rest)
+        wanted = get(filters)
+        return [note for note in smallest.values() if get(note) == wanted]
+
+    def freeze(self) -> None:
+        """Make the current contents what ``reset`` goes back to."""
+        # Notes are copy-on-write, so shallow copies keep the baseline intact
+        self._baseline = dict(self._notes), _copy_indexes(self._indexes)
+        self._journal = []
+
+    def reset(self) -> None:
+        if self._journal is None:
+            self._notes = {}
+            self._indexes = {field: {} for field in INDEXED_FIELDS}
+        else:
+            journal, self._journal = self._journal, None
+            for note_id, before in reversed(journal):
+                self._replace(note_id, before)
+            self._journal = []
+        self.version += 1
+
+    def share_baseline(self) -> "NoteStore":
+        """Separate store that starts from, and resets to, this one's baseline."""
+        store = NoteStore()
+        if self._baseline is not None:
+            notes, indexes = self._baseline
+            store._notes = dict(notes)
+            store._indexes = _copy_indexes(indexes)
+            store._baseline = self._baseline
+            store._journal = []
+        return store
+
+    def seed(self, count: int, seed: int = 0) -> None:
+        """Add ``count`` deterministic notes, as a big production account has."""
+        rng = random.Random(seed)
+        for number in range(count):
+            self.add(
+                {
+                    "id": f"{rng.getrandbits(48):012x}",
+                    "title": f"Seeded note {number}",
+                    "description": f"Seeded description {number} " * 3,
+                    "category": rng.choice(("Home", "Work")),
+                    "completed": rng.random() < 0.3,
+                    "created_at": (_SEED_EPOCH + timedelta(minutes=number)).isoformat(),
+                }
+            )
+
+    def _replace(self, note_id: str, note: dict | None) -> None:
+        """Put ``note`` (or nothing) under ``note_id``, keeping indexes in step."""
+        before = self._notes.pop(note_id, None)
+        if before is not None:
+            self._unindex(before)
+        if note is not None:
+            self._notes[note_id] = note
+            self._index(note)
+        if self._journal is not None:
+            self._journal.append((note_id, before))
+        self.version += 1
+
+    def _index(self, note: dict) -> None:
+        for field, index in self._indexes.items():
+            index.setdefault(note.get(field), {})[note["id"]] = note
+
+    def _unindex(self, note: dict) -> None:
+        for field, index in self._indexes.items():
+            value = note.get(field)
+            matches = index.get(value)
+            if matches is not None:
+                matches.pop(note["id"], None)
+                if not matches:
+                    del index[value]
@@ -0,0 +1,106 @@
+# notes/helpers/mock_transport.py
+import io
+from collections.abc import Iterator
+from http import HTTPStatus
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from notes.helpers.mock_backend import API_PREFIX, NotesMockBackend
+from notes.helpers.mock_faults import ThrottledBody, throttle
+
+
+def api_path(url: str) -> str:
+    """Path of ``url`` relative to the Notes API root, without the query."""
+    path = url.split("?", 1)[0]
+    index = path.find(API_PREFIX)
+    return path[index + len(API_PREFIX) :] if index >= 0 else "/"
+
+
+class ChunkedBody(io.RawIOBase):
+    """Readable file over an iterator of byte chunks, pulled as it is read."""
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        super().__init__()
+        self._chunks = chunks
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._pending:
+            self._pending = next(self._chunks, b"")
+            if not self._pending:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def make_response(
+    request: requests.PreparedRequest,
+    status: int,
+    headers: dict[str, str],
+    raw: io.IOBase,
+) -> requests.Response:
+    """Build the ``Response`` an ``HTTPAdapter`` would for an in-memory body."""
+    response = requests.Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.raw = raw
+    response.reason = HTTPStatus(status).phrase
+    response.url = request.url or ""
+    response.request = request
+    return response
+
+
+class NotesMockAdapter(BaseAdapter):
+    """Transport adapter that answers Notes API requests in-process.
+
+    Mount it on a session (or ``register_transport`` it for ``build_session``)
+    and requests to the API root never leave the process: the URL path goes
+    straight to ``NotesMockBackend.handle``. Nothing is built per request
+    beyond the response itself, and only ``backend.reset()`` is needed between
+    tests.
+    """
+
+    def __init__(self, backend: NotesMockBackend | None = None) -> None:
+        super().__init__()
+        self.backend = backend or NotesMockBackend()
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: Any = True,
+        cert: Any = None,
+        proxies: Any = None,
+    ) -> requests.Response:
+        url = request.url or ""
+        query = dict(parse_qsl(urlsplit(url).query))
+        # PreparedRequest headers are case-insensitive, as the backend expects
+        status, headers, content = self.backend.handle(
+            request.method or "GET", api_path(url), request.headers, request.body, query
+        )
+
+        bytes_per_s = self.backend.body_bytes_per_s
+        raw: io.IOBase
+        if isinstance(content, str):
+            body = content.encode()
+            raw = ThrottledBody(body, bytes_per_s) if bytes_per_s else io.BytesIO(body)
+        else:
+            raw = ChunkedBody(
+                throttle(content, bytes_per_s) if bytes_per_s else content
+            )
+        return make_response(request, status, headers, raw)
+
+    def close(self) -> None:
+        """Nothing to release; there are no sockets."""
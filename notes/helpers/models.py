@@ -0,0 +1,126 @@
+# notes/helpers/models.py
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import asdict, dataclass, fields
+from typing import Any, overload
+
+
+@dataclass(slots=True)
+class Note:
+    """Compact typed record for a Notes API note.
+
+    Supports read-only mapping-style access (``note["title"]``, ``"id" in note``)
+    so code written against the plain dict payloads keeps working.
+    """
+
+    id: str
+    title: str = ""
+    description: str = ""
+    category: str = "Home"
+    completed: bool = False
+    created_at: str | None = None
+    updated_at: str | None = None
+    user_id: str | None = None
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "Note":
+        """Build a Note, ignoring keys the model does not know about."""
+        return cls(**{name: data[name] for name in _NOTE_FIELDS if name in data})
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _NOTE_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in _NOTE_FIELDS
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in _NOTE_FIELDS else default
+
+
+_NOTE_FIELDS = frozenset(field.name for field in fields(Note))
+
+
+class NoteList(Sequence[Note]):
+    """Ordered notes with indexes for id, title, category and completed.
+
+    Indexes are built once on construction, so "find the note I just created"
+    is a dict lookup instead of a scan over the whole list.
+    """
+
+    __slots__ = ("_notes", "_by_id", "_by_title", "_by_category", "_by_completed")
+
+    def __init__(self, notes: Iterable[Note] = ()) -> None:
+        self._notes = list(notes)
+        self._by_id: dict[str, Note] = {}
+        self._by_title: dict[str, list[Note]] = {}
+        self._by_category: dict[str, list[Note]] = {}
+        self._by_completed: dict[bool, list[Note]] = {True: [], False: []}
+        for note in self._notes:
+            self._by_id[note.id] = note
+            self._by_title.setdefault(note.title, []).append(note)
+            self._by_category.setdefault(note.category, []).append(note)
+            self._by_completed[bool(note.completed)].append(note)
+
+    @classmethod
+    def from_dicts(cls, items: Iterable[Mapping[str, Any]]) -> "NoteList":
+        return cls(Note.from_dict(item) for item in items)
+
+    def __len__(self) -> int:
+        return len(self._notes)
+
+    @overload
+    def __getitem__(self, index: int) -> Note: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "NoteList": ...
+
+    def __getitem__(self, index: int | slice) -> "Note | NoteList":
+        if isinstance(index, slice):
+            return NoteList(self._notes[index])
+        return self._notes[index]
+
+    def __iter__(self) -> Iterator[Note]:
+        return iter(self._notes)
+
+    def __contains__(self, item: object) -> bool:
+        """Membership by note id or by Note instance."""
+        if isinstance(item, Note):
+            return self._by_id.get(item.id) == item
+        return item in self._by_id
+
+    def __repr__(self) -> str:
+        return f"NoteList({len(self._notes)} notes)"
+
+    def ids(self) -> list[str]:
+        return list(self._by_id)
+
+    def get(self, note_id: str) -> Note | None:
+        return self._by_id.get(note_id)
+
+    def by_title(self, title: str) -> list[Note]:
+        return list(self._by_title.get(title, ()))
+
+    def filter(
+        self, *, category: str | None = None, completed: bool | None = None
+    ) -> "NoteList":
+        """Return notes matching every given criterion, in original order."""
+        candidates: list[Note] = self._notes
+        if category is not None:
+            candidates = self._by_category.get(category, [])
+        if completed is not None:
+            by_completed = self._by_completed[completed]
+            if category is None:
+                candidates = by_completed
+            elif len(by_completed) < len(candidates):
+                candidates = [
+                    note for note in by_completed if note.category == category
+                ]
+            else:
+                candidates = [
+                    note for note in candidates if note.completed == completed
+                ]
+        return NoteList(candidates)
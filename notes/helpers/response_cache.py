@@ -0,0 +1,70 @@
+# notes/helpers/response_cache.py
+import copy
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 256
+
+
+class CacheEntry:
+    __slots__ = ("payload", "etag")
+
+    def __init__(self, payload: dict, etag: str | None) -> None:
+        self.payload = payload
+        self.etag = etag
+
+
+class ResponseCache:
+    """Bounded LRU cache of normalized GET payloads keyed by API path.
+
+    ``ApiClient`` consults it for GETs and invalidates entries on its own
+    create, update and delete calls. Entries that carry an ``ETag`` are
+    revalidated with ``If-None-Match``; entries without one are served directly,
+    so only attach a cache to a client that is the sole writer of its notes.
+    Payloads are deep-copied in and out, so callers may mutate what they get.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> CacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def read(self, entry: CacheEntry) -> dict:
+        return copy.deepcopy(entry.payload)
+
+    def put(self, key: str, payload: dict, etag: str | None = None) -> None:
+        self._entries[key] = CacheEntry(copy.deepcopy(payload), etag)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *keys: str) -> None:
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+        }
@@ -0,0 +1,223 @@
+# notes/helpers/retry.py
+import json
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+# Statuses that mean "upstream is unhealthy" for the circuit breaker
+FAILURE_STATUSES = frozenset({502, 503, 504})
+# Statuses that say nothing about upstream health: the server refused the work
+NEUTRAL_STATUSES = frozenset({429})
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class RetryPolicy:
+    """Decide whether and when to re-send a failed Notes API request.
+
+    Idempotent methods are retried on ``statuses`` and on connection errors or
+    timeouts. Non-idempotent ones (POST) are only retried when the request
+    provably never reached the server: connect timeouts and 429 rejections.
+    Backoff is exponential with full jitter; ``Retry-After`` wins when present.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_attempts: int = 3,
+        backoff_factor: float = 0.5,
+        backoff_max: float = 8.0,
+        retry_after_max: float = 30.0,
+        jitter: bool = True,
+        statuses: frozenset[int] = RETRYABLE_STATUSES,
+        methods: frozenset[str] = IDEMPOTENT_METHODS,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+        self.jitter = jitter
+        self.statuses = statuses
+        self.methods = methods
+        self._rng = rng or random.Random()
+
+    def should_retry(
+        self,
+        method: str,
+        attempt: int,
+        *,
+        status: int | None = None,
+        error: Exception | None = None,
+    ) -> bool:
+        if attempt >= self.max_attempts:
+            return False
+        idempotent = method.upper() in self.methods
+        if error is not None:
+            if isinstance(error, requests.exceptions.ConnectTimeout):
+                return True
+            return idempotent and isinstance(
+                error,
+                (requests.exceptions.ConnectionError, requests.exceptions.Timeout),
+            )
+        if status == 429:
+            return True
+        return idempotent and status in self.statuses
+
+    def delay(self, attempt: int, retry_after: str | None = None) -> float:
+        """Seconds to wait before attempt ``attempt + 1``."""
+        if retry_after:
+            parsed = _parse_retry_after(retry_after)
+            if parsed is not None:
+                return min(parsed, self.retry_after_max)
+        backoff = min(self.backoff_max, self.backoff_factor * 2 ** (attempt - 1))
+        return self._rng.uniform(0, backoff) if self.jitter else backoff
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+def _parse_retry_after(value: str) -> float | None:
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request while a host's circuit is open."""
+
+
+class CircuitBreaker:
+    """Per-host breaker: open after ``failure_threshold`` consecutive failures.
+
+    While open, requests fail fast with ``CircuitOpenError``; after
+    ``reset_timeout`` one trial request is let through (half-open) and its
+    outcome closes or re-opens the circuit. With ``state_file`` set, an open
+    circuit is published to disk so other xdist workers fail fast as well.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        state_file: Path | None = None,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state_file = state_file
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def _shared_open_until(self) -> float:
+        if self.state_file is None:
+            return 0.0
+        try:
+            return float(json.loads(self.state_file.read_text())["open_until"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0.0
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = time.time()
+            if self.state == CLOSED:
+                open_until = self._shared_open_until()
+                if open_until <= now:
+                    return True
+                # Another worker tripped the breaker; adopt its remaining window
+                self.state = OPEN
+                self._opened_at = open_until - self.reset_timeout
+            if self.state == OPEN:
+                if now - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> bool:
+        """Return True if this success closed a half-open circuit."""
+        with self._lock:
+            reopened = self.state != CLOSED
+            self.state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+            if reopened and self.state_file is not None:
+                self.state_file.unlink(missing_ok=True)
+            return reopened
+
+    def record_neutral(self) -> None:
+        """End a trial without a verdict (e.g. throttled); the state is kept."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Return True if this failure opened the circuit."""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == OPEN:
+                return False
+            if self.state == CLOSED and self._failures < self.failure_threshold:
+                return False
+            self.state = OPEN
+            self._opened_at = time.time()
+            if self.state_file is not None:
+                self.state_file.parent.mkdir(parents=True, exist_ok=True)
+                self.state_file.write_text(
+                    json.dumps({"open_until": self._opened_at + self.reset_timeout})
+                )
+            return True
+
+
+_breakers: dict[tuple[str, str], CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_state_dir: Path | None = None
+_scope = "live"
+
+
+def set_circuit_state_dir(directory: Path | None, *, scope: str = "live") -> None:
+    """Share open circuits through ``directory`` (e.g. across xdist workers).
+
+    ``scope`` names the transport behind the URLs (live, offline, replay), so
+    a mock answering for the live host never shares a breaker with it.
+    """
+    global _state_dir, _scope
+    _state_dir = directory
+    _scope = scope
+
+
+def circuit_breaker_for(url: str) -> CircuitBreaker:
+    """Return the process-wide breaker for the host of ``url`` in this scope."""
+    host = urlsplit(url).netloc
+    with _breakers_lock:
+        breaker = _breakers.get((_scope, host))
+        if breaker is None:
+            state_file = None
+            if _state_dir is not None:
+                state_file = _state_dir / f"{_scope}_{host.replace(':', '_')}.json"
+            name = host if _scope == "live" else f"{host} ({_scope})"
+            breaker = CircuitBreaker(name, state_file=state_file)
+            _breakers[(_scope, host)] = breaker
+        return breaker
@@ -0,0 +1,207 @@
+# notes/helpers/storage_state.py
+import base64
+import json
+import os
+import time
+from collections.abc import Callable, Iterable
+from http.cookiejar import Cookie
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from filelock import FileLock
+
+# Trust a storage state that any worker confirmed this recently
+DEFAULT_CHECK_TTL = 60
+# Cookie and localStorage names that carry the login
+_AUTH_NAMES = ("token", "auth", "session")
+# localStorage key the Notes web app reads its API token from
+TOKEN_STORAGE_KEY = "token"
+
+# Whether the app accepts a token; None when the probe cannot tell
+Probe = Callable[[str], bool | None]
+
+
+def _is_auth_name(name: str) -> bool:
+    return any(part in name.lower() for part in _AUTH_NAMES)
+
+
+def _auth_cookies(state: dict, origin: str) -> list[dict]:
+    host = urlsplit(origin).hostname or ""
+    return [
+        cookie
+        for cookie in state.get("cookies", [])
+        if _is_auth_name(cookie.get("name", ""))
+        and host.endswith(cookie.get("domain", "").lstrip("."))
+    ]
+
+
+def auth_tokens(state: dict, origin: str) -> list[str]:
+    """Token-like localStorage values of ``origin``, then its auth cookies."""
+    tokens = [
+        item["value"]
+        for entry in state.get("origins", [])
+        if entry.get("origin") == origin
+        for item in entry.get("localStorage", [])
+        if _is_auth_name(item.get("name", "")) and item.get("value")
+    ]
+    tokens += [c["value"] for c in _auth_cookies(state, origin) if c.get("value")]
+    return tokens
+
+
+def _jwt_expiry(token: str) -> float | None:
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        payload = json.loads(
+            base64.urlsafe_b64decode(parts[1] + "=" * (-len(parts[1]) % 4))
+        )
+    except ValueError:
+        return None
+    exp = payload.get("exp") if isinstance(payload, dict) else None
+    return float(exp) if isinstance(exp, int | float) else None
+
+
+def has_expired(state: dict, origin: str, now: float) -> bool:
+    """True if an auth cookie or a JWT token of ``origin`` is past its expiry."""
+    for cookie in _auth_cookies(state, origin):
+        # Playwright writes -1 for session cookies
+        if 0 < cookie.get("expires", -1) <= now:
+            return True
+    expiries = (_jwt_expiry(token) for token in auth_tokens(state, origin))
+    return any(exp is not None and exp <= now for exp in expiries)
+
+
+def _playwright_cookie(cookie: Cookie) -> dict:
+    return {
+        "name": cookie.name,
+        "value": cookie.value or "",
+        "domain": cookie.domain,
+        "path": cookie.path,
+        "expires": cookie.expires if cookie.expires is not None else -1,
+        "httpOnly": cookie.has_nonstandard_attr("HttpOnly"),
+        "secure": cookie.secure,
+        "sameSite": "Lax",
+    }
+
+
+def storage_state_for_token(
+    origin: str, token: str, cookies: Iterable[Cookie] = ()
+) -> dict:
+    """A Playwright storage state logged in with a token from ``/users/login``.
+
+    The token goes where the web app keeps it (``TOKEN_STORAGE_KEY`` in the
+    localStorage of ``origin``), along with the cookies the login set.
+    """
+    return {
+        "cookies": [_playwright_cookie(cookie) for cookie in cookies],
+        "origins": [
+            {
+                "origin": origin,
+                "localStorage": [{"name": TOKEN_STORAGE_KEY, "value": token}],
+            }
+        ],
+    }
+
+
+def write_storage_state(path: Path, state: dict) -> None:
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(state))
+    os.chmod(tmp_path, 0o600)
+    tmp_path.replace(path)
+
+
+class StorageStateCheck:
+    """Tell whether a saved Playwright storage state is still logged in, cheaply.
+
+    The state file itself answers first: an expired auth cookie or JWT means
+    no. Otherwise one ``probe(token)`` request decides. A positive verdict is
+    shared with the other xdist workers through ``<state>.checked`` and
+    trusted for ``ttl`` seconds while the state file stays unchanged.
+    ``check`` returns None when the file holds no token or the probe cannot
+    tell, so the caller can fall back to loading the app in a browser.
+    """
+
+    def __init__(
+        self, origin: str, probe: Probe, *, ttl: float = DEFAULT_CHECK_TTL
+    ) -> None:
+        self.origin = origin
+        self.probe = probe
+        self.ttl = ttl
+
+    def _marker(self, path: Path) -> Path:
+        return path.with_suffix(".checked")
+
+    def _fingerprint(self, path: Path) -> list[int]:
+        stat = path.stat()
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def _remembered(self, path: Path) -> bool:
+        try:
+            entry = json.loads(self._marker(path).read_text())
+            fingerprint = self._fingerprint(path)
+        except (OSError, ValueError):
+            return False
+        return (
+            isinstance(entry, dict)
+            and entry.get("state") == fingerprint
+            and time.time() - entry.get("checked_at", 0) < self.ttl
+        )
+
+    def remember(self, path: Path) -> None:
+        """Record that ``path`` was just confirmed to be logged in."""
+        marker = self._marker(path)
+        tmp_path = marker.with_suffix(".checked.tmp")
+        tmp_path.write_text(
+            json.dumps({"state": self._fingerprint(path), "checked_at": time.time()})
+        )
+        os.chmod(tmp_path, 0o600)
+        tmp_path.replace(marker)
+
+    def forget(self, path: Path) -> None:
+        self._marker(path).unlink(missing_ok=True)
+
+    def check(self, path: Path) -> bool | None:
+        """True or False when the file and one probe settle it, else None."""
+        if self._remembered(path):
+            return True
+        try:
+            state = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return False
+        if not isinstance(state, dict) or has_expired(state, self.origin, time.time()):
+            return False
+        tokens = auth_tokens(state, self.origin)
+        if not tokens:
+            return None
+        valid = self.probe(tokens[0])
+        if valid:
+            self.remember(path)
+        elif valid is False:
+            self.forget(path)
+        return valid
+
+
+class AuthGeneration:
+    """A counter on disk that xdist workers bump when a login may have ended.
+
+    Workers remember the generation they last validated a storage state at
+    and revalidate only once it moves, instead of before every test.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def current(self) -> int:
+        try:
+            return int(self.path.read_text())
+        except (OSError, ValueError):
+            return 0
+
+    def bump(self) -> int:
+        with FileLock(self.path.with_suffix(".lock")):
+            generation = self.current() + 1
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(str(generation))
+            tmp_path.replace(self.path)
+        return generation
@@ -0,0 +1,91 @@
+# notes/helpers/token_cache.py
+import json
+import os
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from filelock import FileLock
+
+# Reuse a cached token without probing for this long after it was minted
+DEFAULT_TOKEN_TTL = 30 * 60
+
+
+class TokenCache:
+    """Share Notes API tokens between xdist workers through files on disk.
+
+    Entries live in ``<directory>/api_token_<namespace>_<profile>.json`` and are
+    read/written under a sibling ``FileLock``, so concurrent workers log in once
+    and reuse the result. Within ``ttl`` a token is trusted as-is; after that it
+    is kept only if ``probe(token)`` still accepts it.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        namespace: str = "live",
+        ttl: float = DEFAULT_TOKEN_TTL,
+    ) -> None:
+        self.directory = directory
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def _path(self, profile: str) -> Path:
+        return self.directory / f"api_token_{self.namespace}_{profile}.json"
+
+    def _read(self, path: Path) -> dict | None:
+        try:
+            entry = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or not entry.get("token"):
+            return None
+        return entry
+
+    def _write(self, path: Path, token: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"token": token, "minted_at": time.time()}))
+        os.chmod(tmp_path, 0o600)
+        tmp_path.replace(path)
+
+    def get(
+        self,
+        profile: str,
+        *,
+        login: Callable[[], str],
+        probe: Callable[[str], bool] | None = None,
+    ) -> str:
+        """Return a usable token for ``profile``, logging in only when needed."""
+        path = self._path(profile)
+        with FileLock(path.with_suffix(".lock")):
+            entry = self._read(path)
+            if entry:
+                token = entry["token"]
+                if time.time() - entry.get("minted_at", 0) < self.ttl:
+                    return token
+                if probe is not None and probe(token):
+                    self._write(path, token)
+                    return token
+            token = login()
+            self._write(path, token)
+            return token
+
+    def refresh(
+        self, profile: str, stale_token: str, *, login: Callable[[], str]
+    ) -> str:
+        """Replace ``stale_token`` after a 401 unless another worker already did."""
+        path = self._path(profile)
+        with FileLock(path.with_suffix(".lock")):
+            entry = self._read(path)
+            if entry and entry["token"] != stale_token:
+                return entry["token"]
+            token = login()
+            self._write(path, token)
+            return token
+
+    def invalidate(self, profile: str) -> None:
+        path = self._path(profile)
+        with FileLock(path.with_suffix(".lock")):
+            path.unlink(missing_ok=True)
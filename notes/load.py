@@ -0,0 +1,395 @@
+"""Drive a weighted mix of Notes API calls with N virtual users.
+
+Each virtual user is a thread with its own ApiClient on one shared keep-alive
+pool. Users start evenly over ``--ramp-up`` seconds and run until the
+``--duration`` deadline; ``--rate`` paces the total throughput instead of
+running flat out. With ``--offline`` the runner targets an in-process
+``MockNotesServer`` so it can be validated without network; ``--mock-profile``
+gives that mock production-like latency and faults and ``--mock-notes`` a big
+account to list.
+
+Usage:
+    python -m notes.load --offline --users 8 --duration 10 --ramp-up 2
+    python -m notes.load --offline --mock-profile production --seed 1
+    python -m notes.load --users 4 --rate 5 --mix create=1,list=3 \\
+        --email me@example.com --password ...
+
+Exits with 1 if the throughput target or ``--max-error-rate`` was missed.
+"""
+
+import argparse
+import bisect
+import os
+import random
+import sys
+import threading
+import time
+from collections.abc import Callable, Sequence
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+
+import requests
+
+from config import BASE_URL_API
+from notes.helpers.api_client import ApiClient, build_session
+from notes.helpers.mock_backend import NotesMockBackend
+from notes.helpers.mock_faults import DEFAULT_PROFILE, PROFILES, injector_for
+from notes.helpers.mock_server import MockNotesServer
+from notes.helpers.retry import NO_RETRY, CircuitBreaker
+from shared.helpers.db_logger import ApiCallRecorder, init_db
+
+OPERATIONS = ("create", "list", "update", "delete")
+DEFAULT_MIX = {"create": 25, "list": 50, "update": 15, "delete": 10}
+# Upper bounds (ms) of the latency histogram buckets; the last one is open
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+# Share of the --rate target that must be reached for the run to pass
+RATE_TOLERANCE = 0.9
+
+
+@dataclass(slots=True)
+class LoadProfile:
+    users: int = 4
+    duration: float = 10.0
+    ramp_up: float = 0.0
+    # Target operations per second across all users; 0 runs unthrottled
+    rate: float = 0.0
+    mix: dict[str, int] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    seed: int | None = None
+
+
+class OperationStats:
+    """Latencies and errors of one operation type."""
+
+    __slots__ = ("latencies_ms", "errors")
+
+    def __init__(self) -> None:
+        self.latencies_ms: list[float] = []
+        self.errors: dict[str, int] = {}
+
+    @property
+    def calls(self) -> int:
+        return len(self.latencies_ms)
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    def record(self, latency_ms: float, error: str | None = None) -> None:
+        self.latencies_ms.append(latency_ms)
+        if error is not None:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def merge(self, other: "OperationStats") -> None:
+        self.latencies_ms.extend(other.latencies_ms)
+        for error, count in other.errors.items():
+            self.errors[error] = self.errors.get(error, 0) + count
+
+    def percentile(self, pct: float) -> float:
+        """Nearest-rank percentile of the recorded latencies."""
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        rank = max(1, -(-len(ordered) * pct // 100))
+        return ordered[int(rank) - 1]
+
+    def histogram(self) -> list[int]:
+        counts = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        for latency in self.latencies_ms:
+            counts[bisect.bisect_left(HISTOGRAM_BUCKETS_MS, latency)] += 1
+        return counts
+
+
+@dataclass(slots=True)
+class LoadReport:
+    profile: LoadProfile
+    elapsed: float
+    stats: dict[str, OperationStats]
+
+    @property
+    def calls(self) -> int:
+        return sum(op.calls for op in self.stats.values())
+
+    @property
+    def throughput(self) -> float:
+        return self.calls / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        errors = sum(op.error_count for op in self.stats.values())
+        return errors / self.calls if self.calls else 0.0
+
+    @property
+    def rate_met(self) -> bool:
+        rate = self.profile.rate
+        return not rate or self.throughput >= rate * RATE_TOLERANCE
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    """Parse ``create=1,list=3`` into operation weights."""
+    mix: dict[str, int] = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation {name!r}; expected {OPERATIONS}")
+        try:
+            mix[name] = int(weight)
+        except ValueError:
+            raise ValueError(f"Weight for {name!r} must be an integer") from None
+        if mix[name] < 0:
+            raise ValueError(f"Weight for {name!r} must not be negative")
+    if not any(mix.values()):
+        raise ValueError("At least one operation needs a positive weight")
+    return mix
+
+
+def _error_label(exc: Exception) -> str:
+    if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+        return f"HTTP {exc.response.status_code}"
+    return type(exc).__name__
+
+
+class _VirtualUser:
+    """One load thread: owns the notes it created so updates never collide."""
+
+    def __init__(self, client: ApiClient, rng: random.Random, mix: dict[str, int]):
+        self.client = client
+        self.rng = rng
+        self.names = [name for name, weight in mix.items() if weight > 0]
+        self.weights = [mix[name] for name in self.names]
+        self.note_ids: list[str] = []
+        self.stats = {name: OperationStats() for name in OPERATIONS}
+
+    def _call(self, name: str) -> None:
+        client = self.client
+        if name in ("update", "delete") and not self.note_ids:
+            # Nothing of ours to touch yet; creating keeps the mix moving
+            name = "create"
+        started = time.perf_counter()
+        error = None
+        try:
+            if name == "create":
+                result = client.create_note("load test", "load test", "Home")
+                self.note_ids.append(result["data"]["id"])
+            elif name == "list":
+                client.get_all_notes()
+            elif name == "update":
+                note_id = self.rng.choice(self.note_ids)
+                client.update_note(note_id, "load test", "updated", True, "Work")
+            else:
+                note_id = self.note_ids.pop(self.rng.randrange(len(self.note_ids)))
+                client.delete_note(note_id)
+        except (requests.exceptions.RequestException, KeyError, ValueError) as exc:
+            error = _error_label(exc)
+        self.stats[name].record((time.perf_counter() - started) * 1000, error)
+
+    def run(self, start_at: float, deadline: float, interval: float) -> None:
+        _sleep_until(start_at)
+        next_at = start_at
+        while True:
+            if interval:
+                _sleep_until(next_at)
+                next_at += interval
+            if time.monotonic() >= deadline:
+                return
+            self._call(self.rng.choices(self.names, self.weights)[0])
+
+    def cleanup(self) -> None:
+        for note_id in self.note_ids:
+            try:
+                self.client.delete_note(note_id)
+            except requests.exceptions.RequestException:
+                pass  # Best effort
+
+
+def _sleep_until(moment: float) -> None:
+    delay = moment - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+
+
+def run_load(
+    base_url: str,
+    profile: LoadProfile,
+    *,
+    email: str,
+    password: str,
+    call_hooks: Sequence[Callable] = (),
+) -> LoadReport:
+    """Run ``profile`` against ``base_url`` and return the merged statistics.
+
+    Requests are not retried and use a private circuit breaker, so upstream
+    errors show up in the report instead of being absorbed or short-circuited.
+    """
+    rng = random.Random(profile.seed)
+    session = build_session(pool_maxsize=max(profile.users, 1))
+    breaker = CircuitBreaker(f"load:{base_url}", failure_threshold=sys.maxsize)
+
+    def new_client() -> ApiClient:
+        return ApiClient(
+            base_url,
+            session=session,
+            retry_policy=NO_RETRY,
+            circuit_breaker=breaker,
+            call_hooks=call_hooks,
+        )
+
+    login_client = new_client()
+    login_client.login_user(email=email, password=password)
+    users = []
+    for _ in range(profile.users):
+        client = new_client()
+        client.token = login_client.token
+        users.append(_VirtualUser(client, random.Random(rng.random()), profile.mix))
+
+    # Each user paces itself so the users together hit the target rate
+    interval = profile.users / profile.rate if profile.rate else 0.0
+    step = profile.ramp_up / profile.users if profile.users else 0.0
+    started = time.monotonic()
+    deadline = started + profile.duration
+    threads = [
+        threading.Thread(
+            target=user.run,
+            args=(started + index * step, deadline, interval),
+            name=f"load-user-{index}",
+            daemon=True,
+        )
+        for index, user in enumerate(users)
+    ]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+    finally:
+        for user in users:
+            user.cleanup()
+        session.close()
+
+    stats = {name: OperationStats() for name in OPERATIONS}
+    for user in users:
+        for name, op_stats in user.stats.items():
+            stats[name].merge(op_stats)
+    return LoadReport(profile=profile, elapsed=elapsed, stats=stats)
+
+
+def format_report(report: LoadReport) -> str:
+    profile = report.profile
+    lines = [
+        f"{profile.users} users, {report.elapsed:.1f}s, ramp-up {profile.ramp_up:g}s",
+        f"{report.calls} calls, {report.throughput:.1f} ops/s"
+        + (
+            f" (target {profile.rate:g} ops/s: "
+            f"{'met' if report.rate_met else 'MISSED'})"
+            if profile.rate
+            else ""
+        ),
+        f"error rate {report.error_rate:.2%}",
+        "",
+        f"{'operation':<10}{'calls':>8}{'errors':>8}"
+        f"{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}",
+    ]
+    for name, op in report.stats.items():
+        if not op.calls:
+            continue
+        lines.append(
+            f"{name:<10}{op.calls:>8}{op.error_count:>8}"
+            f"{op.percentile(50):>10.1f}{op.percentile(90):>10.1f}"
+            f"{op.percentile(99):>10.1f}{max(op.latencies_ms):>10.1f}"
+        )
+    for name, op in report.stats.items():
+        if not op.calls:
+            continue
+        lines += ["", f"{name} latency histogram"]
+        counts = op.histogram()
+        peak = max(counts)
+        lower = 0
+        for upper, count in zip((*HISTOGRAM_BUCKETS_MS, None), counts):
+            label = f"{lower}-{upper} ms" if upper else f">{lower} ms"
+            bar = "#" * round(40 * count / peak) if peak else ""
+            lines.append(f"  {label:>14} {count:>7} {bar}")
+            lower = upper or lower
+        for error, count in sorted(op.errors.items()):
+            lines.append(f"  error {error}: {count}")
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=4, help="virtual users")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="seconds")
+    parser.add_argument(
+        "--rate", type=float, default=0.0, help="target ops/s in total (0: max)"
+    )
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=dict(DEFAULT_MIX),
+        help="weights, e.g. create=25,list=50,update=15,delete=10",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument(
+        "--offline", action="store_true", help="run against an in-process mock"
+    )
+    parser.add_argument(
+        "--mock-profile",
+        choices=sorted(PROFILES),
+        default=DEFAULT_PROFILE,
+        help="latency/fault profile of the --offline mock (seeded by --seed)",
+    )
+    parser.add_argument(
+        "--mock-notes",
+        type=int,
+        default=0,
+        help="notes preloaded into the --offline mock account",
+    )
+    parser.add_argument("--base-url", default=BASE_URL_API)
+    parser.add_argument("--email", default=os.getenv("NOTES_LOAD_EMAIL"))
+    parser.add_argument("--password", default=os.getenv("NOTES_LOAD_PASSWORD"))
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="also write per-request timings to the api_calls table",
+    )
+    args = parser.parse_args(argv)
+
+    profile = LoadProfile(
+        users=args.users,
+        duration=args.duration,
+        ramp_up=args.ramp_up,
+        rate=args.rate,
+        mix=args.mix,
+        seed=args.seed,
+    )
+    with ExitStack() as stack:
+        base_url, email, password = args.base_url, args.email, args.password
+        if args.offline:
+            faults = injector_for(args.mock_profile, args.seed or 0)
+            backend = NotesMockBackend.seeded(
+                args.mock_notes, seed=args.seed or 0, faults=faults
+            )
+            server = MockNotesServer(backend)
+            base_url = stack.enter_context(server).base_url
+            email, password = email or "load@example.com", password or "load"
+        elif not (email and password):
+            parser.error("--email/--password (or NOTES_LOAD_*) are required online")
+        hooks = []
+        if args.record:
+            init_db()
+            recorder = ApiCallRecorder()
+            stack.callback(recorder.flush)
+            hooks.append(recorder.record)
+        report = run_load(
+            base_url, profile, email=email, password=password, call_hooks=hooks
+        )
+
+    print(format_report(report))
+    passed = report.rate_met and report.error_rate <= args.max_error_rate
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from notes.helpers.async_api_client import AsyncApiClient
+
+
+@pytest.mark.notes
+@pytest.mark.api
+@pytest.mark.e2e
+@pytest.mark.anyio
+async def test_notes_api_bulk_flow(async_api_client_auth: AsyncApiClient) -> None:
+    batch = uuid4().hex[:8]
+    specs = [
+        {"title": f"Bulk {batch} {i}", "description": f"Bulk description {i}"}
+        for i in range(20)
+    ]
+
+    created = await async_api_client_auth.create_notes(specs, limit=5)
+    note_ids = [response["data"]["id"] for response in created]
+    try:
+        assert [response["data"]["title"] for response in created] == [
+            spec["title"] for spec in specs
+        ], "Bulk results keep input order"
+        assert all(response["data"]["completed"] is False for response in created)
+
+        listed = await async_api_client_auth.get_all_notes()
+        listed_ids = {note["id"] for note in listed["data"]}
+        assert set(note_ids) <= listed_ids, "All bulk-created notes are listed"
+
+        fetched = await async_api_client_auth.get_notes_by_ids(note_ids)
+        assert [response["data"]["id"] for response in fetched] == note_ids
+    finally:
+        results = await async_api_client_auth.delete_notes(
+            note_ids, return_exceptions=True
+        )
+
+    assert all(not isinstance(result, Exception) for result in results)
+
+    with pytest.raises(httpx.HTTPStatusError) as ei:
+        await async_api_client_auth.get_note_by_id(note_ids[0])
+    assert ei.value.response.status_code in {400, 404}
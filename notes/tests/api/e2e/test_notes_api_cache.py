@@ -0,0 +1,41 @@
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+import requests
+
+from notes.helpers.api_client import ApiClient
+
+
+@pytest.mark.notes
+@pytest.mark.api
+@pytest.mark.e2e
+@pytest.mark.api_cache
+def test_cached_reads_follow_the_server(
+    api_client_auth: ApiClient,
+    note_factory: Callable[..., dict[str, Any]],
+    notes_api_session: requests.Session,
+    notes_api_base_url: str,
+) -> None:
+    cache = api_client_auth.cache
+    assert cache is not None
+    note_id = note_factory(title="Cached")["data"]["id"]
+    api_client_auth.get_note_by_id(note_id)
+    assert cache.stats()["misses"] == 1
+
+    # Another client edits the note behind the cache's back
+    other_client = ApiClient(notes_api_base_url, session=notes_api_session)
+    other_client.token = api_client_auth.token
+    other_client.update_note(note_id, "Edited elsewhere", "Changed", False)
+    assert api_client_auth.get_note_by_id(note_id)["data"]["title"] == (
+        "Edited elsewhere"
+    ), "An ETag revalidation sees other clients' writes"
+
+    # Our own write is read back from the server, not echoed from the cache
+    misses = cache.stats()["misses"]
+    api_client_auth.update_note(note_id, "Edited here", "Changed", True)
+    response_get = api_client_auth.get_note_by_id(note_id)
+
+    assert response_get["data"]["title"] == "Edited here"
+    assert response_get["data"]["completed"] is True
+    assert cache.stats()["misses"] == misses + 1, "The write dropped the entry"
@@ -0,0 +1,25 @@
+import pytest
+import requests
+
+from notes.helpers.api_client import ApiClient
+
+
+@pytest.mark.notes
+@pytest.mark.api
+@pytest.mark.e2e
+@pytest.mark.seq_only
+def test_logout_ends_session(
+    test_users: dict, profile_name: str, notes_api_base_url: str
+) -> None:
+    user = test_users[profile_name]
+    with ApiClient(notes_api_base_url) as api_client:
+        api_client.login_user(user["email"], user["password"])
+        token = api_client.token
+
+        response = api_client.logout_user()
+
+        assert response["success"] is True, "Logout successful"
+        api_client.token = token
+        with pytest.raises(requests.exceptions.HTTPError) as exc_info:
+            api_client.get_user_profile()
+    assert exc_info.value.response.status_code == 401, "Logged-out token rejected"
@@ -3,14 +3,15 @@ from uuid import uuid4
 import pytest
 import requests
 
-from config import BASE_URL_API
 from notes.helpers.api_client import ApiClient
 
 
 @pytest.mark.notes
 @pytest.mark.api
-def test_login_rejects_invalid_credentials(test_users: dict, profile_name: str) -> None:
-    client = ApiClient(BASE_URL_API)
+def test_login_rejects_invalid_credentials(
+    test_users: dict, profile_name: str, notes_api_base_url: str
+) -> None:
+    client = ApiClient(notes_api_base_url)
     user = test_users[profile_name]
 
     with pytest.raises(requests.exceptions.HTTPError) as excinfo:
@@ -26,8 +27,10 @@ def test_login_rejects_invalid_credentials(test_users: dict, profile_name: str)
     "operation",
     ("create_note", "get_all_notes", "get_note_by_id", "delete_note", "update_note"),
 )
-def test_requires_authentication_for_note_operations(operation: str) -> None:
-    client = ApiClient(BASE_URL_API)
+def test_requires_authentication_for_note_operations(
+    operation: str, notes_api_base_url: str
+) -> None:
+    client = ApiClient(notes_api_base_url)
 
     with pytest.raises(requests.exceptions.HTTPError) as excinfo:
         if operation == "create_note":
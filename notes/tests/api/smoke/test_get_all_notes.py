@@ -4,6 +4,7 @@ from typing import Any
 import pytest
 
 from notes.helpers.api_client import ApiClient
+from notes.helpers.models import Note, NoteList
 
 
 @pytest.mark.notes
@@ -31,3 +32,38 @@ def test_get_all_notes(
     ), "Description matches created value"
     assert my_note["category"] == "Home", "Category defaults to Home"
     assert isinstance(my_note["completed"], bool), "Completed flag is boolean"
+
+
+@pytest.mark.notes
+@pytest.mark.api
+@pytest.mark.smoke
+def test_iter_all_notes_streams_normalized_notes(
+    api_client_auth: ApiClient, note_factory: Callable[..., dict[str, Any]]
+) -> None:
+    note_id = note_factory(title="test title STREAM")["data"]["id"]
+
+    streamed = {note["id"]: note for note in api_client_auth.iter_all_notes()}
+
+    assert note_id in streamed, f"Created note {note_id} not in streamed notes"
+    assert streamed[note_id]["title"] == "test title STREAM", "Title matches"
+    assert isinstance(streamed[note_id]["completed"], bool), "Completed is boolean"
+
+
+@pytest.mark.notes
+@pytest.mark.api
+@pytest.mark.smoke
+def test_get_all_notes_as_models(
+    api_client_auth: ApiClient, note_factory: Callable[..., dict[str, Any]]
+) -> None:
+    note_id = note_factory(title="test title MODEL", category="Work")["data"]["id"]
+    api_client_auth.as_models = True
+
+    notes = api_client_auth.get_all_notes()["data"]
+
+    assert isinstance(notes, NoteList), "List is returned as an indexed NoteList"
+    my_note = notes.get(note_id)
+    assert isinstance(my_note, Note), f"Could not find note with id {note_id}"
+    assert my_note.title == "test title MODEL", "Title matches created value"
+    assert my_note in notes.by_title("test title MODEL"), "Title index finds note"
+    assert note_id in notes.filter(category="Work").ids(), "Category filter matches"
+    assert my_note.completed is False, "Completed flag is a boolean False"
@@ -0,0 +1,41 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+import requests
+
+from notes.helpers.api_client import ApiClient
+from notes.helpers.mock_backend import NotesMockBackend
+from notes.helpers.mock_sessions import FAKE_TOKEN
+from notes.helpers.mock_transport import NotesMockAdapter
+from shared.helpers.db_logger import ApiCallRecorder, current_nodeid, init_db
+
+BASE_URL = "http://api-timing.test/notes/api"
+
+
+@pytest.mark.notes
+def test_note_lookup_is_timed_into_api_calls(tmp_path: Path) -> None:
+    db_path = tmp_path / "results.db"
+    init_db(db_path)
+    recorder = ApiCallRecorder(db_path)
+    session = requests.Session()
+    session.mount(BASE_URL, NotesMockAdapter(NotesMockBackend.seeded(0, seed=1)))
+    api_client = ApiClient(BASE_URL, session=session, call_hooks=[recorder.record])
+    api_client.token = FAKE_TOKEN
+    note_id = api_client.create_note("Timed", "Timed description")["data"]["id"]
+
+    api_client.get_note_by_id(note_id)
+    recorder.flush()
+
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute(
+            "SELECT nodeid, status, bytes, ttfb_ms, total_ms FROM api_calls "
+            "WHERE method = 'GET' AND endpoint = '/notes/{id}'"
+        ).fetchall()
+    conn.close()
+    assert len(rows) == 1, "One timing row recorded for the note lookup"
+    nodeid, status, size, ttfb_ms, total_ms = rows[0]
+    assert nodeid == current_nodeid(), "Row keyed to the running test"
+    assert status == 200, "Status recorded"
+    assert size > 0, "Response size recorded"
+    assert 0 <= ttfb_ms <= total_ms, "Time to first byte fits in total latency"
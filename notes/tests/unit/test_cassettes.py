@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import pytest
+import requests
+
+from notes.helpers.api_client import ApiClient
+from notes.helpers.cassette import CassetteMissError, RecordingAdapter, ReplayAdapter
+from notes.helpers.mock_transport import NotesMockAdapter
+
+BASE_URL = "http://cassette.test/notes/api"
+
+
+def _client(adapter: requests.adapters.BaseAdapter) -> ApiClient:
+    session = requests.Session()
+    session.mount(BASE_URL, adapter)
+    return ApiClient(BASE_URL, session=session)
+
+
+def _flow(client: ApiClient) -> list:
+    client.login_user(email="tape@example.com", password="s3cret-pass")
+    created = client.create_note("Taped", "Recorded once", "Work")["data"]
+    fetched = client.get_note_by_id(created["id"])["data"]
+    client.update_note(created["id"], "Taped v2", "Recorded once", True, "Work")
+    client.delete_note(created["id"])
+    return [fetched["title"], fetched["category"], created["id"] == fetched["id"]]
+
+
+@pytest.mark.notes
+def test_cassette_round_trip(tmp_path: Path) -> None:
+    nodeid = "notes/tests/api/e2e/test_x.py::test_flow[profile1]"
+    recorder = RecordingAdapter(tmp_path, inner=NotesMockAdapter())
+    recorder.begin_test(nodeid)
+    recorded = _flow(_client(recorder))
+    recorder.end_test()
+
+    tape = (
+        tmp_path / "notes/tests/api/e2e/test_x/test_flow[profile1].jsonl"
+    ).read_text()
+    assert "s3cret-pass" not in tape and "tape@example.com" not in tape
+    assert "<<id:" in tape, "Note ids are stored as placeholders"
+
+    replayer = ReplayAdapter(tmp_path)
+    replayer.begin_test(nodeid)
+    client = _client(replayer)
+    assert _flow(client) == recorded
+    with pytest.raises(CassetteMissError):
+        client.get_all_notes()
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+UI_TEST = "notes/tests/ui/smoke/test_home_page.py"
+
+
+@pytest.mark.notes
+def test_auth_is_revalidated_before_the_browser_context(tmp_path: Path) -> None:
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "--setup-plan", "-p", "no:cacheprovider"]
+        + ["--browser", "chromium", UI_TEST],
+        cwd=REPO_ROOT,
+        env={**os.environ, "TEST_DB_PATH": str(tmp_path / "results.db")},
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    plan = [line.split() for line in result.stdout.splitlines()]
+    setups = [words[2] for words in plan if words[:2] == ["SETUP", "F"]]
+    context_args = next(
+        line
+        for line in result.stdout.splitlines()
+        if line.split()[:3] == ["SETUP", "F", "browser_context_args"]
+    )
+
+    assert "ensure_valid_notes_auth" in context_args, "A dependency, not a peer"
+    assert setups.index("ensure_valid_notes_auth") < setups.index("context")
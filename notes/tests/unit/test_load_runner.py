@@ -0,0 +1,24 @@
+import pytest
+
+from notes.helpers.mock_server import SharedMockServer
+from notes.load import LoadProfile, run_load
+
+
+@pytest.mark.notes
+def test_load_runner_against_mock(notes_mock_server: SharedMockServer) -> None:
+    profile = LoadProfile(users=3, duration=1.0, ramp_up=0.3, rate=60, seed=7)
+
+    report = run_load(
+        notes_mock_server.base_url,
+        profile,
+        email="load@example.com",
+        password="load",
+    )
+
+    assert report.calls > 0, "Virtual users issued requests"
+    errors = {error for op in report.stats.values() for error in op.errors}
+    # Fault profiles may inject 5xx/429s; anything else is a runner bug
+    assert all(error.startswith("HTTP ") for error in errors), errors
+    assert report.throughput <= 60 * 1.1, "Pacing keeps throughput near target"
+    assert report.stats["list"].calls > 0, "Mix includes list calls"
+    assert sum(report.stats["create"].histogram()) == report.stats["create"].calls
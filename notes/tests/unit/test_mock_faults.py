@@ -0,0 +1,15 @@
+import pytest
+
+from notes.helpers.mock_faults import PROFILES, FaultInjector
+
+
+@pytest.mark.notes
+@pytest.mark.parametrize("name", [name for name in PROFILES if PROFILES[name].fails])
+def test_fault_profiles_leave_logins_alone(name: str) -> None:
+    injector = FaultInjector(PROFILES[name], seed=0)
+
+    logins = [injector.decide("POST", "/users/login") for _ in range(500)]
+    reads = [injector.decide("GET", "/notes") for _ in range(500)]
+
+    assert all(fault.status is None for fault in logins)
+    assert any(fault.status is not None for fault in reads), "Faults still apply"
@@ -0,0 +1,62 @@
+import pytest
+import requests
+
+from notes.helpers.mock_backend import NotesMockBackend
+from notes.helpers.mock_sessions import MockSessions
+from notes.helpers.mock_transport import NotesMockAdapter
+
+BASE_URL = "http://mock-sessions.test/notes/api"
+
+
+def _login(session: requests.Session, email: str) -> dict[str, str]:
+    response = session.post(
+        f"{BASE_URL}/users/login", data={"email": email, "password": "pw"}
+    )
+    return {"x-auth-token": response.json()["data"]["token"]}
+
+
+def _status(session: requests.Session, auth: dict[str, str]) -> int:
+    return session.get(f"{BASE_URL}/users/profile", headers=auth).status_code
+
+
+@pytest.mark.notes
+def test_accounts_have_separate_notes_and_tokens() -> None:
+    backend = NotesMockBackend()
+    session = requests.Session()
+    session.mount(BASE_URL, NotesMockAdapter(backend))
+    alice, bob = (
+        _login(session, "alice@example.com"),
+        _login(session, "bob@example.com"),
+    )
+
+    note = session.post(f"{BASE_URL}/notes", data={"title": "A"}, headers=alice)
+    note_id = note.json()["data"]["id"]
+
+    assert session.get(f"{BASE_URL}/notes/{note_id}", headers=bob).status_code == 404
+    assert session.get(f"{BASE_URL}/notes/{note_id}", headers=alice).ok
+    # Tokens are signed, so another backend (worker) accepts them too
+    other = requests.Session()
+    other.mount(BASE_URL, NotesMockAdapter(NotesMockBackend()))
+    assert _status(other, alice) == 200
+
+
+@pytest.mark.notes
+@pytest.mark.parametrize(
+    ("cross_logout_rate", "other_context"), [(0.0, 200), (1.0, 401)]
+)
+def test_logout_may_end_other_contexts(
+    cross_logout_rate: float, other_context: int
+) -> None:
+    backend = NotesMockBackend(sessions=MockSessions(cross_logout_rate))
+    session = requests.Session()
+    session.mount(BASE_URL, NotesMockAdapter(backend))
+    first = _login(session, "alice@example.com")
+    second = _login(session, "alice@example.com")
+    other_account = _login(session, "bob@example.com")
+
+    assert session.delete(f"{BASE_URL}/users/logout", headers=first).ok
+
+    assert _status(session, first) == 401, "Own session always ends"
+    assert _status(session, second) == other_context
+    assert _status(session, other_account) == 200, "Other accounts are untouched"
+    assert _status(session, _login(session, "alice@example.com")) == 200
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+import requests
+
+from notes.helpers.mock_backend import NotesMockBackend, iter_list_json
+from notes.helpers.mock_sessions import FAKE_TOKEN
+from notes.helpers.mock_transport import NotesMockAdapter
+
+BASE_URL = "http://mock-store.test/notes/api"
+
+
+@pytest.mark.notes
+def test_seeded_account_filters_and_resets() -> None:
+    backend = NotesMockBackend.seeded(2_000, seed=3)
+    session = requests.Session()
+    session.mount(BASE_URL, NotesMockAdapter(backend))
+    session.headers["x-auth-token"] = FAKE_TOKEN
+
+    everything = session.get(f"{BASE_URL}/notes").json()["data"]
+    work_done = session.get(
+        f"{BASE_URL}/notes", params={"category": "Work", "completed": "true"}
+    ).json()["data"]
+
+    assert len(everything) == 2_000, "Seeded account is listed in full"
+    expected = [n for n in everything if n["category"] == "Work" and n["completed"]]
+    assert work_done == expected, "Index filter matches a scan, in list order"
+
+    note_id = everything[0]["id"]
+    session.put(f"{BASE_URL}/notes/{note_id}", data={"title": "Edited"})
+    session.delete(f"{BASE_URL}/notes/{everything[1]['id']}")
+    by_title = session.get(f"{BASE_URL}/notes", params={"title": "Edited"})
+    assert [n["id"] for n in by_title.json()["data"]] == [note_id]
+
+    backend.reset()
+    restored = session.get(f"{BASE_URL}/notes").json()["data"]
+    assert sorted(n["id"] for n in restored) == sorted(n["id"] for n in everything)
+    assert session.get(f"{BASE_URL}/notes", params={"title": "Edited"}).json() == {
+        "success": True,
+        "data": [],
+    }
+
+
+@pytest.mark.notes
+@pytest.mark.parametrize("count", [0, 1, 700])
+def test_streamed_list_matches_json_dumps(count: int) -> None:
+    notes = [{"id": f"{i:012x}", "title": f"Note {i}"} for i in range(count)]
+
+    streamed = b"".join(iter_list_json(notes, chunk_size=1024))
+
+    assert streamed == json.dumps({"success": True, "data": notes}).encode()
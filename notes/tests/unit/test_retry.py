@@ -0,0 +1,70 @@
+from pathlib import Path
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from notes.helpers import retry
+from notes.helpers.api_client import ApiClient
+
+URL = "https://practice.expandtesting.com/notes/api"
+
+
+@pytest.mark.notes
+def test_open_circuits_stay_in_their_run_and_transport(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(retry, "_breakers", {})
+    monkeypatch.setattr(retry, "_state_dir", None)
+    monkeypatch.setattr(retry, "_scope", "live")
+
+    retry.set_circuit_state_dir(tmp_path / "run-1", scope="live")
+    live = retry.circuit_breaker_for(URL)
+    for _ in range(live.failure_threshold):
+        live.record_failure()
+    retry.set_circuit_state_dir(tmp_path / "run-1", scope="offline")
+    offline = retry.circuit_breaker_for(URL)
+
+    assert not live.allow()
+    assert offline.allow(), "The offline mock has a breaker of its own"
+    assert offline.name == "practice.expandtesting.com (offline)"
+
+    monkeypatch.setattr(retry, "_breakers", {})
+    retry.set_circuit_state_dir(tmp_path / "run-2", scope="live")
+    assert retry.circuit_breaker_for(URL).allow(), "A new run starts closed"
+
+
+class _Throttled(BaseAdapter):
+    def send(self, request, **kwargs) -> requests.Response:  # type: ignore[override]
+        response = requests.Response()
+        response.status_code = 429
+        response.request = request
+        response.url = request.url or ""
+        response._content = b""
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.mark.notes
+def test_throttling_neither_closes_nor_resets_the_circuit() -> None:
+    breaker = retry.CircuitBreaker("throttled", failure_threshold=2, reset_timeout=0)
+    session = requests.Session()
+    session.mount("http://", _Throttled())
+    api_client = ApiClient(
+        "http://throttled.test/notes/api",
+        session=session,
+        retry_policy=retry.RetryPolicy(max_attempts=1),
+        circuit_breaker=breaker,
+    )
+
+    breaker.record_failure()
+    with pytest.raises(requests.HTTPError):
+        api_client.get_all_notes()
+    assert breaker.record_failure(), "The 429 kept the failure count"
+
+    with pytest.raises(requests.HTTPError):
+        api_client.get_all_notes()  # The half-open trial
+    assert breaker.state == retry.HALF_OPEN, "A 429 does not close the circuit"
+    assert breaker.allow(), "The next trial may go"
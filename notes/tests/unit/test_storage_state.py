@@ -0,0 +1,126 @@
+import base64
+import json
+import time
+from http.cookiejar import Cookie
+from pathlib import Path
+
+import pytest
+
+from notes.helpers.storage_state import (
+    AuthGeneration,
+    StorageStateCheck,
+    has_expired,
+    storage_state_for_token,
+    write_storage_state,
+)
+
+ORIGIN = "https://practice.expandtesting.com"
+
+
+def _jwt(exp: float) -> str:
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode())
+    return f"e30.{payload.decode().rstrip('=')}.sig"
+
+
+def _state(path: Path, token: str, cookie_expires: float = -1) -> Path:
+    path.write_text(
+        json.dumps(
+            {
+                "cookies": [
+                    {
+                        "name": "session",
+                        "value": "s",
+                        "domain": ".expandtesting.com",
+                        "expires": cookie_expires,
+                    }
+                ],
+                "origins": [
+                    {
+                        "origin": ORIGIN,
+                        "localStorage": [{"name": "token", "value": token}],
+                    }
+                ],
+            }
+        )
+    )
+    return path
+
+
+@pytest.mark.notes
+def test_storage_state_check_probes_once_and_shares_the_verdict(
+    tmp_path: Path,
+) -> None:
+    probed: list[str] = []
+
+    def probe(token: str) -> bool | None:
+        probed.append(token)
+        return {"good": True, "revoked": False}.get(token)
+
+    check = StorageStateCheck(ORIGIN, probe, ttl=60)
+    other_worker = StorageStateCheck(ORIGIN, probe, ttl=60)
+    state = _state(tmp_path / "storage_state_p1.json", "good")
+
+    assert check.check(state) is True
+    assert other_worker.check(state) is True, "Cached for every worker"
+    assert probed == ["good"]
+
+    _state(state, "revoked-token")
+    assert check.check(state) is None, "A rewritten state is probed again"
+    _state(state, "revoked")
+    assert check.check(state) is False
+
+    hour_ago = time.time() - 3600
+    assert check.check(_state(state, _jwt(hour_ago))) is False
+    assert check.check(_state(state, "good", cookie_expires=hour_ago)) is False
+    assert probed == ["good", "revoked-token", "revoked"], "Expiry needs no probe"
+    state.write_text(json.dumps({"cookies": [], "origins": []}))
+    assert check.check(state) is None, "No token: the browser has to tell"
+
+
+@pytest.mark.notes
+def test_jwt_expiry_reads_unpadded_payloads_of_any_length(tmp_path: Path) -> None:
+    # Unpadded payload lengths of 2, 3 and 0 modulo 4
+    for exp in (1, 12, 123):
+        path = _state(tmp_path / "storage_state_p1.json", _jwt(exp))
+        state = json.loads(path.read_text())
+        assert has_expired(state, ORIGIN, now=1000), f"exp={exp}"
+        assert not has_expired(state, ORIGIN, now=0), f"exp={exp}"
+
+
+@pytest.mark.notes
+def test_auth_generation_is_shared_through_the_file(tmp_path: Path) -> None:
+    path = tmp_path / "auth_generation_p1.txt"
+    worker, other_worker = AuthGeneration(path), AuthGeneration(path)
+    seen = worker.current()
+
+    other_worker.bump()
+
+    assert seen == 0, "No file yet: the first generation"
+    assert worker.current() == 1 != seen, "A bump elsewhere moves it here"
+    assert worker.bump() == 2
+
+
+@pytest.mark.notes
+def test_state_minted_from_an_api_token_passes_the_check(tmp_path: Path) -> None:
+    cookie = Cookie(
+        0, "sid", "abc", None, False, ".expandtesting.com", True, True, "/", True,
+        True, None, False, None, None, {"HttpOnly": ""},
+    )  # fmt: skip
+    path = tmp_path / "storage_state_p1.json"
+
+    write_storage_state(path, storage_state_for_token(ORIGIN, "t0ken", [cookie]))
+    state = json.loads(path.read_text())
+
+    assert state["cookies"] == [
+        {
+            "name": "sid",
+            "value": "abc",
+            "domain": ".expandtesting.com",
+            "path": "/",
+            "expires": -1,
+            "httpOnly": True,
+            "secure": True,
+            "sameSite": "Lax",
+        }
+    ], "Session cookie in Playwright's shape"
+    assert StorageStateCheck(ORIGIN, lambda token: token == "t0ken").check(path)
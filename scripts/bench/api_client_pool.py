@@ -0,0 +1,56 @@
+"""Compare per-call connections with the pooled ApiClient session.
+
+Runs against the offline Notes mock served over loopback HTTP, so the numbers
+include real TCP connects (but no TLS, which widens the gap against the live
+site further).
+
+Usage: python -m scripts.bench.api_client_pool [--requests 2000] [--threads 8]
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from notes.helpers.api_client import ApiClient
+from notes.helpers.mock_server import MockNotesServer
+
+
+def _run(call, total: int, threads: int) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for _ in pool.map(lambda _: call(), range(total)):
+            pass
+    return total / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    with MockNotesServer() as server:
+        client = ApiClient(server.base_url, pool_maxsize=args.threads)
+        client.login_user("bench@example.com", "bench")
+        note_id = client.create_note("bench", "bench")["data"]["id"]
+        url = f"{server.base_url}/notes/{note_id}"
+        headers = {"x-auth-token": client.token or ""}
+
+        def unpooled() -> None:
+            requests.request("GET", url, headers=headers, timeout=20).raise_for_status()
+
+        def pooled() -> None:
+            client.get_note_by_id(note_id)
+
+        before = _run(unpooled, args.requests, args.threads)
+        after = _run(pooled, args.requests, args.threads)
+        client.close()
+
+    print(f"requests.request per call: {before:8.1f} req/s")
+    print(f"pooled ApiClient session:  {after:8.1f} req/s ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
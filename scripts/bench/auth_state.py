@@ -0,0 +1,175 @@
+"""Compare ways of producing a logged-in storage state, against the live apps.
+
+For each app and strategy, mints a fresh state ``--repeats`` times and then
+checks that a browser context loaded with it is logged in:
+
+- Notes ``ui``: the login form, as ``NOTES_AUTH=ui`` does.
+- Notes ``api``: ``ApiClient.login_user`` and ``storage_state_for_token``.
+- Bookstore ``ui``: ``login_via_ui``.
+- Bookstore ``api``: ``login_via_form``, a form POST through a request context.
+
+Reports the median and slowest wall time to produce a state (the check is
+not timed) and how many states were valid. Needs network access, Chromium
+for Playwright and test users in TEST_USERS_JSON or
+shared/test_data/test_users.json.
+
+Usage: python -m scripts.bench.auth_state [--repeats 5] [--profile profile1]
+    [--app all|notes|bookstore]
+"""
+
+import argparse
+import functools
+import json
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from playwright.sync_api import Browser, Playwright, sync_playwright
+
+from bookstore.helpers.auth import login_via_form, login_via_ui
+from bookstore.pages.profile_page import ProfilePage
+from config import BASE_URL, BASE_URL_API
+from notes.helpers.api_client import ApiClient
+from notes.helpers.storage_state import storage_state_for_token, write_storage_state
+from notes.pages.home_page import HomePage
+from notes.pages.login_page import LoginPage as NotesLoginPage
+
+TEST_USERS_FILE = Path("shared/test_data/test_users.json")
+
+Mint = Callable[[Path], None]
+
+
+def _users() -> dict:
+    raw = os.getenv("TEST_USERS_JSON")
+    return json.loads(raw) if raw else json.loads(TEST_USERS_FILE.read_text())
+
+
+def _notes_ui(browser: Browser, user: dict) -> Mint:
+    def mint(path: Path) -> None:
+        page = browser.new_page()
+        login_page = NotesLoginPage(page)
+        login_page.load()
+        login_page.login(user["email"], user["password"])
+        page.wait_for_url(f"**{HomePage.URL}**", timeout=10_000)
+        page.context.storage_state(path=path)
+        page.close()
+
+    return mint
+
+
+def _notes_api(user: dict) -> Mint:
+    def mint(path: Path) -> None:
+        with ApiClient(BASE_URL_API) as api_client:
+            api_client.login_user(email=user["email"], password=user["password"])
+            state = storage_state_for_token(
+                BASE_URL, api_client.token or "", api_client.session.cookies
+            )
+        write_storage_state(path, state)
+
+    return mint
+
+
+def _notes_valid(browser: Browser, path: Path) -> bool:
+    context = browser.new_context(storage_state=path)
+    try:
+        home_page = HomePage(context.new_page())
+        home_page.load()
+        home_page.logout_button.wait_for(state="visible", timeout=10_000)
+    except Exception:
+        return False
+    finally:
+        context.close()
+    return True
+
+
+def _bookstore_valid(browser: Browser, path: Path) -> bool:
+    context = browser.new_context(storage_state=path)
+    try:
+        profile_page = ProfilePage(context.new_page())
+        profile_page.load()
+        return profile_page.is_logged_in()
+    except Exception:
+        return False
+    finally:
+        context.close()
+
+
+def _run(
+    label: str,
+    mint: Mint,
+    valid: Callable[[Path], bool],
+    repeats: int,
+    directory: Path,
+) -> None:
+    timings = []
+    ok = 0
+    for n in range(repeats):
+        path = directory / f"{label.replace(' ', '_')}_{n}.json"
+        started = time.perf_counter()
+        try:
+            mint(path)
+        except Exception as exc:
+            print(f"  {label}: {type(exc).__name__}: {exc}")
+            continue
+        timings.append(time.perf_counter() - started)
+        ok += valid(path)
+    if not timings:
+        print(f"  {label:<16} {'failed':>8}")
+        return
+    print(
+        f"  {label:<16} {statistics.median(timings):7.2f}s {max(timings):7.2f}s"
+        f" {ok:>4}/{repeats}"
+    )
+
+
+def _bench(playwright: Playwright, args: argparse.Namespace, user: dict) -> None:
+    browser = playwright.chromium.launch()
+    print(f"  {'':<16} {'median':>8} {'max':>8} {'valid':>6}")
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        if args.app in ("all", "notes"):
+            notes_valid = functools.partial(_notes_valid, browser)
+            _run(
+                "notes ui",
+                _notes_ui(browser, user),
+                notes_valid,
+                args.repeats,
+                directory,
+            )
+            _run("notes api", _notes_api(user), notes_valid, args.repeats, directory)
+        if args.app in ("all", "bookstore"):
+            email, password = user["email"], user["password"]
+            bookstore_valid = functools.partial(_bookstore_valid, browser)
+            _run(
+                "bookstore ui",
+                lambda path: login_via_ui(browser, path, email, password),
+                bookstore_valid,
+                args.repeats,
+                directory,
+            )
+            _run(
+                "bookstore api",
+                lambda path: login_via_form(playwright, path, email, password),
+                bookstore_valid,
+                args.repeats,
+                directory,
+            )
+    browser.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--profile", default="profile1")
+    parser.add_argument("--app", choices=("all", "notes", "bookstore"), default="all")
+    args = parser.parse_args()
+    user = _users()[args.profile]
+    with sync_playwright() as playwright:
+        _bench(playwright, args, user)
+
+
+if __name__ == "__main__":
+    main()
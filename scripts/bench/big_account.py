@@ -0,0 +1,106 @@
+"""Measure the offline Notes mock against big seeded accounts.
+
+For each account size: server-side cost of answering ``GET /notes`` with the
+previous whole-string ``json.dumps`` versus the streaming encoder (time and
+peak memory), a category+completed filter via the store indexes versus a full
+scan, the per-test ``reset`` that restores the seeded baseline, and an
+end-to-end ``ApiClient.get_all_notes`` / ``iter_all_notes`` through
+``NotesMockAdapter``.
+
+Usage: python -m scripts.bench.big_account [--sizes 10000 100000]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from config import BASE_URL_API
+from notes.helpers.api_client import ApiClient, build_session
+from notes.helpers.mock_backend import NotesMockBackend
+from notes.helpers.mock_sessions import FAKE_TOKEN
+from notes.helpers.mock_transport import NotesMockAdapter
+from notes.helpers.retry import NO_RETRY, CircuitBreaker
+
+
+def _measure(run: Callable[[], object]) -> tuple[float, float]:
+    # Time without tracemalloc, which slows allocation-heavy code a lot
+    started = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def _report(name: str, run: Callable[[], object]) -> None:
+    elapsed, peak = _measure(run)
+    print(f"  {name:<34} {elapsed * 1000:8.1f} ms  peak {peak / 1e6:7.1f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        started = time.perf_counter()
+        backend = NotesMockBackend.seeded(size)
+        seeded = time.perf_counter() - started
+        store = backend.store
+        print(f"\n{size} notes (seeded in {seeded * 1000:.0f} ms)")
+        headers = {"x-auth-token": FAKE_TOKEN}
+        query = {"category": "Work", "completed": "true"}
+
+        def whole_string() -> int:
+            notes = store.select()
+            return len(json.dumps({"success": True, "data": notes}))
+
+        def streamed() -> int:
+            _, _, chunks = backend.handle("GET", "/notes", headers, None)
+            return sum(len(chunk) for chunk in chunks)
+
+        _report("list: json.dumps (previous)", whole_string)
+        _report("list: streaming encoder", streamed)
+        _report(
+            "filter: full scan",
+            lambda: [
+                n
+                for n in store.select()
+                if n["category"] == "Work" and n["completed"] is True
+            ],
+        )
+        _report(
+            "filter: indexes", lambda: store.select(category="Work", completed=True)
+        )
+        _report(
+            "filtered list response",
+            lambda: sum(
+                len(chunk)
+                for chunk in backend.handle("GET", "/notes", headers, None, query)[2]
+            ),
+        )
+        _report("reset to seeded baseline", store.reset)
+
+        adapter = NotesMockAdapter(backend)
+        session = build_session()
+        session.mount(BASE_URL_API, adapter)
+        client = ApiClient(
+            BASE_URL_API,
+            session=session,
+            retry_policy=NO_RETRY,
+            circuit_breaker=CircuitBreaker("bench"),
+        )
+        client.token = FAKE_TOKEN
+        _report("ApiClient.get_all_notes", client.get_all_notes)
+        _report(
+            "ApiClient.iter_all_notes", lambda: sum(1 for _ in client.iter_all_notes())
+        )
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
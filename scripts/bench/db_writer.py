@@ -0,0 +1,139 @@
+"""Measure results-DB insert throughput with many concurrent writers.
+
+Runs ``--workers`` processes that each log ``--rows`` test results, the way
+xdist workers do, three ways:
+
+- ``connect per row (previous)``: open, insert, commit, close per row, with
+  the old sleep-retry on "database is locked" and rows dropped on any other
+  error.
+- ``DbWriter per process``: one buffered connection per process.
+- ``controller writes``: processes forward rows over a queue (standing in
+  for the xdist channel) to a single ``DbWriter`` in the parent.
+
+Each mode writes to a fresh database; rows lost to lock errors are reported.
+
+Usage: python -m scripts.bench.db_writer [--workers 16] [--rows 2000]
+"""
+
+import argparse
+import multiprocessing
+import pathlib
+import sqlite3
+import tempfile
+import time
+
+from shared.helpers import db_logger
+
+_ROW = (
+    "bench/test_x.py::test_y",
+    "passed",
+    "chromium",
+    None,
+    "test_y",
+    0,
+    12,
+    "bench",
+    "gw0",
+    3,
+    1,
+)
+
+
+def _connect_per_row(db_path: pathlib.Path, rows: int) -> None:
+    for _ in range(rows):
+        with sqlite3.connect(db_path) as conn:
+            for attempt in range(3):
+                try:
+                    conn.execute(db_logger._INSERTS["test_runs"], _ROW)
+                    conn.commit()
+                    break
+                except sqlite3.OperationalError as e:
+                    if "database is locked" in str(e) and attempt < 2:
+                        time.sleep(0.1)
+                        continue
+                    break
+                except sqlite3.Error:
+                    break
+
+
+def _buffered(db_path: pathlib.Path, rows: int) -> None:
+    writer = db_logger.DbWriter(db_path)
+    for _ in range(rows):
+        writer.add("test_runs", _ROW)
+    writer.close()
+
+
+def _forwarding(queue: "multiprocessing.Queue", rows: int) -> None:
+    forwarder = db_logger.RowForwarder()
+    for _ in range(rows):
+        forwarder.add("test_runs", _ROW)
+    queue.put(forwarder.drain())
+
+
+def _run_processes(target, args_for, workers: int) -> list:
+    processes = [
+        multiprocessing.Process(target=target, args=args_for(n)) for n in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    return processes
+
+
+def _measure(name: str, db_path: pathlib.Path, expected: int, run) -> None:
+    started = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - started
+    with sqlite3.connect(db_path) as conn:
+        written = conn.execute("SELECT COUNT(*) FROM test_runs").fetchone()[0]
+    print(
+        f"  {name:<28} {elapsed:7.2f}s  {written / elapsed:9.0f} rows/s  "
+        f"lost {expected - written}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+    expected = args.workers * args.rows
+    print(f"{args.workers} processes x {args.rows} rows\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("connect per row (previous)", "DbWriter per process"):
+            db_path = pathlib.Path(tmp) / f"{name.split()[0]}.db"
+            db_logger.DB_PATH = db_path
+            db_logger.init_db()
+            target = _connect_per_row if name.startswith("connect") else _buffered
+
+            def run(target=target, db_path=db_path) -> None:
+                processes = _run_processes(
+                    target, lambda n: (db_path, args.rows), args.workers
+                )
+                for process in processes:
+                    process.join()
+
+            _measure(name, db_path, expected, run)
+
+        db_path = pathlib.Path(tmp) / "controller.db"
+        db_logger.DB_PATH = db_path
+        db_logger.init_db()
+
+        def run_controller() -> None:
+            queue: multiprocessing.Queue = multiprocessing.Queue()
+            processes = _run_processes(
+                _forwarding, lambda n: (queue, args.rows), args.workers
+            )
+            writer = db_logger.DbWriter(db_path)
+            for _ in processes:
+                for table, rows in queue.get().items():
+                    writer.add_many(table, rows)
+            for process in processes:
+                process.join()
+            writer.close()
+
+        _measure("controller writes", db_path, expected, run_controller)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Compare the old per-test ``responses`` mock with ``NotesMockAdapter``.
+
+Measures (1) fixture setup cost per test: building and activating a
+``responses.RequestsMock`` with its regex routes versus resetting the note
+store, and (2) per-request overhead of ``ApiClient.get_note_by_id`` through
+each transport.
+
+Usage: python -m scripts.bench.offline_transport [--tests 2000] [--requests 5000]
+"""
+
+import argparse
+import re
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import responses  # type: ignore
+
+from config import BASE_URL_API
+from notes.helpers.api_client import ApiClient, build_session
+from notes.helpers.mock_backend import NotesMockBackend, body_bytes
+from notes.helpers.mock_transport import NotesMockAdapter
+from notes.helpers.retry import NO_RETRY, CircuitBreaker
+
+
+@contextmanager
+def _responses_mock() -> Iterator[None]:
+    """The previous ``notes_api_mock`` body, as it ran for every API test."""
+    backend = NotesMockBackend()
+
+    def dispatch(req) -> tuple[int, dict[str, str], bytes]:
+        path = urlsplit(req.url).path.split("/notes/api", 1)[-1]
+        status, headers, content = backend.handle(
+            req.method, path, req.headers, req.body
+        )
+        return status, headers, body_bytes(content)
+
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        routes = (
+            (responses.POST, re.compile(r".*/notes/api/users/login$")),
+            (responses.GET, re.compile(r".*/notes/api/users/profile$")),
+            (responses.POST, re.compile(r".*/notes/api/notes$")),
+            (responses.GET, re.compile(r".*/notes/api/notes$")),
+            (responses.GET, re.compile(r".*/notes/api/notes/([A-Za-z0-9\-]+)$")),
+            (responses.PUT, re.compile(r".*/notes/api/notes/([A-Za-z0-9\-]+)$")),
+            (responses.DELETE, re.compile(r".*/notes/api/notes/([A-Za-z0-9\-]+)$")),
+        )
+        for method, url in routes:
+            rsps.add_callback(
+                method,
+                url,
+                callback=lambda req, **kw: dispatch(req),
+                content_type="application/json",
+            )
+        yield
+
+
+def _per_call_us(call: Callable[[], object], count: int) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        call()
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def _client(session=None) -> ApiClient:
+    # Private breaker and no retries: measure the transport, not the policy
+    client = ApiClient(
+        BASE_URL_API,
+        session=session,
+        retry_policy=NO_RETRY,
+        circuit_breaker=CircuitBreaker("bench"),
+    )
+    client.login_user("bench@example.com", "bench")
+    return client
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tests", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    def responses_setup() -> None:
+        with _responses_mock():
+            pass
+
+    adapter = NotesMockAdapter()
+    old_setup = _per_call_us(responses_setup, args.tests)
+    new_setup = _per_call_us(adapter.backend.reset, args.tests)
+
+    with _responses_mock():
+        client = _client()
+        note_id = client.create_note("bench", "bench")["data"]["id"]
+        old_request = _per_call_us(
+            lambda: client.get_note_by_id(note_id), args.requests
+        )
+
+    session = build_session()
+    session.mount(BASE_URL_API, adapter)
+    client = _client(session)
+    note_id = client.create_note("bench", "bench")["data"]["id"]
+    new_request = _per_call_us(lambda: client.get_note_by_id(note_id), args.requests)
+
+    print(f"{'':24}{'responses':>12}{'adapter':>12}{'speedup':>10}")
+    print(
+        f"{'fixture setup (us/test)':24}{old_setup:>12.1f}{new_setup:>12.1f}"
+        f"{old_setup / new_setup:>9.0f}x"
+    )
+    print(
+        f"{'GET /notes/{id} (us)':24}{old_request:>12.1f}{new_request:>12.1f}"
+        f"{old_request / new_request:>9.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Measure parse + normalize cost of large ``GET /notes`` payloads.
+
+Compares the previous copy-per-note normalization with in-place, lazy
+(``LazyNoteList``) and streaming (``iter_notes``) modes. Peak memory is what
+each mode allocates on top of the raw response bytes (tracemalloc).
+
+Usage: python -m scripts.bench.payload_normalization [--sizes 10000 100000]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from notes.helpers.api_client import PayloadNormalizer
+from notes.helpers.lazy_payload import STREAM_CHUNK_SIZE, iter_notes
+
+
+def _make_body(count: int) -> bytes:
+    notes = [
+        {
+            "id": f"{i:024x}",
+            "title": f"Bench note {i}",
+            "description": f"Benchmark description for note number {i}",
+            "category": "Home" if i % 2 else "Work",
+            "completed": "true" if i % 3 else "false",
+            "created_at": "2025-01-01T00:00:00.000Z",
+            "updated_at": "2025-01-01T00:00:00.000Z",
+            "user_id": "0" * 24,
+        }
+        for i in range(count)
+    ]
+    return json.dumps({"success": True, "message": "ok", "data": notes}).encode()
+
+
+def _copying(body: bytes) -> int:
+    normalizer = PayloadNormalizer()
+    payload = json.loads(body)
+    normalized = []
+    for note in payload["data"]:
+        copy = dict(note)
+        copy["completed"] = normalizer._coerce_completed(copy["completed"])
+        normalized.append(copy)
+    payload["data"] = normalized
+    return sum(note["completed"] for note in payload["data"])
+
+
+def _in_place(body: bytes) -> int:
+    payload = PayloadNormalizer()._normalize_payload(json.loads(body))
+    return sum(note["completed"] for note in payload["data"])
+
+
+def _lazy(body: bytes) -> int:
+    normalizer = PayloadNormalizer()
+    normalizer.lazy_lists = True
+    payload = normalizer._normalize_payload(json.loads(body))
+    return sum(note["completed"] for note in payload["data"])
+
+
+def _streaming(body: bytes) -> int:
+    chunks = (
+        body[i : i + STREAM_CHUNK_SIZE] for i in range(0, len(body), STREAM_CHUNK_SIZE)
+    )
+    normalizer = PayloadNormalizer()
+    return sum(
+        note["completed"] for note in iter_notes(chunks, normalizer._normalize_resource)
+    )
+
+
+MODES: dict[str, Callable[[bytes], int]] = {
+    "copy per note (previous)": _copying,
+    "in place": _in_place,
+    "lazy view": _lazy,
+    "streaming": _streaming,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        body = _make_body(size)
+        print(f"\n{size} notes ({len(body) / 1e6:.1f} MB body)")
+        for name, run in MODES.items():
+            # Time without tracemalloc, which slows allocation-heavy code a lot
+            started = time.perf_counter()
+            run(body)
+            elapsed = time.perf_counter() - started
+            tracemalloc.start()
+            run(body)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"  {name:<26} {elapsed * 1000:8.1f} ms  peak {peak / 1e6:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
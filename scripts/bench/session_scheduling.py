@@ -0,0 +1,208 @@
+"""Compare ways of scheduling logout (``seq_only``) tests, offline.
+
+Simulates a suite of note CRUD tests plus a share of tests that log out,
+against the in-process Notes mock with cross-context logout enabled
+(``MockSessions.cross_logout_rate``). CRUD tests reuse one cached token per
+account, as ``api_client_auth`` does; logout tests log in for themselves, as
+``isolated_auth`` ones do. Strategies:
+
+- ``serial``: everything on one worker, re-login on 401.
+- ``sequential leg``: today's CI. CRUD tests in parallel on one account, and
+  logout tests one by one on a second account at the same time.
+- ``parallel, shared account``: everything in parallel on one account.
+- ``parallel, re-login on 401``: the same, but a rejected cached token is
+  refreshed once, as ``TokenCache.refresh`` does.
+- ``parallel, account per logout``: logout tests each get their own account.
+
+Reports wall time, failed tests, re-logins and cross-context logouts.
+
+Usage: python -m scripts.bench.session_scheduling [--tests 300] [--workers 8]
+    [--logout-share 0.1] [--cross-logout 0.3] [--profile lan] [--seed 0]
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import requests
+
+from config import BASE_URL_API
+from notes.helpers.api_client import ApiClient, build_session
+from notes.helpers.mock_backend import NotesMockBackend
+from notes.helpers.mock_faults import PROFILES, injector_for
+from notes.helpers.mock_sessions import MockSessions
+from notes.helpers.mock_transport import NotesMockAdapter
+from notes.helpers.retry import NO_RETRY, CircuitBreaker
+
+SHARED_ACCOUNT = "profile1@example.com"
+SEQUENTIAL_ACCOUNT = "profile2@example.com"
+PASSWORD = "offline"
+
+
+@dataclass(frozen=True, slots=True)
+class _Test:
+    number: int
+    logs_out: bool
+
+
+@dataclass
+class _Outcome:
+    failed: int = 0
+    relogins: int = 0
+
+
+class _Env:
+    """One mock backend, a pooled session to it and a shared token per account."""
+
+    def __init__(self, args: argparse.Namespace, relogin: bool) -> None:
+        self.backend = NotesMockBackend(
+            faults=injector_for(args.profile, args.seed),
+            sessions=MockSessions(args.cross_logout, args.seed),
+        )
+        self.session = build_session(pool_maxsize=args.workers)
+        self.session.mount(BASE_URL_API, NotesMockAdapter(self.backend))
+        self.breaker = CircuitBreaker("bench", failure_threshold=sys.maxsize)
+        self.relogin = relogin
+        self.outcome = _Outcome()
+        self._tokens: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def client(self) -> ApiClient:
+        return ApiClient(
+            BASE_URL_API,
+            session=self.session,
+            retry_policy=NO_RETRY,
+            circuit_breaker=self.breaker,
+        )
+
+    def _login(self, account: str) -> str:
+        client = self.client()
+        client.login_user(email=account, password=PASSWORD)
+        return client.token or ""
+
+    def cached_token(self, account: str) -> str:
+        with self._lock:
+            if account not in self._tokens:
+                self._tokens[account] = self._login(account)
+            return self._tokens[account]
+
+    def refresh(self, account: str, stale: str) -> str | None:
+        if not self.relogin:
+            return None
+        with self._lock:
+            if self._tokens.get(account) == stale:
+                self._tokens[account] = self._login(account)
+                self.outcome.relogins += 1
+            return self._tokens[account]
+
+    def run(self, test: _Test, account: str) -> None:
+        client = self.client()
+        if test.logs_out:
+            client.login_user(email=account, password=PASSWORD)
+        else:
+            client.token = self.cached_token(account)
+            client.on_unauthorized = lambda stale: self.refresh(account, stale)
+        try:
+            note_id = client.create_note(f"Bench {test.number}", "body")["data"]["id"]
+            client.get_note_by_id(note_id)
+            client.update_note(note_id, f"Bench {test.number} v2", "body", True)
+            client.delete_note(note_id)
+            if test.logs_out:
+                client.logout_user()
+        except requests.exceptions.HTTPError:
+            with self._lock:
+                self.outcome.failed += 1
+
+
+def _parallel(
+    env: _Env, tests: list[_Test], workers: int, account_for: Callable[[_Test], str]
+) -> None:
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(lambda test: env.run(test, account_for(test)), tests))
+
+
+def _serial(env: _Env, tests: list[_Test], args: argparse.Namespace) -> None:
+    for test in tests:
+        env.run(test, SHARED_ACCOUNT)
+
+
+def _sequential_leg(env: _Env, tests: list[_Test], args: argparse.Namespace) -> None:
+    crud = [test for test in tests if not test.logs_out]
+    logouts = [test for test in tests if test.logs_out]
+
+    def run_leg() -> None:
+        for test in logouts:
+            env.run(test, SEQUENTIAL_ACCOUNT)
+
+    leg = threading.Thread(target=run_leg)
+    leg.start()
+    _parallel(env, crud, args.workers, lambda test: SHARED_ACCOUNT)
+    leg.join()
+
+
+def _shared_account(env: _Env, tests: list[_Test], args: argparse.Namespace) -> None:
+    _parallel(env, tests, args.workers, lambda test: SHARED_ACCOUNT)
+
+
+def _account_per_logout(
+    env: _Env, tests: list[_Test], args: argparse.Namespace
+) -> None:
+    _parallel(
+        env,
+        tests,
+        args.workers,
+        lambda test: (
+            f"logout-{test.number}@example.com" if test.logs_out else SHARED_ACCOUNT
+        ),
+    )
+
+
+STRATEGIES: dict[str, tuple[Callable, bool]] = {
+    "serial": (_serial, True),
+    "sequential leg": (_sequential_leg, False),
+    "parallel, shared account": (_shared_account, False),
+    "parallel, re-login on 401": (_shared_account, True),
+    "parallel, account per logout": (_account_per_logout, False),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tests", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--logout-share", type=float, default=0.1)
+    parser.add_argument("--cross-logout", type=float, default=0.3)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="lan")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tests = [_Test(n, rng.random() < args.logout_share) for n in range(args.tests)]
+    logouts = sum(test.logs_out for test in tests)
+    print(
+        f"{args.tests} tests ({logouts} log out), {args.workers} workers, "
+        f"cross-logout {args.cross_logout:.0%}, profile {args.profile}\n"
+    )
+    print(
+        f"  {'strategy':<30} {'wall':>8} {'failed':>7} {'re-logins':>10} {'cross':>6}"
+    )
+    for name, (strategy, relogin) in STRATEGIES.items():
+        env = _Env(args, relogin)
+        started = time.perf_counter()
+        strategy(env, tests, args)
+        elapsed = time.perf_counter() - started
+        env.session.close()
+        outcome = env.outcome
+        print(
+            f"  {name:<30} {elapsed:7.2f}s {outcome.failed:>7} "
+            f"{outcome.relogins:>10} {env.backend.sessions.cross_logouts:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Compare ways of splitting a suite across N CI jobs, by simulated wall time.
+
+Builds a synthetic suite with log-normal durations, a few long e2e journeys
+and a group of tests sharing a login fixture (each job that runs any of them
+pays the login once), then splits it:
+
+- ``by count``: contiguous slices of the sorted nodeids, equal test counts.
+- ``time-balanced``: ``--shard=i/N``, i.e. ``plan_units`` + ``lpt_partition``
+  over estimates from a history with the same medians.
+
+Reports the longest job (the wall time) and the speed-up over one job.
+
+Usage: python -m scripts.bench.sharding [--tests 400] [--seed 0]
+"""
+
+import argparse
+import random
+
+from shared.plugins.xdist_schedule import History, lpt_partition, plan_units
+
+LOGIN_S = 8.0
+
+
+def _suite(tests: int, seed: int) -> tuple[dict[str, float], dict[str, str]]:
+    rng = random.Random(seed)
+    durations = {}
+    groups = {}
+    for n in range(tests):
+        module = n // 10
+        nodeid = f"tests/test_m{module:03d}.py::test_{n}"
+        durations[nodeid] = rng.lognormvariate(0, 1)
+        if module % 8 == 0:
+            groups[nodeid] = "notes_auth_state"
+    for n in range(4):
+        durations[f"tests/test_journeys.py::test_journey_{n}"] = rng.uniform(60, 120)
+    return durations, groups
+
+
+def _wall(jobs: list[list[str]], durations: dict[str, float], groups) -> float:
+    walls = []
+    for nodeids in jobs:
+        login = LOGIN_S if any(nodeid in groups for nodeid in nodeids) else 0.0
+        walls.append(login + sum(durations[nodeid] for nodeid in nodeids))
+    return max(walls)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tests", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    durations, groups = _suite(args.tests, args.seed)
+    history = {
+        nodeid: History(seconds, LOGIN_S if nodeid in groups else 0.0)
+        for nodeid, seconds in durations.items()
+    }
+    nodeids = sorted(durations)
+    single = _wall([nodeids], durations, groups)
+    print(f"{len(nodeids)} tests, {single:.0f}s on one job\n")
+    print(f"  {'jobs':>4} {'by count':>16} {'time-balanced':>18}")
+    for jobs in (1, 2, 4, 8, 16):
+        size = -(-len(nodeids) // jobs)
+        by_count = [nodeids[n : n + size] for n in range(0, len(nodeids), size)]
+        partition = lpt_partition(plan_units(durations, groups, history, jobs), jobs)
+        balanced = [[n for unit in part for n in unit.nodeids] for part in partition]
+        count_wall = _wall(by_count, durations, groups)
+        balanced_wall = _wall(balanced, durations, groups)
+        print(
+            f"  {jobs:>4} {count_wall:8.0f}s x{single / count_wall:4.1f}"
+            f"  {balanced_wall:10.0f}s x{single / balanced_wall:4.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""Report flaky and slow tests from the results DB history.
+
+``refresh`` folds the ``test_runs`` rows added since the previous refresh
+into materialized aggregates (``agg_tests``, ``agg_durations``), so a report
+costs about the same on a DB of a thousand rows or of millions. Aggregates
+are kept per nodeid, browser and user profile (from ``runs``) and rolled up
+on demand:
+
+- flake rate: share of consecutive decided runs (passed or failed, in row
+  order) whose outcome differs from the previous one
+- fail rate: failed / decided runs
+- p50/p95: call-phase duration from a histogram with buckets ~5% wide,
+  reported as the bucket's upper bound; max is exact
+
+Usage:
+    python -m shared.analytics
+    python -m shared.analytics --by none --sort p95 --limit 10
+    python -m shared.analytics --db /tmp/run123.db --min-runs 5 --rebuild
+"""
+
+import argparse
+import math
+import pathlib
+import sqlite3
+import sys
+from collections.abc import Sequence
+from contextlib import closing
+
+from shared.helpers.db_logger import DB_PATH, init_db
+
+# Histogram resolution: buckets per factor of e, i.e. ~5% wide
+BUCKETS_PER_E = 20
+# Which of browser and profile a report keeps apart, besides the nodeid
+BREAKDOWNS: dict[str, tuple[str, ...]] = {
+    "all": ("browser", "profile"),
+    "browser": ("browser",),
+    "profile": ("profile",),
+    "none": (),
+}
+SORT_KEYS = ("flake", "fail", "p95", "max")
+
+_STATE_NAME = "test_runs"
+
+_NEW_ROWS = """
+    CREATE TEMP TABLE new_rows AS
+    SELECT
+        t.id,
+        COALESCE(t.nodeid, '') AS nodeid,
+        COALESCE(t.browser, '') AS browser,
+        COALESCE(r.profile, '') AS profile,
+        t.outcome,
+        t.duration_ms,
+        t.outcome IN ('passed', 'failed') AS decided
+    FROM test_runs AS t
+    LEFT JOIN runs AS r ON r.run_id = t.run_id
+    WHERE t.id > ? AND t.id <= ?
+"""
+
+# The first decided row of a series in this batch is compared with the last
+# decided outcome already folded in, so transitions span refreshes
+_FOLD_TESTS = """
+    WITH marked AS (
+        SELECT
+            n.*,
+            COALESCE(
+                LAG(n.outcome) OVER (
+                    PARTITION BY n.nodeid, n.browser, n.profile, n.decided
+                    ORDER BY n.id
+                ),
+                a.last_outcome
+            ) AS previous
+        FROM temp.new_rows AS n
+        LEFT JOIN agg_tests AS a USING (nodeid, browser, profile)
+    ),
+    latest AS (
+        -- Bare column: the outcome of the row holding MAX(id)
+        SELECT nodeid, browser, profile, outcome, MAX(id)
+        FROM marked
+        WHERE decided
+        GROUP BY nodeid, browser, profile
+    )
+    INSERT INTO agg_tests (
+        nodeid, browser, profile, runs, passed, failed, skipped,
+        transitions, last_outcome, max_ms
+    )
+    SELECT
+        m.nodeid,
+        m.browser,
+        m.profile,
+        COUNT(*),
+        SUM(m.outcome = 'passed'),
+        SUM(m.outcome = 'failed'),
+        SUM(NOT m.decided),
+        COALESCE(SUM(m.decided AND m.previous != m.outcome), 0),
+        l.outcome,
+        MAX(CASE WHEN m.decided THEN m.duration_ms END)
+    FROM marked AS m
+    LEFT JOIN latest AS l USING (nodeid, browser, profile)
+    WHERE true  -- Keeps ON CONFLICT from parsing as a join constraint
+    GROUP BY m.nodeid, m.browser, m.profile
+    ON CONFLICT (nodeid, browser, profile) DO UPDATE SET
+        runs = runs + excluded.runs,
+        passed = passed + excluded.passed,
+        failed = failed + excluded.failed,
+        skipped = skipped + excluded.skipped,
+        transitions = transitions + excluded.transitions,
+        last_outcome = COALESCE(excluded.last_outcome, last_outcome),
+        max_ms = MAX(
+            COALESCE(max_ms, excluded.max_ms), COALESCE(excluded.max_ms, max_ms)
+        )
+"""
+
+_FOLD_DURATIONS = """
+    INSERT INTO agg_durations (nodeid, browser, profile, bucket, count)
+    SELECT nodeid, browser, profile, duration_bucket(duration_ms), COUNT(*)
+    FROM temp.new_rows
+    WHERE decided AND duration_ms IS NOT NULL
+    GROUP BY nodeid, browser, profile, duration_bucket(duration_ms)
+    ON CONFLICT (nodeid, browser, profile, bucket) DO UPDATE SET
+        count = count + excluded.count
+"""
+
+# Percentiles of the series this batch touched, recomputed from their
+# histograms; the other series keep theirs
+_FOLD_PERCENTILES = """
+    WITH touched AS (
+        SELECT DISTINCT nodeid, browser, profile FROM temp.new_rows WHERE decided
+    ),
+    percentiles AS ({percentiles})
+    UPDATE agg_tests
+    SET p50_bucket = p.p50, p95_bucket = p.p95
+    FROM percentiles AS p
+    WHERE agg_tests.nodeid = p.nodeid
+        AND agg_tests.browser = p.browser
+        AND agg_tests.profile = p.profile
+"""
+
+# Nearest-rank p50/p95 bucket per {keys}, from a cumulative histogram
+_PERCENTILES = """
+    WITH cumulative AS (
+        SELECT
+            {keys},
+            bucket,
+            SUM(count) OVER series AS running,
+            -- Same window ordering as running, so one sort serves both
+            SUM(count) OVER (
+                series ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+            ) AS total
+        FROM ({histogram})
+        WINDOW series AS (PARTITION BY {keys} ORDER BY bucket)
+    )
+    SELECT
+        {keys},
+        MIN(CASE WHEN running * 100 >= total * 50 THEN bucket END) AS p50,
+        MIN(CASE WHEN running * 100 >= total * 95 THEN bucket END) AS p95
+    FROM cumulative
+    GROUP BY {keys}
+"""
+
+_SERIES_KEYS = "nodeid, browser, profile"
+
+_STATS = """
+    WITH tests AS (
+        SELECT
+            {keys},
+            SUM(runs) AS runs,
+            SUM(passed) AS passed,
+            SUM(failed) AS failed,
+            SUM(skipped) AS skipped,
+            SUM(transitions) AS transitions,
+            SUM(passed + failed > 0) AS series,
+            MAX(max_ms) AS max_ms
+        FROM agg_tests
+        GROUP BY {keys}
+    )
+    SELECT t.*, p.p50 AS p50_bucket, p.p95 AS p95_bucket
+    FROM tests AS t
+    LEFT JOIN ({percentiles}) AS p USING ({keys})
+    WHERE t.runs >= ?
+"""
+
+
+def duration_bucket(ms: float | None) -> int | None:
+    if ms is None:
+        return None
+    return int(math.log1p(max(ms, 0)) * BUCKETS_PER_E)
+
+
+def bucket_upper_ms(bucket: int) -> float:
+    return math.expm1((bucket + 1) / BUCKETS_PER_E)
+
+
+def connect(db_path: pathlib.Path | None = None) -> sqlite3.Connection:
+    """Open the results DB (migrated to the current schema) for analytics."""
+    path = db_path or DB_PATH
+    init_db(path)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.create_function("duration_bucket", 1, duration_bucket, deterministic=True)
+    return conn
+
+
+def _fold(conn: sqlite3.Connection) -> int:
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT last_id FROM agg_state WHERE name = ?", (_STATE_NAME,)
+        ).fetchone()
+        last_id = row[0] if row else 0
+        (high_id,) = conn.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM test_runs"
+        ).fetchone()
+        conn.execute(_NEW_ROWS, (last_id, high_id))
+        (count,) = conn.execute("SELECT COUNT(*) FROM temp.new_rows").fetchone()
+        if count:
+            conn.execute(_FOLD_TESTS)
+            conn.execute(_FOLD_DURATIONS)
+            # CROSS JOIN keeps touched as the outer loop: PK lookups, no scan
+            histogram = (
+                "SELECT d.* FROM touched CROSS JOIN agg_durations AS d "
+                f"USING ({_SERIES_KEYS})"
+            )
+            percentiles = _PERCENTILES.format(keys=_SERIES_KEYS, histogram=histogram)
+            conn.execute(_FOLD_PERCENTILES.format(percentiles=percentiles))
+        conn.execute("DROP TABLE temp.new_rows")
+        conn.execute(
+            """
+            INSERT INTO agg_state (name, last_id) VALUES (?, ?)
+            ON CONFLICT (name) DO UPDATE SET last_id = excluded.last_id
+            """,
+            (_STATE_NAME, max(high_id, last_id)),
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return count
+
+
+def refresh(db_path: pathlib.Path | None = None) -> int:
+    """Fold the rows added since the last refresh; returns how many there were."""
+    with closing(connect(db_path)) as conn:
+        return _fold(conn)
+
+
+def rebuild(db_path: pathlib.Path | None = None) -> int:
+    """Drop the aggregates and fold the whole history again."""
+    with closing(connect(db_path)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        for table in ("agg_tests", "agg_durations", "agg_state"):
+            conn.execute(f"DELETE FROM {table}")
+        conn.execute("COMMIT")
+        return _fold(conn)
+
+
+def stats_by_test(
+    db_path: pathlib.Path | None = None,
+    *,
+    by: Sequence[str] = BREAKDOWNS["all"],
+    min_runs: int = 1,
+) -> list[dict]:
+    """Per-test flakiness and duration from the aggregates, as of the last refresh.
+
+    ``by`` names the columns (``browser``, ``profile``) kept apart besides the
+    nodeid; the others are rolled up.
+    """
+    unknown = set(by) - set(BREAKDOWNS["all"])
+    if unknown:
+        raise ValueError(f"Cannot break results down by {sorted(unknown)}")
+    keys = ", ".join(("nodeid", *by))
+    if set(by) == set(BREAKDOWNS["all"]):
+        # One series per row: read the materialized percentiles
+        percentiles = (
+            f"SELECT {keys}, p50_bucket AS p50, p95_bucket AS p95 FROM agg_tests"
+        )
+    else:
+        # Rolled up: merge the series' histograms first
+        histogram = (
+            f"SELECT {keys}, bucket, SUM(count) AS count "
+            f"FROM agg_durations GROUP BY {keys}, bucket"
+        )
+        percentiles = _PERCENTILES.format(keys=keys, histogram=histogram)
+    query = _STATS.format(keys=keys, percentiles=percentiles)
+    with closing(connect(db_path)) as conn:
+        rows = conn.execute(query, (min_runs,)).fetchall()
+    stats = []
+    for row in rows:
+        item = dict(row)
+        decided = item["passed"] + item["failed"]
+        pairs = decided - item.pop("series")
+        item["flake_rate"] = item["transitions"] / pairs if pairs > 0 else 0.0
+        item["fail_rate"] = item["failed"] / decided if decided else 0.0
+        for name in ("p50", "p95"):
+            bucket = item.pop(f"{name}_bucket")
+            item[f"{name}_ms"] = (
+                None
+                if bucket is None
+                else min(round(bucket_upper_ms(bucket)), item["max_ms"])
+            )
+        stats.append(item)
+    return stats
+
+
+def _sort_value(item: dict, sort: str) -> tuple:
+    primary = {
+        "flake": item["flake_rate"],
+        "fail": item["fail_rate"],
+        "p95": item["p95_ms"] or 0,
+        "max": item["max_ms"] or 0,
+    }[sort]
+    return primary, item["runs"]
+
+
+def format_stats(stats: list[dict], by: Sequence[str]) -> str:
+    header = f"  {'flake':>6} {'fail':>6} {'runs':>6} {'p50':>7} {'p95':>7} {'max':>7}"
+    header += "".join(f" {column:<10}" for column in by) + " nodeid"
+    lines = [header]
+    for item in stats:
+        durations = " ".join(
+            f"{item[name]:>5}ms" if item[name] is not None else f"{'-':>7}"
+            for name in ("p50_ms", "p95_ms", "max_ms")
+        )
+        line = (
+            f"  {item['flake_rate']:>6.1%} {item['fail_rate']:>6.1%} "
+            f"{item['runs']:>6} {durations}"
+        )
+        line += "".join(f" {item[column] or '-':<10}" for column in by)
+        lines.append(f"{line} {item['nodeid']}")
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", type=pathlib.Path, default=DB_PATH)
+    parser.add_argument(
+        "--by",
+        choices=sorted(BREAKDOWNS),
+        default="all",
+        help="keep browsers and/or profiles apart (default: all)",
+    )
+    parser.add_argument("--sort", choices=SORT_KEYS, default="flake")
+    parser.add_argument(
+        "--min-runs", type=int, default=2, help="skip tests with fewer runs"
+    )
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument(
+        "--rebuild", action="store_true", help="recompute aggregates from scratch"
+    )
+    args = parser.parse_args(argv)
+    if not args.db.exists():
+        parser.error(f"{args.db} not found; run pytest first")
+
+    folded = (rebuild if args.rebuild else refresh)(args.db)
+    by = BREAKDOWNS[args.by]
+    stats = stats_by_test(args.db, by=by, min_runs=args.min_runs)
+    stats.sort(key=lambda item: _sort_value(item, args.sort), reverse=True)
+    print(
+        f"Folded {folded} new rows; {len(stats)} tests with >= {args.min_runs} runs\n"
+    )
+    print(format_stats(stats[: args.limit], by))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
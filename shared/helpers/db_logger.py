@@ -1,7 +1,11 @@
+import atexit
 import os
 import pathlib
 import sqlite3
+import subprocess
+import threading
 import time
+from dataclasses import dataclass
 
 DEFAULT_DB_PATH = pathlib.Path("data/test_results.db")
 
@@ -16,25 +20,341 @@ def _resolve_db_path() -> pathlib.Path:
 DB_PATH = _resolve_db_path()
 
 
-def init_db():
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with sqlite3.connect(DB_PATH) as conn:
+# Schema changes, applied in order by init_db. PRAGMA user_version holds how
+# many have been applied; append new steps, never edit released ones. The
+# first step is the schema that predates versioning, so existing DBs adopt it.
+_MIGRATIONS: tuple[tuple[str, ...], ...] = (
+    (
+        """
+        CREATE TABLE IF NOT EXISTS test_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nodeid TEXT,
+            outcome TEXT,
+            start_ts INTEGER,
+            duration_ms INTEGER,
+            browser TEXT,
+            failure_message TEXT,
+            test_name TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS api_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts REAL,
+            nodeid TEXT,
+            event TEXT,
+            method TEXT,
+            url TEXT,
+            attempt INTEGER,
+            status INTEGER,
+            detail TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS api_calls (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts REAL,
+            nodeid TEXT,
+            method TEXT,
+            endpoint TEXT,
+            status INTEGER,
+            bytes INTEGER,
+            connect_ms REAL,
+            ttfb_ms REAL,
+            total_ms REAL,
+            retries INTEGER
+        )
+        """,
+    ),
+    (
+        """
+        CREATE TABLE runs (
+            run_id TEXT PRIMARY KEY,
+            started_ts INTEGER,
+            finished_ts INTEGER,
+            exit_status INTEGER,
+            git_sha TEXT,
+            profile TEXT,
+            browser TEXT,
+            workers INTEGER
+        )
+        """,
+        "ALTER TABLE test_runs ADD COLUMN run_id TEXT",
+        "ALTER TABLE test_runs ADD COLUMN worker_id TEXT",
+        "ALTER TABLE test_runs ADD COLUMN setup_ms INTEGER",
+        "ALTER TABLE test_runs ADD COLUMN teardown_ms INTEGER",
+        "CREATE INDEX idx_test_runs_nodeid_start ON test_runs (nodeid, start_ts)",
+        "CREATE INDEX idx_test_runs_run_id ON test_runs (run_id)",
+    ),
+    (
+        # Materialized by shared.analytics, up to agg_state.last_id
+        """
+        CREATE TABLE agg_state (
+            name TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE agg_tests (
+            nodeid TEXT NOT NULL,
+            browser TEXT NOT NULL,
+            profile TEXT NOT NULL,
+            runs INTEGER NOT NULL,
+            passed INTEGER NOT NULL,
+            failed INTEGER NOT NULL,
+            skipped INTEGER NOT NULL,
+            transitions INTEGER NOT NULL,
+            last_outcome TEXT,
+            max_ms INTEGER,
+            p50_bucket INTEGER,
+            p95_bucket INTEGER,
+            PRIMARY KEY (nodeid, browser, profile)
+        )
+        """,
+        """
+        CREATE TABLE agg_durations (
+            nodeid TEXT NOT NULL,
+            browser TEXT NOT NULL,
+            profile TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (nodeid, browser, profile, bucket)
+        ) WITHOUT ROWID
+        """,
+    ),
+    ("ALTER TABLE runs ADD COLUMN resumes INTEGER NOT NULL DEFAULT 0",),
+)
+SCHEMA_VERSION = len(_MIGRATIONS)
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Apply the migrations ``conn``'s DB has not seen yet, all or none."""
+    # IMMEDIATE takes the write lock before reading the version, so xdist
+    # workers starting together apply each step exactly once
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        (version,) = conn.execute("PRAGMA user_version").fetchone()
+        for statements in _MIGRATIONS[version:]:
+            for statement in statements:
+                conn.execute(statement)
+        if version < SCHEMA_VERSION:
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def init_db(db_path: pathlib.Path | None = None) -> None:
+    """Create the results DB if needed and bring its schema up to date."""
+    path = db_path or DB_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    try:
         conn.execute("PRAGMA journal_mode=WAL")
         conn.execute("PRAGMA busy_timeout=5000")
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS test_runs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nodeid TEXT,
-                outcome TEXT,
-                start_ts INTEGER,
-                duration_ms INTEGER,
-                browser TEXT,
-                failure_message TEXT,
-                test_name TEXT
+        _migrate(conn)
+    finally:
+        conn.close()
+
+    os.chmod(path, 0o600)
+
+
+# Rows a DbWriter buffers before its background thread flushes them early
+DEFAULT_WRITE_BATCH = 500
+# Longest a buffered row waits before being written
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+_INSERTS = {
+    "test_runs": """
+        INSERT INTO test_runs (
+            nodeid, outcome, browser, failure_message, test_name, start_ts,
+            duration_ms, run_id, worker_id, setup_ms, teardown_ms
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    "api_events": """
+        INSERT INTO api_events (
+            ts, nodeid, event, method, url, attempt, status, detail
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    "api_calls": """
+        INSERT INTO api_calls (
+            ts, nodeid, method, endpoint, status, bytes,
+            connect_ms, ttfb_ms, total_ms, retries
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+}
+
+
+class DbWriter:
+    """One process's only connection to the results DB.
+
+    ``add`` only appends to an in-memory buffer. A background thread writes the
+    buffer with one ``executemany`` per table in a single transaction, every
+    ``interval`` seconds or as soon as ``batch_size`` rows are waiting;
+    ``flush`` does the same synchronously and ``close`` flushes what is left.
+    Lock contention between processes is left to SQLite's busy timeout: with
+    one short transaction per batch, waits are rare and brief.
+    """
+
+    def __init__(
+        self,
+        db_path: pathlib.Path,
+        *,
+        batch_size: int = DEFAULT_WRITE_BATCH,
+        interval: float = DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.interval = interval
+        self._pending: dict[str, list[tuple]] = {}
+        self._count = 0
+        self._lock = threading.Lock()
+        # Serializes flushes from the background thread and from callers
+        self._flush_lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add(self, table: str, row: tuple) -> None:
+        self.add_many(table, [row])
+
+    def add_many(self, table: str, rows: list[tuple]) -> None:
+        with self._lock:
+            self._pending.setdefault(table, []).extend(rows)
+            self._count += len(rows)
+            full = self._count >= self.batch_size
+            if self._thread is None and not self._closed.is_set():
+                self._thread = threading.Thread(
+                    target=self._run, name="db-writer", daemon=True
+                )
+                self._thread.start()
+        if full:
+            self._wake.set()
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                count, self._count = self._count, 0
+            if not pending:
+                return
+            try:
+                conn = self._connection()
+                with conn:  # One transaction for the whole batch
+                    for table, rows in pending.items():
+                        conn.executemany(_INSERTS[table], rows)
+            except sqlite3.Error as e:
+                print(f"Failed to write {count} rows to {self.db_path}: {e}")
+
+    def close(self) -> None:
+        self._closed.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        self.flush()
+        with self._flush_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                self.db_path, timeout=30, check_same_thread=False
             )
-        """)
+            # Safe with WAL (a crash loses at most the last commits, never
+            # corrupts) and saves an fsync per transaction
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+
+    def _run(self) -> None:
+        while not self._closed.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+
+class RowForwarder:
+    """Stand-in for ``DbWriter`` that keeps rows for another process to write.
+
+    Used on xdist workers when the controller is the only writer: rows are
+    collected here and handed over through ``workeroutput`` when the worker
+    finishes (``drain``). A worker that crashes loses its rows.
+    """
+
+    def __init__(self) -> None:
+        self._rows: dict[str, list[tuple]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, table: str, row: tuple) -> None:
+        self.add_many(table, [row])
+
+    def add_many(self, table: str, rows: list[tuple]) -> None:
+        with self._lock:
+            self._rows.setdefault(table, []).extend(rows)
+
+    def flush(self) -> None:
+        """Nothing to do; rows leave with ``drain``."""
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+    def drain(self) -> dict[str, list[tuple]]:
+        with self._lock:
+            rows, self._rows = self._rows, {}
+        return rows
+
+
+_writers: dict[pathlib.Path, DbWriter] = {}
+_writers_pid = os.getpid()
+_writers_lock = threading.Lock()
+_forwarder: RowForwarder | None = None
+
+
+def writer_for(db_path: pathlib.Path | None = None) -> DbWriter | RowForwarder:
+    """This process's writer for ``db_path`` (default: the results DB)."""
+    global _writers_pid
+    path = db_path or DB_PATH
+    if _forwarder is not None and path == DB_PATH:
+        return _forwarder
+    with _writers_lock:
+        if _writers_pid != os.getpid():
+            # Forked: the parent's connection and thread are not ours
+            _writers.clear()
+            _writers_pid = os.getpid()
+        writer = _writers.get(path)
+        if writer is None:
+            writer = _writers[path] = DbWriter(path)
+        return writer
+
+
+def forward_rows() -> RowForwarder:
+    """Route this process's results-DB rows into a ``RowForwarder``."""
+    global _forwarder
+    if _forwarder is None:
+        _forwarder = RowForwarder()
+    return _forwarder
+
+
+def is_forwarding() -> bool:
+    return _forwarder is not None
+
+
+def close_writers() -> None:
+    """Flush and close every writer of this process."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
 
-    os.chmod(DB_PATH, 0o600)
+
+atexit.register(close_writers)
 
 
 def log_test_run(
@@ -45,38 +365,227 @@ def log_test_run(
     test_name: str | None = None,
     start_ts: int | None = None,
     duration_ms: int | None = None,
+    run_id: str | None = None,
+    worker_id: str | None = None,
+    setup_ms: int | None = None,
+    teardown_ms: int | None = None,
 ) -> None:
-    with sqlite3.connect(DB_PATH) as conn:
-        max_attempts = 3
-        delay = 0.1
-        for attempt in range(max_attempts):
-            try:
-                conn.execute(
-                    """
-                    INSERT INTO test_runs (
-                        nodeid, outcome, browser, failure_message, test_name, start_ts, duration_ms
-                        )
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        nodeid,
-                        outcome,
-                        browser,
-                        failure_message,
-                        test_name,
-                        start_ts,
-                        duration_ms,
-                    ),
-                )
-                conn.commit()
-                break
-            except sqlite3.OperationalError as e:
-                if "database is locked" in str(e) and attempt < max_attempts - 1:
-                    time.sleep(delay)
-                    continue
-                else:
-                    print(f"Database error after {attempt + 1} attempts: {e}")
-                    break
-            except sqlite3.Error as e:
-                print(f"Non-retryable database error: {e}")
-                break
+    """Queue one ``test_runs`` row; ``duration_ms`` is the call phase alone."""
+    row = (
+        nodeid,
+        outcome,
+        browser,
+        failure_message,
+        test_name,
+        start_ts,
+        duration_ms,
+        run_id,
+        worker_id,
+        setup_ms,
+        teardown_ms,
+    )
+    writer_for().add("test_runs", row)
+
+
+def git_sha() -> str | None:
+    """Commit under test: ``GITHUB_SHA`` in CI, else the checkout's HEAD."""
+    sha = os.getenv("GITHUB_SHA")
+    if sha:
+        return sha
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+            check=True,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def start_run(
+    run_id: str,
+    *,
+    git_sha: str | None,
+    profile: str | None,
+    browser: str | None,
+    workers: int,
+) -> None:
+    """Record the start of a pytest session in ``runs`` (once, by the controller)."""
+    with sqlite3.connect(DB_PATH, timeout=30) as conn:
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO runs (
+                run_id, started_ts, git_sha, profile, browser, workers
+            )
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (run_id, int(time.time()), git_sha, profile, browser, workers),
+        )
+    conn.close()
+
+
+def finish_run(run_id: str, exit_status: int) -> None:
+    with sqlite3.connect(DB_PATH, timeout=30) as conn:
+        conn.execute(
+            "UPDATE runs SET finished_ts = ?, exit_status = ? WHERE run_id = ?",
+            (int(time.time()), exit_status, run_id),
+        )
+    conn.close()
+
+
+def resume_run(run_id: str) -> None:
+    """Mark ``run_id`` as continued by another session."""
+    with sqlite3.connect(DB_PATH, timeout=30) as conn:
+        conn.execute(
+            "UPDATE runs SET resumes = resumes + 1, finished_ts = NULL, "
+            "exit_status = NULL WHERE run_id = ?",
+            (run_id,),
+        )
+    conn.close()
+
+
+def latest_run_id() -> str | None:
+    with sqlite3.connect(DB_PATH, timeout=30) as conn:
+        row = conn.execute(
+            "SELECT run_id FROM runs ORDER BY started_ts DESC, rowid DESC LIMIT 1"
+        ).fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def run_exists(run_id: str) -> bool:
+    with sqlite3.connect(DB_PATH, timeout=30) as conn:
+        row = conn.execute("SELECT 1 FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+    conn.close()
+    return row is not None
+
+
+def last_test_run_id() -> int:
+    """Id of the newest ``test_runs`` row, 0 if there is none."""
+    with sqlite3.connect(DB_PATH, timeout=30) as conn:
+        (last_id,) = conn.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM test_runs"
+        ).fetchone()
+    conn.close()
+    return last_id
+
+
+def passed_in_run(run_id: str, up_to_id: int) -> set[str]:
+    """Nodeids whose latest outcome in ``run_id`` (rows <= ``up_to_id``) is passed."""
+    query = """
+        SELECT nodeid, outcome, MAX(id)
+        FROM test_runs
+        WHERE run_id = ? AND id <= ?
+        GROUP BY nodeid
+    """
+    with sqlite3.connect(DB_PATH, timeout=30) as conn:
+        rows = conn.execute(query, (run_id, up_to_id)).fetchall()
+    conn.close()
+    return {nodeid for nodeid, outcome, _ in rows if outcome == "passed"}
+
+
+def current_nodeid() -> str | None:
+    """Return the nodeid of the test pytest is currently running, if any."""
+    current = os.getenv("PYTEST_CURRENT_TEST")
+    if not current:
+        return None
+    # Format is "<nodeid> (<phase>)"
+    return current.rsplit(" (", 1)[0]
+
+
+def log_api_event(
+    event: str,
+    method: str,
+    url: str,
+    attempt: int | None = None,
+    status: int | None = None,
+    detail: str | None = None,
+) -> None:
+    """Record an API client event (retry, circuit transition) for the current test."""
+    row = (time.time(), current_nodeid(), event, method, url, attempt, status, detail)
+    writer_for().add("api_events", row)
+
+
+@dataclass(slots=True)
+class ApiCall:
+    """Timing of one logical API call, including any retries it needed."""
+
+    method: str
+    endpoint: str
+    status: int | None
+    bytes: int
+    connect_ms: float
+    ttfb_ms: float | None
+    total_ms: float
+    retries: int
+
+
+class ApiCallRecorder:
+    """Queue ``api_calls`` rows on the process's ``DbWriter``.
+
+    Rows are keyed to the test running when they are recorded; ``flush``
+    writes everything queued so far.
+    """
+
+    def __init__(self, db_path: pathlib.Path | None = None) -> None:
+        self.db_path = db_path or DB_PATH
+        self._writer = writer_for(self.db_path)
+
+    def record(self, call: ApiCall) -> None:
+        row = (
+            time.time(),
+            current_nodeid(),
+            call.method,
+            call.endpoint,
+            call.status,
+            call.bytes,
+            call.connect_ms,
+            call.ttfb_ms,
+            call.total_ms,
+            call.retries,
+        )
+        self._writer.add("api_calls", row)
+
+    def flush(self) -> None:
+        self._writer.flush()
+
+
+def api_call_percentiles(
+    db_path: pathlib.Path | None = None, *, nodeid_prefix: str | None = None
+) -> list[dict]:
+    """Return p50/p95/p99 of ``total_ms`` per method and endpoint, slowest p95 first.
+
+    Percentiles use the nearest-rank method; ``nodeid_prefix`` narrows the rows
+    to a test file or directory.
+    """
+    query = """
+        WITH ranked AS (
+            SELECT
+                method,
+                endpoint,
+                total_ms,
+                ROW_NUMBER() OVER (
+                    PARTITION BY method, endpoint ORDER BY total_ms
+                ) AS rank,
+                COUNT(*) OVER (PARTITION BY method, endpoint) AS calls
+            FROM api_calls
+            WHERE ? IS NULL OR nodeid LIKE ? || '%'
+        )
+        SELECT
+            method,
+            endpoint,
+            calls,
+            MIN(CASE WHEN rank * 100 >= calls * 50 THEN total_ms END) AS p50_ms,
+            MIN(CASE WHEN rank * 100 >= calls * 95 THEN total_ms END) AS p95_ms,
+            MIN(CASE WHEN rank * 100 >= calls * 99 THEN total_ms END) AS p99_ms
+        FROM ranked
+        GROUP BY method, endpoint
+        ORDER BY p95_ms DESC
+    """
+    with sqlite3.connect(db_path or DB_PATH) as conn:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(query, (nodeid_prefix, nodeid_prefix)).fetchall()
+    return [dict(row) for row in rows]
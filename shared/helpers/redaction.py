@@ -0,0 +1,46 @@
+SENSITIVE_KEYS = {
+    "password",
+    "email",
+    "token",
+    "auth_token",
+    "x-auth-token",
+    "authorization",
+    "card_number",
+    "cvc",
+    "api_key",
+    "apikey",
+    "client_secret",
+    "secret",
+}
+
+# Keys are compared lower-cased with dashes as underscores ("X-Auth-Token")
+_NORMALIZED_KEYS = {key.replace("-", "_") for key in SENSITIVE_KEYS}
+
+
+def is_sensitive_key(key: str | None) -> bool:
+    return (key or "").lower().replace("-", "_") in _NORMALIZED_KEYS
+
+
+def mask_email(value: str) -> str:
+    try:
+        name, domain = value.split("@", 1)
+    except ValueError:
+        return "***"
+    visible = name[:1] if name else ""
+    return f"{visible}***@{domain}"
+
+
+def mask_card(value: str) -> str:
+    digits = "".join(ch for ch in value if ch.isdigit())
+    tail = digits[-4:] if len(digits) >= 4 else "****"
+    return f"**** **** **** {tail}"
+
+
+def mask_value(key: str, value: str) -> str:
+    """Masked stand-in for the secret ``value`` stored under ``key``."""
+    key = key.lower()
+    if "email" in key:
+        return mask_email(value)
+    if "card" in key:
+        return mask_card(value)
+    return "***"
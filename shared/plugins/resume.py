@@ -0,0 +1,115 @@
+"""Resume an interrupted run from the results DB: skip what already passed.
+
+``--resume`` continues the latest run in ``runs``, ``--resume=<run_id>`` a
+given one. Tests whose latest outcome in that run is ``passed`` are
+deselected; failed ones and the ones that never ran are run again, and their
+rows carry the same ``run_id``, so the run reads as one in ``test_runs`` and
+``shared.analytics``. ``runs.resumes`` counts the continuations.
+
+The passed set is read up to the last ``test_runs`` row that existed when
+the session started, so every xdist worker (including a replacement for a
+crashed one) collects the same tests. Rows still buffered when a runner is
+killed (see ``DbWriter``; with ``--db-writer controller`` a whole worker's)
+never reach the DB, and those tests simply run again.
+"""
+
+from collections.abc import Generator
+
+import pytest
+
+from shared.helpers import db_logger
+
+# (run id, last test_runs id the passed set is read up to)
+_RESUME = pytest.StashKey[tuple[str, int]]()
+_SUMMARY = pytest.StashKey[str]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--resume",
+        nargs="?",
+        const="latest",
+        default=None,
+        metavar="RUN_ID",
+        help=(
+            "Continue a run from the results DB (default: the latest one), "
+            "running only the tests that did not pass in it."
+        ),
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config: pytest.Config) -> None:
+    requested = config.getoption("resume")
+    if requested is None:
+        return
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is not None:
+        run_id, up_to = workerinput["resume_run_id"], workerinput["resume_up_to"]
+    else:
+        run_id, up_to = _resolve(requested), db_logger.last_test_run_id()
+    config.stash[_RESUME] = (run_id, up_to)
+    # Other hooks (the run bookkeeping in conftest) read the resolved id
+    config.option.resume = run_id
+
+
+def _resolve(requested: str) -> str:
+    db_logger.init_db()
+    run_id = db_logger.latest_run_id() if requested == "latest" else requested
+    if run_id is None or not db_logger.run_exists(run_id):
+        raise pytest.UsageError(
+            f"--resume: no run {requested!r} in {db_logger.DB_PATH}"
+        )
+    return run_id
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node) -> None:
+    resume = node.config.stash.get(_RESUME, None)
+    if resume is not None:
+        node.workerinput["resume_run_id"], node.workerinput["resume_up_to"] = resume
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: list[pytest.Item]
+) -> Generator[None, None, None]:
+    """Drop what passed, after every other plugin (e.g. ``--shard``) is done."""
+    yield
+    resume = config.stash.get(_RESUME, None)
+    if resume is None:
+        return
+    run_id, up_to = resume
+    passed = db_logger.passed_in_run(run_id, up_to)
+    kept = [item for item in items if item.nodeid not in passed]
+    deselected = [item for item in items if item.nodeid in passed]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = kept
+    config.stash[_SUMMARY] = (
+        f"resumed run {run_id}: {len(deselected)} tests passed before, "
+        f"{len(kept)} left to run"
+    )
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    """On xdist workers: pass the summary on, the controller did not collect."""
+    summary = session.config.stash.get(_SUMMARY, None)
+    if summary is not None and hasattr(session.config, "workeroutput"):
+        session.config.workeroutput["resume_summary"] = summary
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error) -> None:
+    summary = getattr(node, "workeroutput", {}).get("resume_summary")
+    if summary is not None:
+        node.config.stash[_SUMMARY] = summary
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config) -> None:
+    resume = config.stash.get(_RESUME, None)
+    if resume is None:
+        return
+    terminalreporter.write_sep("-", "resume")
+    summary = config.stash.get(_SUMMARY, f"resumed run {resume[0]}")
+    terminalreporter.write_line(summary)
@@ -0,0 +1,112 @@
+"""Split the collected tests into time-balanced shards across CI jobs.
+
+``--shard=i/N`` keeps the i-th of N shards (1-based) and deselects the rest.
+Shards are balanced by the same estimates and login-fixture groups as
+``--duration-schedule`` (see ``shared.plugins.xdist_schedule``), taken from
+``--shard-history`` (default: the results DB). Every job must read the same
+history snapshot, e.g. the DB artifact of the last run on the main branch;
+with it the split depends only on the set of collected nodeids, not on their
+order, so ``pytest-randomly`` and xdist workers all agree on it.
+"""
+
+import argparse
+import os
+import pathlib
+
+import pytest
+
+from shared.helpers import db_logger
+from shared.plugins.xdist_schedule import (
+    estimate,
+    group_of,
+    load_history,
+    lpt_partition,
+    makespan,
+    plan_units,
+)
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    try:
+        index, total = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}") from None
+    if not 1 <= index <= total:
+        raise argparse.ArgumentTypeError(f"shard {value} is not in 1/N..N/N")
+    return index, total
+
+
+_SUMMARY = pytest.StashKey[str]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--shard",
+        type=parse_shard,
+        default=os.getenv("TEST_SHARD") or None,
+        help=(
+            "Run only shard i of N (e.g. 2/4), balanced by historical "
+            "durations (env TEST_SHARD)."
+        ),
+    )
+    parser.addoption(
+        "--shard-history",
+        type=pathlib.Path,
+        default=os.getenv("TEST_SHARD_HISTORY") or None,
+        help=(
+            "Results DB to balance shards by; every shard must use the same one "
+            "(default: the results DB, env TEST_SHARD_HISTORY)."
+        ),
+    )
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: list[pytest.Item]
+) -> None:
+    """Keep this job's shard; runs after -m/-k deselection and reordering."""
+    shard = config.getoption("shard")
+    if not shard:
+        return
+    index, total = shard
+    history = load_history(config.getoption("shard_history") or db_logger.DB_PATH)
+    nodeids = sorted(item.nodeid for item in items)
+    estimates, unseen = estimate(nodeids, history)
+    groups = {item.nodeid: group for item in items if (group := group_of(item))}
+    partition = lpt_partition(plan_units(estimates, groups, history, total), total)
+    mine = {nodeid for unit in partition[index - 1] for nodeid in unit.nodeids}
+
+    kept = [item for item in items if item.nodeid in mine]
+    deselected = [item for item in items if item.nodeid not in mine]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = kept
+
+    own = sum(unit.seconds for unit in partition[index - 1])
+    config.stash[_SUMMARY] = (
+        f"shard {index}/{total}: {len(kept)} of {len(nodeids)} tests "
+        f"({unseen} without history), estimated {own:.1f}s; "
+        f"longest shard {makespan(partition):.1f}s, "
+        f"all shards {sum(estimates.values()):.1f}s"
+    )
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    """On xdist workers: pass the summary on, the controller did not collect."""
+    summary = session.config.stash.get(_SUMMARY, None)
+    if summary is not None and hasattr(session.config, "workeroutput"):
+        session.config.workeroutput["shard_summary"] = summary
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error) -> None:
+    summary = getattr(node, "workeroutput", {}).get("shard_summary")
+    if summary is not None:
+        node.config.stash[_SUMMARY] = summary
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config) -> None:
+    summary = config.stash.get(_SUMMARY, None)
+    if summary is not None:
+        terminalreporter.write_sep("-", "shard")
+        terminalreporter.write_line(summary)
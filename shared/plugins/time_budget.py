@@ -0,0 +1,344 @@
+"""Run the most valuable tests that fit a wall-time budget.
+
+``--time-budget=6m`` (env ``TEST_TIME_BUDGET``; ``360``, ``360s``, ``6m`` and
+``1h`` all work) keeps the subset of the collected tests with the most value
+whose expected wall time, on the ``-n`` workers, stays within the budget, and
+deselects the rest. A test's value grows with its marker (``MARKER_WEIGHTS``),
+its recent failure rate and the days since it last ran, so a push job covers
+the smoke checks first, then whatever broke lately, then what has not run in
+a while. Costs are the ``--duration-schedule`` estimates from the results DB,
+and the expected wall time is the LPT makespan of the chosen tests, including
+one login per fixture group chunk (see ``shared.plugins.xdist_schedule``).
+
+The selection is a 0/1 knapsack over ``budget x workers`` seconds, shrunk and
+solved again while the makespan of the pick overruns the budget. It runs after
+``--shard`` and ``--resume``, so it budgets what this job would run anyway.
+The plan is printed before the first test starts.
+"""
+
+import argparse
+import math
+import os
+import pathlib
+import sqlite3
+import tempfile
+import time
+from collections.abc import Generator, Iterable, Mapping
+from dataclasses import dataclass
+
+import pytest
+
+from shared.helpers import db_logger
+from shared.plugins.xdist_schedule import (
+    HISTORY_ROWS,
+    History,
+    estimate,
+    group_of,
+    load_history,
+    lpt_partition,
+    makespan,
+    plan_units,
+)
+
+# Value multiplier of a test by its most valuable marker, 1.0 otherwise
+MARKER_WEIGHTS = {"smoke": 3.0, "e2e": 2.0, "hybrid": 1.5}
+# Value added by a 100% recent failure rate
+FAILURE_WEIGHT = 4.0
+# Days without a run after which the staleness bonus (up to 1.0) is full
+STALE_DAYS = 14
+# Resolution of the knapsack: the budget is cut into this many slots
+SLOTS = 2000
+# Re-solves with a smaller capacity while the makespan overruns the budget
+MAX_ROUNDS = 20
+# Tests listed in the plan without -v
+SHOWN = 10
+
+_UNITS = {"s": 1, "m": 60, "h": 3600}
+
+
+def parse_budget(value: str) -> float:
+    """Seconds in ``360``, ``360s``, ``6m`` or ``1h``."""
+    number, unit = (value[:-1], value[-1]) if value[-1:] in _UNITS else (value, "s")
+    try:
+        seconds = float(number) * _UNITS[unit]
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"expected seconds, or a number with s/m/h, got {value!r}"
+        ) from None
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError(f"budget {value} is not positive")
+    return seconds
+
+
+@dataclass(frozen=True, slots=True)
+class Signal:
+    """What recent runs say about a test's odds of catching something."""
+
+    fail_rate: float
+    # Epoch seconds of its latest run, None if unknown
+    last_ts: int | None
+
+
+@dataclass(frozen=True, slots=True)
+class Plan:
+    chosen: tuple[str, ...]
+    # Expected wall time of the chosen tests, in seconds
+    seconds: float
+    value: float
+    total_value: float
+
+
+def load_signals(
+    db_path: pathlib.Path | None = None, rows: int = HISTORY_ROWS
+) -> dict[str, Signal]:
+    """Failure rate and latest run per nodeid over the latest ``rows`` runs."""
+    path = db_path or db_logger.DB_PATH
+    if not path.exists():
+        return {}
+    query = """
+        SELECT nodeid,
+            SUM(outcome = 'failed'),
+            SUM(outcome IN ('passed', 'failed')),
+            MAX(start_ts)
+        FROM test_runs
+        WHERE id > (SELECT COALESCE(MAX(id), 0) FROM test_runs) - ?
+        GROUP BY nodeid
+    """
+    try:
+        with sqlite3.connect(path, timeout=30) as conn:
+            found = conn.execute(query, (rows,)).fetchall()
+        conn.close()
+    except sqlite3.Error:
+        return {}
+    return {
+        nodeid: Signal(failed / decided if decided else 0.0, last_ts)
+        for nodeid, failed, decided, last_ts in found
+    }
+
+
+def value(markers: Iterable[str], signal: Signal | None, now: float) -> float:
+    """How much running a test is worth; never-seen tests count as stale."""
+    weight = max((MARKER_WEIGHTS.get(name, 1.0) for name in markers), default=1.0)
+    fail_rate = signal.fail_rate if signal else 0.0
+    days = (
+        (now - signal.last_ts) / 86400
+        if signal and signal.last_ts is not None
+        else STALE_DAYS
+    )
+    staleness = min(max(days, 0.0), STALE_DAYS) / STALE_DAYS
+    return weight * (1.0 + FAILURE_WEIGHT * fail_rate + staleness)
+
+
+def knapsack(
+    costs: Mapping[str, float],
+    values: Mapping[str, float],
+    capacity: float,
+    slots: int = SLOTS,
+) -> list[str]:
+    """Nodeids of the most total value within ``capacity`` seconds.
+
+    Costs are rounded up to ``capacity / slots``, so the pick never exceeds
+    the capacity and the table stays ``len(costs) x slots``.
+    """
+    if capacity <= 0:
+        return []
+    step = capacity / slots
+    nodeids = sorted(costs)
+    weights = [math.ceil(costs[nodeid] / step) for nodeid in nodeids]
+    best = [0.0] * (slots + 1)
+    taken = []
+    for nodeid, weight in zip(nodeids, weights):
+        gain = values[nodeid]
+        take = bytearray(slots + 1)
+        for room in range(slots, weight - 1, -1):
+            candidate = best[room - weight] + gain
+            if candidate > best[room]:
+                best[room] = candidate
+                take[room] = 1
+        taken.append(take)
+    chosen = []
+    room = slots
+    for nodeid, weight, take in reversed(list(zip(nodeids, weights, taken))):
+        if take[room]:
+            chosen.append(nodeid)
+            room -= weight
+    return chosen
+
+
+def plan_budget(
+    estimates: Mapping[str, float],
+    values: Mapping[str, float],
+    groups: Mapping[str, str],
+    history: Mapping[str, History],
+    workers: int,
+    budget: float,
+) -> Plan:
+    """Pick tests whose LPT makespan on ``workers`` fits in ``budget``."""
+    fits = {nodeid: s for nodeid, s in estimates.items() if s <= budget}
+    capacity = budget * workers
+    chosen: list[str] = []
+    wall = 0.0
+    for _ in range(MAX_ROUNDS):
+        chosen = knapsack(fits, values, capacity)
+        units = plan_units({n: estimates[n] for n in chosen}, groups, history, workers)
+        wall = makespan(lpt_partition(units, workers))
+        if wall <= budget:
+            break
+        capacity *= min(0.95, budget / wall)
+    return Plan(
+        chosen=tuple(sorted(chosen, key=lambda nodeid: -values[nodeid])),
+        seconds=wall,
+        value=sum(values[nodeid] for nodeid in chosen),
+        total_value=sum(values.values()),
+    )
+
+
+def describe(
+    plan: Plan,
+    budget: float,
+    workers: int,
+    collected: int,
+    estimates: Mapping[str, float],
+    values: Mapping[str, float],
+    shown: int | None = SHOWN,
+) -> list[str]:
+    share = plan.value / plan.total_value if plan.total_value else 0.0
+    lines = [
+        f"budget {budget:g}s on {workers} worker{'s' * (workers != 1)}: "
+        f"{len(plan.chosen)} of "
+        f"{collected} tests, expected wall {plan.seconds:.1f}s, "
+        f"{share:.0%} of the value"
+    ]
+    for nodeid in plan.chosen[:shown]:
+        lines.append(
+            f"  {estimates[nodeid]:7.1f}s  value {values[nodeid]:4.1f}  {nodeid}"
+        )
+    hidden = len(plan.chosen) - len(lines) + 1
+    if hidden > 0:
+        lines.append(f"  ... {hidden} more (-v lists all)")
+    return lines
+
+
+_PLAN_PATH = pytest.StashKey[pathlib.Path]()
+_NOW = pytest.StashKey[float]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--time-budget",
+        type=parse_budget,
+        default=os.getenv("TEST_TIME_BUDGET") or None,
+        metavar="DURATION",
+        help=(
+            "Run only the most valuable tests (markers, recent failures, time "
+            "since last run) whose expected wall time fits, e.g. 360s or 6m "
+            "(env TEST_TIME_BUDGET)."
+        ),
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    if not config.getoption("time_budget"):
+        return
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is not None:
+        # Score against the controller's clock so every worker picks the same
+        config.stash[_NOW] = workerinput["time_budget_now"]
+        if workerinput.get("workerid") == "gw0":
+            config.stash[_PLAN_PATH] = pathlib.Path(workerinput["time_budget_plan"])
+        return
+    config.stash[_NOW] = time.time()
+    cache = getattr(config, "cache", None)
+    cache_dir = (
+        cache.mkdir("time_budget")
+        if cache is not None
+        else pathlib.Path(tempfile.gettempdir())
+    )
+    config.stash[_PLAN_PATH] = cache_dir / f"plan-{os.getpid()}.txt"
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node) -> None:
+    if node.config.getoption("time_budget"):
+        node.workerinput["time_budget_now"] = node.config.stash[_NOW]
+        node.workerinput["time_budget_plan"] = str(node.config.stash[_PLAN_PATH])
+
+
+def _workers(config: pytest.Config) -> int:
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is not None:
+        return int(workerinput["workercount"])
+    return max(int(getattr(config.option, "numprocesses", None) or 1), 1)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: list[pytest.Item]
+) -> Generator[None, None, None]:
+    """Keep the plan's tests, after ``--shard`` and ``--resume`` are done."""
+    yield
+    budget = config.getoption("time_budget")
+    if not budget:
+        return
+    workers = _workers(config)
+    history = load_history()
+    signals = load_signals()
+    now = config.stash[_NOW]
+    estimates, _ = estimate(sorted(item.nodeid for item in items), history)
+    values = {
+        item.nodeid: value(
+            (mark.name for mark in item.iter_markers()),
+            signals.get(item.nodeid),
+            now,
+        )
+        for item in items
+    }
+    groups = {item.nodeid: group for item in items if (group := group_of(item))}
+    plan = plan_budget(estimates, values, groups, history, workers, budget)
+
+    chosen = set(plan.chosen)
+    kept = [item for item in items if item.nodeid in chosen]
+    deselected = [item for item in items if item.nodeid not in chosen]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = kept
+
+    shown = None if config.option.verbose > 0 else SHOWN
+    lines = describe(plan, budget, workers, len(estimates), estimates, values, shown)
+    plan_path = config.stash.get(_PLAN_PATH, None)
+    if hasattr(config, "workerinput"):
+        # The controller prints it once gw0 reports its collection
+        if plan_path is not None:
+            tmp = pathlib.Path(f"{plan_path}.tmp")
+            tmp.write_text("\n".join(lines))
+            tmp.replace(plan_path)
+        return
+    _write_plan(config, lines)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_node_collection_finished(node, ids) -> None:
+    plan_path = node.config.stash.get(_PLAN_PATH, None)
+    if plan_path is None or node.gateway.id != "gw0":
+        return
+    try:
+        lines = plan_path.read_text().splitlines()
+    except OSError:
+        return
+    _write_plan(node.config, lines)
+
+
+def _write_plan(config: pytest.Config, lines: list[str]) -> None:
+    reporter = config.pluginmanager.get_plugin("terminalreporter")
+    if reporter is None:
+        return
+    reporter.ensure_newline()
+    reporter.write_sep("-", "time budget")
+    for line in lines:
+        reporter.write_line(line)
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    plan_path = config.stash.get(_PLAN_PATH, None)
+    if plan_path is not None and not hasattr(config, "workerinput"):
+        plan_path.unlink(missing_ok=True)
@@ -0,0 +1,327 @@
+"""Duration-aware xdist scheduling from the results DB history.
+
+With ``--duration-schedule`` (env ``TEST_DURATION_SCHEDULE=1``) and ``-n``,
+the controller estimates every test from its recent setup, call and teardown
+times in ``test_runs`` and hands work out longest first (LPT), so the slow
+e2e journeys start early instead of landing last on one worker. Tests never
+seen before are estimated from their module, then from the whole history.
+
+Tests that use an expensive session fixture (``GROUPED_FIXTURES``) are kept
+together so each worker pays for that login once: such a group is split into
+as few chunks as balance allows, and each chunk runs on one worker.
+
+Workers collect, the controller does not, so the first worker writes which
+tests belong to which group to a file the controller reads when it plans.
+The terminal summary compares the predicted makespan with the actual one.
+"""
+
+import heapq
+import json
+import math
+import os
+import pathlib
+import sqlite3
+import statistics
+import tempfile
+import time
+from collections import OrderedDict, defaultdict
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+
+import pytest
+from xdist.scheduler import LoadScopeScheduling
+
+from shared.helpers import db_logger
+
+# Estimate of a test with no history at all, in seconds
+DEFAULT_ESTIMATE_S = 1.0
+# How many of the latest test_runs rows the estimates are taken from
+HISTORY_ROWS = 50_000
+# Session fixtures costly enough that the tests using them should share workers
+GROUPED_FIXTURES = ("notes_auth_state", "auth_file")
+
+
+@dataclass(frozen=True, slots=True)
+class History:
+    """What recent runs say about one test, in seconds."""
+
+    # Median setup + call + teardown
+    seconds: float
+    # Largest setup over the median one: a session fixture built on first use
+    setup_peak: float
+
+
+@dataclass(frozen=True, slots=True)
+class Unit:
+    """Tests that go to one worker together, with their estimated cost."""
+
+    key: str
+    nodeids: tuple[str, ...]
+    seconds: float
+
+
+def load_history(
+    db_path: pathlib.Path | None = None, rows: int = HISTORY_ROWS
+) -> dict[str, History]:
+    """Per-nodeid timings from the latest ``rows`` decided test runs."""
+    path = db_path or db_logger.DB_PATH
+    if not path.exists():
+        return {}
+    query = """
+        SELECT nodeid, setup_ms, duration_ms, teardown_ms
+        FROM test_runs
+        WHERE id > (SELECT COALESCE(MAX(id), 0) FROM test_runs) - ?
+            AND outcome IN ('passed', 'failed')
+    """
+    samples: dict[str, list[tuple[int, int]]] = defaultdict(list)
+    try:
+        with sqlite3.connect(path, timeout=30) as conn:
+            for nodeid, setup_ms, call_ms, teardown_ms in conn.execute(query, (rows,)):
+                setup_ms = setup_ms or 0
+                samples[nodeid].append(
+                    (setup_ms, setup_ms + (call_ms or 0) + (teardown_ms or 0))
+                )
+        conn.close()
+    except sqlite3.Error:
+        # No history (or an older schema) just means fallback estimates
+        return {}
+    history = {}
+    for nodeid, timings in samples.items():
+        setups = [setup for setup, _ in timings]
+        history[nodeid] = History(
+            seconds=statistics.median(total for _, total in timings) / 1000,
+            setup_peak=(max(setups) - statistics.median(setups)) / 1000,
+        )
+    return history
+
+
+def estimate(
+    nodeids: Iterable[str], history: Mapping[str, History]
+) -> tuple[dict[str, float], int]:
+    """Seconds per nodeid, and how many had to be guessed.
+
+    A test without history gets the median of its module's known tests, else
+    the median of everything known, else ``DEFAULT_ESTIMATE_S``.
+    """
+    by_module: dict[str, list[float]] = defaultdict(list)
+    for nodeid, seen in history.items():
+        by_module[nodeid.split("::", 1)[0]].append(seen.seconds)
+    overall = (
+        statistics.median(seen.seconds for seen in history.values())
+        if history
+        else DEFAULT_ESTIMATE_S
+    )
+    estimates = {}
+    unseen = 0
+    for nodeid in nodeids:
+        if nodeid in history:
+            estimates[nodeid] = history[nodeid].seconds
+            continue
+        unseen += 1
+        module = by_module.get(nodeid.split("::", 1)[0])
+        estimates[nodeid] = statistics.median(module) if module else overall
+    return estimates, unseen
+
+
+def lpt_partition(units: Iterable[Unit], bins: int) -> list[list[Unit]]:
+    """Split ``units`` into ``bins`` lists of similar cost, longest first."""
+    heap = [(0.0, n) for n in range(bins)]
+    partition: list[list[Unit]] = [[] for _ in range(bins)]
+    for unit in sorted(units, key=lambda unit: (-unit.seconds, unit.key)):
+        load, n = heapq.heappop(heap)
+        partition[n].append(unit)
+        heapq.heappush(heap, (load + unit.seconds, n))
+    return partition
+
+
+def plan_units(
+    estimates: Mapping[str, float],
+    groups: Mapping[str, str],
+    history: Mapping[str, History],
+    workers: int,
+) -> list[Unit]:
+    """Work units for ``workers``: one per ungrouped test, a few per group.
+
+    A group gets as many chunks as it needs to stay under a fair share of
+    the total, and each chunk is charged the group's one-off setup.
+    """
+    members: dict[str, list[str]] = defaultdict(list)
+    units = []
+    for nodeid, seconds in estimates.items():
+        group = groups.get(nodeid)
+        if group:
+            members[group].append(nodeid)
+        else:
+            units.append(Unit(nodeid, (nodeid,), seconds))
+    share = max(
+        sum(estimates.values()) / max(workers, 1),
+        max(estimates.values(), default=0.0),
+    )
+    for group, nodeids in sorted(members.items()):
+        total = sum(estimates[nodeid] for nodeid in nodeids)
+        setup = max((history[n].setup_peak for n in nodeids if n in history), default=0)
+        chunks = min(workers, len(nodeids), max(1, math.ceil(total / share)))
+        singles = [Unit(nodeid, (nodeid,), estimates[nodeid]) for nodeid in nodeids]
+        for n, chunk in enumerate(lpt_partition(singles, chunks)):
+            chunk_ids = tuple(nodeid for unit in chunk for nodeid in unit.nodeids)
+            seconds = setup + sum(unit.seconds for unit in chunk)
+            units.append(Unit(f"{group}#{n}", chunk_ids, seconds))
+    return units
+
+
+def makespan(partition: list[list[Unit]]) -> float:
+    return max((sum(unit.seconds for unit in part) for part in partition), default=0)
+
+
+def group_of(item: pytest.Item) -> str | None:
+    fixtures = getattr(item, "fixturenames", ())
+    names = [name for name in GROUPED_FIXTURES if name in fixtures]
+    return "+".join(names) or None
+
+
+class DurationScheduling(LoadScopeScheduling):
+    """``loadscope`` with planned units, handed out longest first."""
+
+    def __init__(self, config: pytest.Config, log, groups_path: pathlib.Path) -> None:
+        super().__init__(config, log)
+        self.groups_path = groups_path
+        self.history = load_history()
+        self.units: list[Unit] = []
+        self.unseen = 0
+        self.predicted_makespan = 0.0
+        # Seconds each worker spent running tests
+        self.busy: dict[str, float] = defaultdict(float)
+        self.started = 0.0
+        self.finished = 0.0
+        self._unit_of: dict[str, str] = {}
+        self._cost: dict[str, float] = {}
+        self._ordered = False
+
+    def _plan(self) -> None:
+        assert self.collection is not None
+        try:
+            groups = json.loads(self.groups_path.read_text())
+        except (OSError, ValueError):
+            groups = {}
+        estimates, self.unseen = estimate(self.collection, self.history)
+        workers = len(self.nodes)
+        self.units = plan_units(estimates, groups, self.history, workers)
+        for unit in self.units:
+            self._cost[unit.key] = unit.seconds
+            for nodeid in unit.nodeids:
+                self._unit_of[nodeid] = unit.key
+        self.predicted_makespan = makespan(lpt_partition(self.units, workers))
+        self.started = time.monotonic()
+
+    def _split_scope(self, nodeid: str) -> str:
+        if not self._unit_of:
+            self._plan()
+        return self._unit_of.get(nodeid, nodeid)
+
+    def _assign_work_unit(self, node) -> None:
+        if not self._ordered:
+            ordered = sorted(
+                self.workqueue.items(), key=lambda unit: -self._cost.get(unit[0], 0)
+            )
+            self.workqueue = OrderedDict(ordered)
+            self._ordered = True
+        super()._assign_work_unit(node)
+        # A worker starts a test only once it knows the next one (or that it
+        # should stop), so keep two queued while work is left
+        while self.workqueue and self._pending_of(self.assigned_work[node]) < 2:
+            super()._assign_work_unit(node)
+
+    def mark_test_complete(self, node, item_index: int, duration: float = 0) -> None:
+        self.busy[node.gateway.id] += duration
+        self.finished = time.monotonic()
+        super().mark_test_complete(node, item_index, duration)
+
+    def summary(self) -> str:
+        groups = {unit.key.split("#")[0] for unit in self.units if "#" in unit.key}
+        actual = max(self.busy.values(), default=0.0)
+        return (
+            f"{len(self._unit_of)} tests in {len(self.units)} units "
+            f"({len(groups)} fixture groups, {self.unseen} without history) on "
+            f"{len(self.busy)} workers: predicted makespan {self.predicted_makespan:.1f}s, "
+            f"actual {actual:.1f}s (busiest worker), "
+            f"wall {self.finished - self.started:.1f}s"
+        )
+
+
+_SCHEDULER = pytest.StashKey[DurationScheduling]()
+_GROUPS_PATH = pytest.StashKey[pathlib.Path]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--duration-schedule",
+        action="store_true",
+        default=os.getenv("TEST_DURATION_SCHEDULE", "0") == "1",
+        help=(
+            "Under xdist, hand out tests longest first by their history in the "
+            "results DB, keeping tests that share a login fixture together "
+            "(env TEST_DURATION_SCHEDULE=1)."
+        ),
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    if not config.getoption("duration_schedule") or hasattr(config, "workerinput"):
+        return
+    cache = getattr(config, "cache", None)
+    cache_dir = (
+        cache.mkdir("duration_schedule")
+        if cache is not None
+        else pathlib.Path(tempfile.gettempdir())
+    )
+    config.stash[_GROUPS_PATH] = cache_dir / f"groups-{os.getpid()}.json"
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node) -> None:
+    groups_path = node.config.stash.get(_GROUPS_PATH, None)
+    if groups_path is not None:
+        node.workerinput["duration_groups_path"] = str(groups_path)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(
+    config: pytest.Config, log
+) -> DurationScheduling | None:
+    groups_path = config.stash.get(_GROUPS_PATH, None)
+    if groups_path is None:
+        return None
+    scheduler = DurationScheduling(config, log, groups_path)
+    config.stash[_SCHEDULER] = scheduler
+    return scheduler
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_finish(session: pytest.Session) -> None:
+    """On the first worker: tell the controller which tests share a group.
+
+    Runs before xdist reports the collection, so the file is in place by the
+    time the controller plans.
+    """
+    workerinput = getattr(session.config, "workerinput", {})
+    path = workerinput.get("duration_groups_path")
+    if not path or workerinput.get("workerid") != "gw0":
+        return
+    groups = {item.nodeid: group_of(item) for item in session.items}
+    tmp = pathlib.Path(f"{path}.tmp")
+    tmp.write_text(json.dumps({k: v for k, v in groups.items() if v}))
+    tmp.replace(path)
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config) -> None:
+    scheduler = config.stash.get(_SCHEDULER, None)
+    if scheduler is None or not scheduler.units:
+        return
+    terminalreporter.write_sep("-", "duration schedule")
+    terminalreporter.write_line(scheduler.summary())
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    groups_path = config.stash.get(_GROUPS_PATH, None)
+    if groups_path is not None:
+        groups_path.unlink(missing_ok=True)
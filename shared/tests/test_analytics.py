@@ -0,0 +1,37 @@
+import sqlite3
+from pathlib import Path
+
+from shared import analytics
+from shared.helpers.db_logger import init_db
+
+
+def test_incremental_analytics_match_a_rebuild(tmp_path: Path) -> None:
+    db_path = tmp_path / "results.db"
+    init_db(db_path)
+    outcomes = ["passed", "failed", "passed", "skipped", "passed", "failed"]
+
+    def log(batch: list[str], browser: str) -> None:
+        with sqlite3.connect(db_path) as conn:
+            conn.executemany(
+                "INSERT INTO test_runs (nodeid, outcome, browser, duration_ms) "
+                "VALUES ('t.py::test_a', ?, ?, ?)",
+                [(outcome, browser, 10 * n) for n, outcome in enumerate(batch, 1)],
+            )
+        conn.close()
+
+    log(outcomes[:2], "chromium")
+    assert analytics.refresh(db_path) == 2
+    log(outcomes[2:], "chromium")
+    log(["passed"] * 4, "firefox")
+    assert analytics.refresh(db_path) == 8, "Only rows after the last refresh"
+    incremental = analytics.stats_by_test(db_path, by=("browser",))
+    analytics.rebuild(db_path)
+
+    assert analytics.stats_by_test(db_path, by=("browser",)) == incremental
+    chromium, firefox = sorted(incremental, key=lambda item: item["browser"])
+    assert (chromium["transitions"], chromium["skipped"]) == (3, 1)
+    assert chromium["flake_rate"] == 3 / 4, "Skipped runs don't break the series"
+    assert firefox["flake_rate"] == 0.0
+    assert firefox["max_ms"] == 40 and 20 <= firefox["p50_ms"] <= 21
+    (overall,) = analytics.stats_by_test(db_path, by=())
+    assert overall["runs"] == 10 and overall["flake_rate"] == 3 / 7
@@ -0,0 +1,78 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from shared.helpers import db_logger
+from shared.helpers.db_logger import SCHEMA_VERSION, init_db
+
+
+def test_init_db_migrates_an_unversioned_db(tmp_path: Path) -> None:
+    db_path = tmp_path / "results.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE test_runs (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "nodeid TEXT, outcome TEXT, start_ts INTEGER, duration_ms INTEGER, "
+            "browser TEXT, failure_message TEXT, test_name TEXT)"
+        )
+        conn.execute(
+            "INSERT INTO test_runs (nodeid, outcome) VALUES ('t.py::test_a', 'passed')"
+        )
+    conn.close()
+
+    init_db(db_path)
+    init_db(db_path)  # Already current: nothing to apply
+
+    with sqlite3.connect(db_path) as conn:
+        (version,) = conn.execute("PRAGMA user_version").fetchone()
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(test_runs)")}
+        kept = conn.execute("SELECT nodeid, run_id FROM test_runs").fetchall()
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM test_runs "
+            "WHERE nodeid = ? ORDER BY start_ts DESC",
+            ("t.py::test_a",),
+        ).fetchall()
+    conn.close()
+
+    assert version == SCHEMA_VERSION, "Every migration applied once"
+    assert {"run_id", "worker_id", "setup_ms", "teardown_ms"} <= columns
+    assert kept == [("t.py::test_a", None)], "Existing rows survive the migration"
+    assert "idx_test_runs_nodeid_start" in str(plan), "History lookups use the index"
+
+
+def test_resume_skips_only_what_last_passed_in_the_run(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    db_path = tmp_path / "results.db"
+    monkeypatch.setattr(db_logger, "DB_PATH", db_path)
+    init_db(db_path)
+    db_logger.start_run("r1", git_sha=None, profile=None, browser="chromium", workers=1)
+    rows = [
+        ("t.py::test_a", "passed", "r1"),
+        ("t.py::test_b", "passed", "r1"),
+        ("t.py::test_b", "failed", "r1"),  # Rerun: the latest outcome counts
+        ("t.py::test_c", "passed", "r0"),  # Another run
+    ]
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO test_runs (nodeid, outcome, run_id) VALUES (?, ?, ?)", rows
+        )
+    conn.close()
+    up_to = db_logger.last_test_run_id()
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO test_runs (nodeid, outcome, run_id) "
+            "VALUES ('t.py::test_d', 'passed', 'r1')"
+        )
+    conn.close()
+
+    db_logger.resume_run("r1")
+
+    assert db_logger.latest_run_id() == "r1"
+    assert db_logger.passed_in_run("r1", up_to) == {
+        "t.py::test_a"
+    }, "Failed, other runs' and later rows are not skipped"
+    with sqlite3.connect(db_path) as conn:
+        resumes = conn.execute("SELECT resumes FROM runs").fetchone()
+    conn.close()
+    assert resumes == (1,)
@@ -0,0 +1,36 @@
+from shared.plugins.time_budget import Signal, knapsack, plan_budget, value
+
+
+def test_budget_plan_prefers_value_per_second_and_fits_the_wall() -> None:
+    now = 1_000_000_000.0
+    values = {
+        "t.py::test_smoke": value(["smoke"], Signal(0.0, int(now)), now),
+        "t.py::test_broke": value([], Signal(0.5, int(now)), now),
+        "t.py::test_stale": value([], None, now),
+        "t.py::test_slow": value(["e2e"], Signal(0.0, int(now)), now),
+        "t.py::test_plain": value([], Signal(0.0, int(now)), now),
+    }
+    estimates = {
+        "t.py::test_smoke": 2.0,
+        "t.py::test_broke": 2.0,
+        "t.py::test_stale": 2.0,
+        "t.py::test_slow": 9.0,
+        "t.py::test_plain": 2.0,
+    }
+
+    plan = plan_budget(estimates, values, {}, {}, workers=2, budget=4.0)
+
+    assert values["t.py::test_broke"] == 3.0, "A 50% failure rate triples it"
+    assert values["t.py::test_stale"] == 2.0, "Never seen counts as stale"
+    assert plan.chosen[0] == "t.py::test_smoke"
+    assert set(plan.chosen) == {
+        "t.py::test_smoke",
+        "t.py::test_broke",
+        "t.py::test_stale",
+        "t.py::test_plain",
+    }, "The journey alone overruns the budget"
+    assert plan.seconds == 4.0
+    assert knapsack(estimates, values, capacity=5.0) == [
+        "t.py::test_smoke",
+        "t.py::test_broke",
+    ], "Costs round up, never over the capacity"
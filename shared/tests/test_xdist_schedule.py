@@ -0,0 +1,30 @@
+from shared.plugins.xdist_schedule import (
+    History,
+    estimate,
+    lpt_partition,
+    makespan,
+    plan_units,
+)
+
+
+def test_plan_balances_long_tests_and_keeps_groups_together() -> None:
+    history = {
+        "ui/test_e2e.py::test_journey": History(seconds=30.0, setup_peak=4.0),
+        "ui/test_e2e.py::test_other": History(seconds=6.0, setup_peak=4.0),
+        **{f"api/test_a.py::test_{n}": History(1.0, 0.0) for n in range(20)},
+    }
+    collection = [*history, "ui/test_e2e.py::test_new", "fresh/test_b.py::test_x"]
+    groups = {nodeid: "notes_auth_state" for nodeid in collection if "ui/" in nodeid}
+
+    estimates, unseen = estimate(collection, history)
+    units = plan_units(estimates, groups, history, workers=4)
+    partition = lpt_partition(units, 4)
+
+    assert unseen == 2
+    assert estimates["ui/test_e2e.py::test_new"] == 18.0, "Module median"
+    assert estimates["fresh/test_b.py::test_x"] == 1.0, "Overall median"
+    grouped = [unit for unit in units if unit.key.startswith("notes_auth_state#")]
+    assert sorted(n for unit in grouped for n in unit.nodeids) == sorted(groups)
+    assert len(grouped) == 2, "Split only as far as a fair share needs"
+    assert all(unit.seconds > 4.0 for unit in grouped), "Each chunk pays the login"
+    assert makespan(partition) == 34.0, "The journey and its login set the pace"